@@ -0,0 +1,308 @@
+"""
+async_helper.py
+
+asyncio counterparts of the helper.py API functions. Requests share one
+pooled aiohttp session, so independent calls (e.g. the HO, RB and CL books)
+can be issued concurrently and a refresh costs roughly the slowest single
+call rather than the sum of all of them.
+
+For asyncio callers only; the tick loop fetches its MarketSnapshot on the
+execution thread pool (see snapshot.py).
+"""
+
+import asyncio
+import time
+import aiohttp
+import metrics
+from config import API_BASE_URL, API_KEY
+from helper import ApiException
+
+# Maximum number of simultaneous connections to the RIT client
+MAX_CONNECTIONS = 20
+
+
+def initialize_session(max_connections=MAX_CONNECTIONS):
+    """
+    Create an authenticated aiohttp session with a pooled connector.
+
+    Must be called from inside a running event loop.
+
+    Args:
+        max_connections (int): Size of the connection pool.
+
+    Returns:
+        aiohttp.ClientSession: Authenticated session object.
+    """
+    connector = aiohttp.TCPConnector(limit=max_connections)
+    return aiohttp.ClientSession(connector=connector, headers={'X-API-Key': API_KEY})
+
+
+async def _request(session, method, path, params=None, error=None):
+    start = time.perf_counter()
+    try:
+        async with session.request(method, f'{API_BASE_URL}{path}', params=params) as resp:
+            ok = resp.status < 400
+            body = await (resp.json(content_type=None) if ok else resp.text())
+    except Exception:
+        metrics.record(method, path, time.perf_counter() - start, error=True)
+        raise
+
+    metrics.record(method, path, time.perf_counter() - start, error=not ok)
+    if not ok:
+        raise ApiException(f"{error or f'Failed {method} {path}'}: {body}")
+    return body
+
+
+# --- Data Retrieval Functions ---
+
+async def get_tick(session):
+    """
+    Get the current simulation tick (time step).
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+
+    Returns:
+        int: Current tick number.
+    """
+    case_info = await _request(session, 'GET', '/case', error="Failed to get case info")
+    return case_info.get('tick', 0)
+
+
+async def get_positions(session):
+    """
+    Retrieve the current positions for all securities.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+
+    Returns:
+        dict: Dictionary of ticker symbols and their corresponding positions.
+    """
+    securities_list = await _request(session, 'GET', '/securities', error="Failed to get securities list")
+    return {security['ticker']: security.get('position', 0) for security in securities_list}
+
+
+async def get_net_position(session):
+    """
+    Get the trader's current net position.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+
+    Returns:
+        int: Net position across the limit's securities.
+    """
+    limits = await _request(session, 'GET', '/limits', error="Failed to get limits")
+    return limits[0]['net']
+
+
+async def get_book(session, ticker):
+    """
+    Retrieve the full order book for a security.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        ticker (str): Security ticker symbol.
+
+    Returns:
+        dict: Book with 'bids' and 'asks' lists.
+    """
+    return await _request(session, 'GET', '/securities/book', params={'ticker': ticker},
+                          error=f"Failed to get book for {ticker}")
+
+
+async def ticker_bid_ask(session, ticker):
+    """
+    Retrieve the best bid and ask prices for a given security.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        ticker (str): Security ticker symbol.
+
+    Returns:
+        tuple: (best_bid_price (float), best_ask_price (float)).
+    """
+    book = await get_book(session, ticker)
+    bids = book.get('bids', [])
+    asks = book.get('asks', [])
+
+    if not bids or not asks:
+        raise ApiException(f"No bids or asks available for ticker {ticker}.")
+
+    return bids[0]['price'], asks[0]['price']
+
+
+async def gather_books(session, tickers):
+    """
+    Fetch several order books concurrently.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        tickers (list): Security ticker symbols.
+
+    Returns:
+        dict: Ticker symbol -> book.
+    """
+    books = await asyncio.gather(*(get_book(session, ticker) for ticker in tickers))
+    return dict(zip(tickers, books))
+
+
+async def get_leases(session):
+    """
+    Retrieve all active leases.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+
+    Returns:
+        list: Lease dictionaries.
+    """
+    return await _request(session, 'GET', '/leases', error="Failed to get leases")
+
+
+async def get_latest_news(session):
+    """
+    Fetch the most recent news items.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+
+    Returns:
+        list: List of news dictionaries.
+    """
+    return await _request(session, 'GET', '/news', error="Failed to get news")
+
+
+# --- Order Management Functions ---
+
+async def place_order(session, ticker, quantity, action, order_type='MARKET', price=None):
+    """
+    Submit a new order to the exchange.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        ticker (str): Security ticker symbol.
+        quantity (int): Number of contracts to trade.
+        action (str): 'BUY' or 'SELL'.
+        order_type (str): 'MARKET' or 'LIMIT'.
+        price (float, optional): Limit price, required for LIMIT orders.
+
+    Returns:
+        dict: API response containing order details.
+    """
+    payload = {
+        'ticker': ticker,
+        'quantity': quantity,
+        'action': action,
+        'type': order_type,
+    }
+    if price is not None:
+        payload['price'] = price
+
+    return await _request(session, 'POST', '/orders', params=payload,
+                          error=f"Failed to place order for {ticker}")
+
+
+async def cancel_order(session, order_id):
+    """
+    Cancel an open order.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        order_id (int): Unique identifier of the order to cancel.
+
+    Returns:
+        dict: API response confirming cancellation.
+    """
+    return await _request(session, 'DELETE', f'/orders/{order_id}',
+                          error=f"Failed to cancel order {order_id}")
+
+
+# --- Lease Functions ---
+
+async def lease_storage(session, ticker):
+    """
+    Lease a storage tank for a given commodity.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        ticker (str): Facility ticker (e.g., 'CL-STORAGE', 'AK-STORAGE').
+
+    Returns:
+        dict: API response confirming lease.
+    """
+    return await _request(session, 'POST', '/leases', params={'ticker': ticker},
+                          error=f"Failed to lease storage for {ticker}")
+
+
+async def lease_refinery(session):
+    """
+    Lease a refinery facility for crude oil refining.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+
+    Returns:
+        dict: API response confirming lease.
+    """
+    return await _request(session, 'POST', '/leases', params={'ticker': 'CL-REFINERY'},
+                          error="Failed to lease refinery")
+
+
+async def use_refinery(session, from_ticker, quantity):
+    """
+    Send crude oil to every leased refinery for processing.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        from_ticker (str): Ticker of the input commodity (e.g., 'CL').
+        quantity (int): Amount to refine.
+
+    Returns:
+        list: API responses, one per refinery lease used.
+    """
+    leases = await get_leases(session)
+    payload = {'from1': from_ticker, 'quantity1': quantity}
+    return await asyncio.gather(*(
+        _request(session, 'POST', f"/leases/{lease['id']}", params=payload,
+                 error=f"Failed to use refinery for {from_ticker}")
+        for lease in leases if 'CL-REFINERY' in lease['ticker']
+    ))
+
+
+async def lease_use_transport(session, ticker, from1, quantity):
+    """
+    Lease a pipeline for transporting a commodity.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        ticker (str): Ticker for the pipeline lease (e.g., 'AK-CS-PIPE').
+        from1 (str): Ticker for the commodity being transported (e.g., 'CL').
+        quantity (int): Number of units to transport.
+
+    Returns:
+        dict: API response confirming lease order.
+    """
+    payload = {
+        'ticker': ticker,
+        'from1': from1,
+        'quantity1': quantity,
+    }
+    return await _request(session, 'POST', '/leases', params=payload,
+                          error=f"Failed to lease transport for {ticker}")
+
+
+async def close_lease(session, lease_id):
+    """
+    Close a lease.
+
+    Args:
+        session (aiohttp.ClientSession): Authenticated session for API requests.
+        lease_id (int): ID of the lease to close.
+
+    Returns:
+        dict: API response confirming lease closure.
+    """
+    return await _request(session, 'DELETE', f'/leases/{lease_id}',
+                          error=f"Failed to close lease {lease_id}")
@@ -0,0 +1,331 @@
+"""
+backtest.py
+
+Deterministic replay backtester for the main.py models. A recorded session
+(see recorder.py) is replayed through the mock exchange core: recorded books
+set the prices and depth each tick, recorded news is released at its tick,
+and the exchange simulates fills, lease timing and pipeline transit. The
+models talk to it through a fake session on a virtual clock, so a whole
+case runs in seconds.
+
+Without a recording the plain simulated exchange is used.
+
+Usage:
+    python backtest.py --set refining.MIN_PROFIT_THRESHOLD=60000 --set fundamental.HOLD_TICKS=10
+"""
+
+import argparse
+import ast
+import contextlib
+import importlib
+import io
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import requests
+
+import clock as tick_clock
+import globals
+import helper
+import leases as lease_registry
+import mock_server
+import main as trading_main
+import scheduler
+from config import API_BASE_URL
+from recorder import RECORDING_FILE, RecordingReader
+
+REQUEST_LATENCY = 0.002  # Virtual seconds charged per API request
+TICK_SECONDS = 1.0       # Virtual seconds per case tick
+END_GRACE_TICKS = 5      # Ticks a model may keep waiting after the case ends before it is stopped
+
+# Modules reloaded for every run so state and parameter overrides never leak between runs
+MODEL_MODULES = ['refining', 'fundamental', 'transportation', 'storage']
+
+BacktestResult = namedtuple('BacktestResult', ['nlv', 'nlv_curve', 'ticks', 'orders', 'leases', 'requests', 'wall_seconds'])
+
+
+class ReplayExchange(mock_server.Exchange):
+    """
+    Exchange whose prices and books follow a recorded session.
+
+    Tickers without recorded depth keep the synthetic simulation. Recorded
+    news only changes lease costs here, since its price impact is already in
+    the recorded books.
+    """
+
+    def __init__(self, records, tickers, news_script=(), seed=0):
+        self.record_tickers = tickers
+        self.records = records
+        ticks = records['tick']
+        self.ticks_per_period = int(ticks.max())
+        # Record index in force at each tick: the last one recorded at or before it
+        self.record_at = np.maximum(np.searchsorted(ticks, np.arange(self.ticks_per_period + 1), side='right') - 1, 0)
+        super().__init__(seed=seed, ticks_per_period=self.ticks_per_period, tick_seconds=None,
+                         news_script=list(news_script))
+
+    def _record(self):
+        return self.records[self.record_at[min(self.tick, self.ticks_per_period)]]
+
+    def _update_linked_prices(self):
+        super()._update_linked_prices()
+        record = self._record()
+        for t, ticker in enumerate(self.record_tickers):
+            bid, ask = record['bid_price'][t, 0], record['ask_price'][t, 0]
+            if ticker in self.prices and not np.isnan(bid) and not np.isnan(ask):
+                self.prices[ticker] = (bid + ask) / 2
+
+    def _rebuild_books(self):
+        super()._rebuild_books()
+        record = self._record()
+        for t, ticker in enumerate(self.record_tickers):
+            if ticker not in self.books:
+                continue
+            bids = [[float(price), int(quantity)] for price, quantity in zip(record['bid_price'][t], record['bid_qty'][t])
+                    if not np.isnan(price) and quantity > 0]
+            asks = [[float(price), int(quantity)] for price, quantity in zip(record['ask_price'][t], record['ask_qty'][t])
+                    if not np.isnan(price) and quantity > 0]
+            if bids and asks:
+                self.books[ticker] = {'bids': bids, 'asks': asks}
+
+    def _apply_news(self, headline, ticker):
+        if ticker in self.lease_costs:
+            match = mock_server.PIPELINE_COST_PATTERN.search(headline)
+            if match:
+                self.lease_costs[ticker] = int(match.group(1).replace(',', ''))
+
+
+class CaseEnded(Exception):
+    """
+    Raised by the virtual clock when a model keeps waiting past the end of the case.
+    """
+
+
+class VirtualClock:
+    """
+    Stand-in for the time module. Sleeping advances virtual time and steps
+    the exchange through every tick boundary crossed.
+    """
+
+    def __init__(self, exchange, tick_seconds=TICK_SECONDS):
+        self.exchange = exchange
+        self.tick_seconds = tick_seconds
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    perf_counter = monotonic = time
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += max(seconds, 0.0)
+            target = int(self.now / self.tick_seconds)
+            if target > self.exchange.ticks_per_period + END_GRACE_TICKS:
+                raise CaseEnded(f"Case ended at tick {self.exchange.ticks_per_period}")
+            target = min(target, self.exchange.ticks_per_period)
+        with self.exchange.lock:
+            while self.exchange.tick < target:
+                self.exchange.step()
+
+
+class ReplayResponse:
+    """
+    Minimal requests.Response look-alike for exchange replies.
+    """
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.payload = payload
+
+    @property
+    def text(self):
+        return json.dumps(self.payload)
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code}: {self.text}", response=self)
+
+
+class ReplaySession:
+    """
+    Fake requests session that routes API calls to an in-process exchange,
+    charging each call REQUEST_LATENCY of virtual time.
+    """
+
+    def __init__(self, exchange, clock, latency=REQUEST_LATENCY):
+        self.exchange = exchange
+        self.clock = clock
+        self.latency = latency
+        self.headers = {}
+        self.requests = 0
+
+    def request(self, method, url, params=None, **kwargs):
+        path = url[len(API_BASE_URL):] if url.startswith(API_BASE_URL) else url
+        params = {key: str(value) for key, value in (params or {}).items()}
+        status, payload = self.exchange.dispatch(method, path, params)
+        self.requests += 1
+        self.clock.sleep(self.latency)
+        return ReplayResponse(status, payload)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_session(path=RECORDING_FILE):
+    """
+    Load the most recent complete session from a recording.
+
+    Returns:
+        tuple: (records (np.ndarray), tickers (list), news script (list of (tick, headline, ticker))).
+    """
+    reader = RecordingReader(path)
+    records = reader.latest()
+    if not len(records):
+        raise ValueError(f"{path} holds no records.")
+
+    # A new session starts wherever the case clock goes backwards
+    starts = np.flatnonzero(np.diff(records['tick']) < 0) + 1
+    records = np.array(records[starts[-1]:] if len(starts) else records)
+
+    news = reader.news(records['wall_time'][0] - TICK_SECONDS, records['wall_time'][-1])
+    script = [(item['tick'] or 0, item['headline'], item['ticker']) for item in news]
+    return records, reader.tickers, script
+
+
+def load_models(overrides=None):
+    """
+    Reload the model modules and apply parameter overrides.
+
+    Args:
+        overrides (dict): 'module.NAME' -> value.
+
+    Returns:
+        dict: Module name -> reloaded module.
+    """
+    importlib.reload(globals)
+    tick_clock.case_clock.reset()
+    lease_registry.lease_manager.reset()
+    modules = {name: importlib.reload(importlib.import_module(name)) for name in MODEL_MODULES}
+    for key, value in (overrides or {}).items():
+        module_name, attribute = key.rsplit('.', 1)
+        module = modules.get(module_name) or importlib.import_module(module_name)
+        if not hasattr(module, attribute):
+            raise AttributeError(f"{module_name} has no parameter {attribute}")
+        setattr(module, attribute, value)
+    return modules
+
+
+@contextlib.contextmanager
+def virtual_time(clock, modules):
+    """
+    Point the time references of the helper, scheduler, case clock and model modules at the virtual clock.
+    """
+    patched = []
+    for module in [helper, scheduler, tick_clock] + list(modules.values()):
+        for attribute, replacement in (('time', clock), ('sleep', clock.sleep)):
+            if hasattr(module, attribute):
+                patched.append((module, attribute, getattr(module, attribute)))
+                setattr(module, attribute, replacement)
+    try:
+        yield
+    finally:
+        for module, attribute, original in reversed(patched):
+            setattr(module, attribute, original)
+
+
+def run_backtest(recording=None, overrides=None, ticks=600, seed=0, latency=REQUEST_LATENCY, quiet=True):
+    """
+    Run the main.py models over one session.
+
+    Args:
+        recording (str, optional): Recording to replay; the simulated exchange is used if None.
+        overrides (dict, optional): 'module.NAME' -> value parameter overrides.
+        ticks (int): Session length when no recording is given.
+        seed (int): Random seed for the exchange.
+        latency (float): Virtual seconds charged per API request.
+        quiet (bool): Suppress model output.
+
+    Returns:
+        BacktestResult: Final NLV, NLV per tick and activity counts.
+    """
+    start = time.perf_counter()
+    if recording is not None:
+        records, tickers, news_script = load_session(recording)
+        exchange = ReplayExchange(records, tickers, news_script, seed=seed)
+    else:
+        exchange = mock_server.Exchange(seed=seed, ticks_per_period=ticks)
+
+    clock = VirtualClock(exchange)
+    session = ReplaySession(exchange, clock, latency)
+    modules = load_models(overrides)
+    nlv_curve = np.full(exchange.ticks_per_period + 1, np.nan)
+
+    def mark_to_market(session, snapshot):
+        nlv_curve[exchange.tick] = exchange.nlv()
+
+    tick_scheduler = scheduler.TickScheduler(session)
+    tick_scheduler.add_event_source('news', modules['fundamental'].news_feed.poll)
+    tick_scheduler.add('housekeeping', trading_main.housekeeping, budget=0.1)
+    tick_scheduler.add('refining_model', modules['refining'].refining_model)
+    tick_scheduler.add('fundamental_model', modules['fundamental'].fundamental_model)
+    tick_scheduler.add('transportation_model', modules['transportation'].transportation_model)
+    tick_scheduler.add('storage_model', modules['storage'].storage_model)
+    tick_scheduler.add('mark_to_market', mark_to_market)
+
+    output = io.StringIO() if quiet else None
+    with virtual_time(clock, modules), contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        try:
+            tick_scheduler.run(until_tick=exchange.ticks_per_period)
+        except CaseEnded:
+            pass
+
+    nlv_curve[exchange.ticks_per_period] = exchange.nlv()
+    return BacktestResult(exchange.nlv(), nlv_curve, exchange.tick, len(exchange.orders),
+                          exchange.next_lease_id - 1, session.requests, time.perf_counter() - start)
+
+
+def parse_overrides(assignments):
+    overrides = {}
+    for assignment in assignments:
+        key, value = assignment.split('=', 1)
+        overrides[key.strip()] = ast.literal_eval(value.strip())
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the trading models.")
+    parser.add_argument('--recording', default=RECORDING_FILE, help="Recording to replay (simulated exchange if missing)")
+    parser.add_argument('--synthetic', action='store_true', help="Use the simulated exchange even if a recording exists")
+    parser.add_argument('--ticks', type=int, default=600, help="Session length for the simulated exchange")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', action='append', default=[], metavar='MODULE.NAME=VALUE',
+                        help="Override a model parameter, e.g. fundamental.HOLD_TICKS=10")
+    parser.add_argument('--verbose', action='store_true', help="Show model output")
+    args = parser.parse_args()
+
+    recording = None if args.synthetic or not os.path.exists(args.recording) else args.recording
+    result = run_backtest(recording, parse_overrides(args.set), args.ticks, args.seed, quiet=not args.verbose)
+
+    source = recording or f"simulated exchange (seed {args.seed})"
+    print(f"Replayed {result.ticks} ticks from {source} in {result.wall_seconds:.2f}s")
+    print(f"Orders: {result.orders}, leases: {result.leases}, API requests: {result.requests}")
+    print(f"Final NLV: {result.nlv:,.2f}")
+
+
+if __name__ == '__main__':
+    main()
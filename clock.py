@@ -0,0 +1,196 @@
+"""
+clock.py
+
+Case clock service. Tick transitions seen in /case samples are fitted with a
+line (wall time = phase + tick * period), so the start of any future tick can
+be predicted. Waiting for a tick then costs a sleep to the predicted boundary
+and a poll or two around it instead of a spin on /case. Deadline callbacks
+registered for a tick (plus an offset into it) are fired by whoever is
+waiting on the clock, normally the tick scheduler.
+"""
+
+import heapq
+import itertools
+import time
+from collections import deque
+import helper
+
+DEFAULT_PERIOD = 1.0  # Seconds per tick assumed until transitions have been timed
+MIN_TRANSITIONS = 2   # Transitions needed before sleeping to predicted tick starts
+MAX_SAMPLES = 60      # Tick transitions kept for the fit
+MAX_BRACKET = 0.2     # Widest sample gap around a transition used in the fit, in periods
+POLL_INTERVAL = 0.02  # Seconds between /case polls once a predicted boundary has passed
+
+
+class CaseClock:
+    """
+    Estimates the case tick period and phase and sleeps until given ticks.
+
+    Each transition is timed at the midpoint between the last sample showing
+    the old tick and the first showing the new one. Only tightly bracketed
+    transitions are fitted, and waits wake just ahead of the predicted
+    boundary so that most transitions are.
+    """
+
+    def __init__(self, default_period=DEFAULT_PERIOD, poll_interval=POLL_INTERVAL):
+        self.default_period = default_period
+        self.poll_interval = poll_interval
+        self.reset()
+
+    def reset(self):
+        self.transitions = deque(maxlen=MAX_SAMPLES)  # (tick, estimated wall time it started)
+        self.last_tick = None
+        self.last_seen = None
+        self.period = self.default_period
+        self.phase = None
+        self.deadlines = []
+        self._sequence = itertools.count()
+
+    # --- Estimation ---
+
+    def observe(self, tick, wall_time=None):
+        """
+        Record that the case was at a tick at a wall time.
+
+        Args:
+            tick (int): Observed case tick.
+            wall_time (float, optional): Defaults to time.time().
+        """
+        now = time.time() if wall_time is None else wall_time
+        if tick != self.last_tick:
+            if self.last_tick is not None and tick == self.last_tick + 1:
+                # Loosely bracketed transitions would only add noise to the fit
+                if now - self.last_seen <= MAX_BRACKET * self.period:
+                    self.transitions.append((tick, (self.last_seen + now) / 2))
+                    self._fit()
+            else:
+                # First sample, skipped ticks or a new period: the tick started
+                # some time before now, so only the phase is reset.
+                self.transitions.clear()
+                self.phase = now - self.period * tick
+        self.last_tick = tick
+        self.last_seen = now
+
+    def _fit(self):
+        count = len(self.transitions)
+        ticks = [tick for tick, _ in self.transitions]
+        times = [wall_time for _, wall_time in self.transitions]
+        mean_tick = sum(ticks) / count
+        mean_time = sum(times) / count
+        spread = sum((tick - mean_tick) ** 2 for tick in ticks)
+        if spread > 0:
+            slope = sum((tick - mean_tick) * (wall_time - mean_time) for tick, wall_time in self.transitions) / spread
+            if slope > 0:
+                self.period = slope
+        self.phase = mean_time - self.period * mean_tick
+
+    def sample(self, session):
+        """
+        Poll /case once and record the tick.
+
+        Returns:
+            int: Current tick.
+        """
+        tick = helper.get_tick(session)
+        self.observe(tick)
+        return tick
+
+    @property
+    def calibrated(self):
+        """
+        True once enough consecutive transitions have been timed to predict tick starts.
+        """
+        return len(self.transitions) >= MIN_TRANSITIONS
+
+    def tick_time(self, tick, offset=0.0):
+        """
+        Predicted wall time of a tick's start plus an offset in seconds.
+        """
+        if self.phase is None:
+            return time.time() + offset
+        return self.phase + tick * self.period + offset
+
+    # --- Waiting ---
+
+    def sleep_until_tick(self, session, tick, offset=0.0):
+        """
+        Sleep until a tick has started and offset seconds have passed since,
+        firing any deadlines that come due on the way.
+
+        Args:
+            session (requests.Session): Authenticated session for API requests.
+            tick (int): Tick to wait for.
+            offset (float): Seconds into the tick to wake up.
+
+        Returns:
+            int: Current tick on waking; earlier than tick if the case clock went back (a new period).
+        """
+        if self.calibrated and time.time() < self.tick_time(self.last_tick + 1) - self.poll_interval:
+            # Still inside the last observed tick: no need to ask
+            start = current = self.last_tick
+        else:
+            start = current = self.sample(session)
+        while start <= current < tick:
+            self.fire_deadlines(session)
+            if self.calibrated:
+                # Wake just before the predicted start so the transition is tightly bracketed
+                wake = min(self.tick_time(tick) - self.poll_interval, self._next_deadline())
+                delay = min(wake - time.time(), self.period)
+            else:
+                delay = self.poll_interval
+            time.sleep(max(delay, self.poll_interval))
+            current = self.sample(session)
+        if current < tick:
+            return current
+
+        delay = self.tick_time(tick, offset) - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        self.fire_deadlines(session)
+        return current
+
+    # --- Deadlines ---
+
+    def at_tick(self, tick, callback, offset=0.0):
+        """
+        Register a callback to run once the case reaches a tick plus an offset.
+
+        Args:
+            tick (int): Tick the deadline falls in.
+            callback (callable): Called as callback(session, snapshot); snapshot may be None.
+            offset (float): Seconds into the tick.
+        """
+        heapq.heappush(self.deadlines, (tick, offset, next(self._sequence), callback))
+
+    def _next_deadline(self):
+        if not self.deadlines:
+            return float('inf')
+        tick, offset, _, _ = self.deadlines[0]
+        return self.tick_time(tick, offset)
+
+    def fire_deadlines(self, session, snapshot=None):
+        """
+        Run every deadline that has come due.
+
+        Returns:
+            int: Number of callbacks run.
+        """
+        if snapshot is not None:
+            self.observe(snapshot.tick)
+        fired = 0
+        while self.deadlines and self.last_tick is not None:
+            tick, offset, _, callback = self.deadlines[0]
+            due = tick < self.last_tick or (tick == self.last_tick and time.time() >= self.tick_time(tick, offset))
+            if not due:
+                break
+            heapq.heappop(self.deadlines)
+            fired += 1
+            try:
+                callback(session, snapshot)
+            except Exception as e:
+                print(f"[ERROR] Deadline for tick {tick}: {e}")
+        return fired
+
+
+# Shared clock for the scheduler and the models
+case_clock = CaseClock()
@@ -0,0 +1,239 @@
+"""
+eia_optimizer.py
+
+Grid search for the EIA_trade thresholds in fundamental.py. Logged EIA
+reports are paired with the CL-2F bid/ask path that followed them, and the
+P&L per contract of every (sensitivity, trigger, hold ticks) combination is
+evaluated in one broadcast NumPy pass.
+
+Each trade is modelled as EIA_trade places it: opened at the touch on the
+report's tick when |surprise| * sensitivity clears the trigger, closed at
+the touch hold ticks later, starting flat. Overlapping trades are not
+netted against the position limit, so P&L scales linearly with trade size
+and is reported per contract; TRADE_QUANTITY is not searched.
+
+Usage:
+    python eia_optimizer.py                  # events from market_data.rec
+    python eia_optimizer.py --synthetic 20   # events from 20 simulated sessions
+"""
+
+import argparse
+import os
+import numpy as np
+
+import fundamental
+import headlines
+import mock_server
+from recorder import RECORDING_FILE, RecordingReader
+
+TICKER = 'CL-2F'
+MULTIPLIER = 1000
+
+# Values evaluated for each parameter
+GRID = {
+    'sensitivity': np.round(np.arange(0.02, 0.205, 0.02), 2),
+    'trigger': np.round(np.arange(0.0, 1.05, 0.1), 2),
+    'hold_ticks': np.array([1, 2, 5, 10, 15, 20, 30, 45]),
+}
+
+
+class EventSet:
+    """
+    EIA surprises with the CL-2F touch prices of their sessions, flattened.
+
+    Session paths are concatenated into bid/ask arrays. Each event keeps the
+    index of its report tick and of its session's last tick, so exits can be
+    clipped to the session.
+    """
+
+    def __init__(self):
+        self.bids = []
+        self.asks = []
+        self.surprise = []
+        self.entry = []
+        self.last = []
+        self.size = 0
+
+    def add_session(self, bids, asks, events):
+        """
+        Args:
+            bids, asks (np.ndarray): CL-2F touch prices indexed by tick.
+            events (list): (tick, surprise) of the session's EIA reports.
+        """
+        for tick, surprise in events:
+            if 0 <= tick < len(bids):
+                self.surprise.append(surprise)
+                self.entry.append(self.size + tick)
+                self.last.append(self.size + len(bids) - 1)
+        self.bids.append(np.asarray(bids, dtype=np.float64))
+        self.asks.append(np.asarray(asks, dtype=np.float64))
+        self.size += len(bids)
+
+    def arrays(self):
+        return (np.concatenate(self.bids) if self.bids else np.empty(0),
+                np.concatenate(self.asks) if self.asks else np.empty(0),
+                np.asarray(self.surprise, dtype=np.float64),
+                np.asarray(self.entry, dtype=np.int64),
+                np.asarray(self.last, dtype=np.int64))
+
+
+def _forward_fill(ticks, values, length):
+    at = np.maximum(np.searchsorted(ticks, np.arange(length), side='right') - 1, 0)
+    return values[at]
+
+
+def load_recorded_events(path=RECORDING_FILE):
+    """
+    Collect EIA events and CL-2F paths from every session in a recording.
+
+    Returns:
+        EventSet: The recorded events.
+    """
+    reader = RecordingReader(path)
+    records = reader.latest()
+    news = [item for item in reader.news() if item['tick'] is not None]
+    t = reader.ticker_index(TICKER)
+    events = EventSet()
+
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(records['tick']) < 0) + 1, [len(records)]])
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        session = records[start:end]
+        length = int(session['tick'].max()) + 1
+        bids = _forward_fill(session['tick'], session['bid_price'][:, t, 0], length)
+        asks = _forward_fill(session['tick'], session['ask_price'][:, t, 0], length)
+        first, last = session['wall_time'][0], session['wall_time'][-1]
+        session_events = []
+        for item in news:
+            event = headlines.classify(item['headline'])
+            if event.category == 'EIA' and first - 1 <= item['wall_time'] <= last:
+                session_events.append((item['tick'], event.surprise))
+        events.add_session(bids, asks, session_events)
+    return events
+
+
+def simulate_events(sessions, ticks=600, seed=0):
+    """
+    Collect EIA events and CL-2F paths from simulated sessions.
+
+    Returns:
+        EventSet: The simulated events.
+    """
+    events = EventSet()
+    for i in range(sessions):
+        exchange = mock_server.Exchange(seed=seed + i, ticks_per_period=ticks)
+        bids, asks = [], []
+        while True:
+            book = exchange.books[TICKER]
+            bids.append(book['bids'][0][0])
+            asks.append(book['asks'][0][0])
+            if not exchange.step():
+                break
+        book = exchange.books[TICKER]
+        bids.append(book['bids'][0][0])
+        asks.append(book['asks'][0][0])
+
+        session_events = []
+        for news in exchange.news:
+            event = headlines.classify(news['headline'])
+            if event.category == 'EIA':
+                session_events.append((news['tick'], event.surprise))
+        events.add_session(bids, asks, session_events)
+    return events
+
+
+def evaluate(events, grid=GRID):
+    """
+    P&L per contract of every parameter combination, in one broadcast pass.
+
+    Args:
+        events (EventSet): EIA events with their price paths.
+        grid (dict): Arrays of values for sensitivity, trigger and hold_ticks.
+
+    Returns:
+        tuple: (total P&L per contract (np.ndarray of shape (sensitivity, trigger, hold_ticks)),
+                trade count (np.ndarray of shape (sensitivity, trigger))).
+    """
+    bids, asks, surprise, entry, last = events.arrays()
+    sensitivity, trigger, hold = grid['sensitivity'], grid['trigger'], grid['hold_ticks']
+
+    # Per-contract P&L of a long and a short trade for each event and hold: (events, hold)
+    exit_at = np.minimum(entry[:, None] + hold[None, :], last[:, None])
+    long_pnl = bids[exit_at] - asks[entry][:, None]
+    short_pnl = bids[entry][:, None] - asks[exit_at]
+
+    # Trade direction for each event, sensitivity and trigger: (events, sensitivity, trigger)
+    expected = -surprise[:, None] * sensitivity[None, :]
+    direction = np.sign(expected)[:, :, None] * (np.abs(expected)[:, :, None] > trigger[None, None, :])
+
+    # Per-contract P&L per event and combination: (events, sensitivity, trigger, hold)
+    per_contract = np.where(direction[..., None] > 0, long_pnl[:, None, None, :],
+                            np.where(direction[..., None] < 0, short_pnl[:, None, None, :], 0.0))
+    pnl = per_contract.sum(axis=0) * MULTIPLIER
+    return pnl, np.abs(direction).sum(axis=0)
+
+
+def best(pnl, grid=GRID):
+    """
+    Return the best combination as a dict of parameter values plus its P&L.
+    """
+    index = np.unravel_index(np.argmax(pnl), pnl.shape)
+    result = {name: values[i].item() for (name, values), i in zip(grid.items(), index)}
+    result['pnl'] = float(pnl[index])
+    return result
+
+
+def current_parameters():
+    return {'sensitivity': fundamental.EIA_SENSITIVITY, 'trigger': fundamental.EIA_TRIGGER,
+            'hold_ticks': fundamental.HOLD_TICKS}
+
+
+def print_surface(pnl, trades, grid, choice):
+    """
+    Print the P&L per contract over sensitivity x trigger at the chosen hold.
+    """
+    h = int(np.flatnonzero(grid['hold_ticks'] == choice['hold_ticks'])[0])
+    print(f"P&L per contract ($k) at hold {choice['hold_ticks']} ticks "
+          f"(rows: sensitivity, columns: trigger):")
+    print("        " + "".join(f"{trigger:>8.2f}" for trigger in grid['trigger']))
+    for s, sensitivity in enumerate(grid['sensitivity']):
+        print(f"{sensitivity:>6.2f}  " + "".join(f"{value / 1000:>8.1f}" for value in pnl[s, :, h]))
+    print("Trades at each (sensitivity, trigger):")
+    for s, sensitivity in enumerate(grid['sensitivity']):
+        print(f"{sensitivity:>6.2f}  " + "".join(f"{count:>8.0f}" for count in trades[s]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid search the EIA_trade thresholds.")
+    parser.add_argument('--recording', default=RECORDING_FILE)
+    parser.add_argument('--synthetic', type=int, default=0, metavar='SESSIONS',
+                        help="Use this many simulated sessions instead of the recording")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="Save the P&L surface to this .npz file")
+    args = parser.parse_args()
+
+    if args.synthetic or not os.path.exists(args.recording):
+        events = simulate_events(args.synthetic or 10, seed=args.seed)
+    else:
+        events = load_recorded_events(args.recording)
+
+    pnl, trades = evaluate(events)
+    combinations = pnl.size
+    print(f"Evaluated {combinations} combinations over {len(events.surprise)} EIA reports.")
+
+    top = best(pnl)
+    current = current_parameters()
+    print(f"Best: {top}")
+    on_grid = all(np.any(np.isclose(GRID[name], value)) for name, value in current.items())
+    if on_grid:
+        index = tuple(int(np.flatnonzero(np.isclose(GRID[name], value))[0]) for name, value in current.items())
+        print(f"Current {current}: P&L per contract {pnl[index]:,.2f}, "
+              f"{pnl[index] * fundamental.TRADE_QUANTITY:,.2f} at {fundamental.TRADE_QUANTITY} contracts")
+    print_surface(pnl, trades, GRID, top)
+
+    if args.out:
+        np.savez(args.out, pnl=pnl, trades=trades, **GRID)
+        print(f"Saved the P&L surface to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
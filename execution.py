@@ -0,0 +1,171 @@
+"""
+execution.py
+
+Concurrent execution of multi-leg trades. Legs are grouped into waves:
+every item in a wave is submitted at once over a bounded thread pool, and a
+wave only starts after the previous one has been acknowledged. An item can
+also be a chain of legs run back to back, for legs that depend on an
+earlier fill (e.g. a pipeline lease needing the spot barrels just bought).
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+import helper
+import metrics
+
+MAX_WORKERS = 10  # Maximum legs in flight at once
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='leg')
+
+
+class BatchResult:
+    """
+    Aggregated acknowledgements and failures of an executed batch.
+    """
+
+    def __init__(self):
+        self.acks = []      # (leg, API response)
+        self.failures = []  # (leg, exception)
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    def responses(self, legs):
+        """
+        Return the API responses of the acknowledged legs among the given legs.
+
+        Legs are matched by identity, so legs with the same name stay distinct.
+        """
+        wanted = {id(leg) for leg in legs}
+        return [response for leg, response in self.acks if id(leg) in wanted]
+
+    def filled(self, legs):
+        """
+        Total quantity of the acknowledged legs among the given legs.
+        """
+        wanted = {id(leg) for leg in legs}
+        return sum(leg['quantity'] for leg, _ in self.acks if id(leg) in wanted)
+
+    def report(self):
+        print(f"Executed {len(self.acks)} legs, {len(self.failures)} failed.")
+        for leg, error in self.failures:
+            print(f"[ERROR] Leg {leg['name']} failed: {error}")
+
+
+def order_leg(ticker, quantity, action, order_type='MARKET'):
+    """
+    Build an order leg.
+
+    Returns:
+        dict: Leg description for execute_legs.
+    """
+    return {'name': f"{action} {quantity} {ticker}", 'quantity': quantity, 'func': helper.place_order,
+            'args': (ticker, quantity, action, order_type)}
+
+
+def transport_leg(pipeline, from1, quantity):
+    """
+    Build a pipeline lease leg.
+
+    Returns:
+        dict: Leg description for execute_legs.
+    """
+    return {'name': f"{pipeline} {quantity} {from1}", 'quantity': quantity, 'func': helper.lease_use_transport,
+            'args': (pipeline, from1, quantity)}
+
+
+def lease_leg(ticker):
+    """
+    Build a facility lease leg (storage, refinery).
+
+    Returns:
+        dict: Leg description for execute_legs.
+    """
+    if ticker == 'CL-REFINERY':
+        return {'name': f"LEASE {ticker}", 'quantity': 1, 'func': helper.lease_refinery, 'args': ()}
+    return {'name': f"LEASE {ticker}", 'quantity': 1, 'func': helper.lease_storage, 'args': (ticker,)}
+
+
+def storage_leg(ticker, capacity):
+    """
+    Build a storage lease leg. Its quantity is the capacity of the tank.
+
+    Returns:
+        dict: Leg description for execute_legs.
+    """
+    return {'name': f"LEASE {ticker}", 'quantity': capacity, 'func': helper.lease_storage, 'args': (ticker,)}
+
+
+def release_leg(lease_id):
+    """
+    Build a lease close leg.
+
+    Returns:
+        dict: Leg description for execute_legs.
+    """
+    return {'name': f"CLOSE lease {lease_id}", 'quantity': 1, 'lease_id': lease_id, 'func': helper.release_lease,
+            'args': (lease_id,)}
+
+
+def _run_chain(session, chain, model):
+    acks = []
+    with metrics.track_model(model):
+        for leg in chain:
+            try:
+                acks.append((leg, leg['func'](session, *leg['args'])))
+            except Exception as e:
+                return acks, (leg, e)
+    return acks, None
+
+
+def _run_call(session, func, args, model):
+    with metrics.track_model(model):
+        return func(session, *args)
+
+
+def run_concurrently(session, calls):
+    """
+    Run independent API calls at once on the leg pool.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        calls (list): (func, args) pairs, each called as func(session, *args).
+
+    Returns:
+        list: Results in the order of calls.
+
+    Raises:
+        Exception: The first exception raised by a call, after all calls have finished.
+    """
+    model = metrics.current_model()
+    futures = [_executor.submit(_run_call, session, func, args, model) for func, args in calls]
+    wait(futures)
+    return [future.result() for future in futures]
+
+
+def execute_legs(session, waves):
+    """
+    Submit each wave of legs concurrently, one wave after another.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        waves (list): List of waves. Each wave is a list whose items are either a
+            leg built by the *_leg functions or a list of legs to run in order;
+            a chain stops at its first failed leg.
+
+    Returns:
+        BatchResult: Acknowledgements and failures across all waves.
+    """
+    result = BatchResult()
+    model = metrics.current_model()
+
+    for wave in waves:
+        chains = [item if isinstance(item, list) else [item] for item in wave]
+        futures = [_executor.submit(_run_chain, session, chain, model) for chain in chains]
+        for future in futures:
+            acks, failure = future.result()
+            result.acks.extend(acks)
+            if failure is not None:
+                result.failures.append(failure)
+
+    return result
@@ -1,11 +1,31 @@
 import helper
+import threading
 import time
 import globals
-import re
+import headlines
+from news_feed import NewsFeed
+from news_store import NewsImpactStore
 
 # === MEMORY ===
 
-last_traded_news_id = None
+# New headlines are classified once (HeadlineEvent under 'event') and handed
+# to each news strategy exactly once
+news_feed = NewsFeed(parser=headlines.classify)
+
+# Historical price moves per headline category, from news_impact_log.csv.
+# A log or cache that can't be read leaves the store empty rather than
+# stopping the models from starting. The headline index is built here so
+# similar_news_trade only ever does a lookup.
+try:
+    impact_store = NewsImpactStore.load()
+except Exception as e:
+    print(f"[ERROR] Could not load the news impact store: {e}")
+    impact_store = NewsImpactStore()
+impact_store.build_index()
+
+# EIA_trade may run on the news listener thread, so the EIA trade state is
+# only touched under this lock
+eia_lock = threading.Lock()
 
 eia_active_trade = {
     "entry_tick": None,
@@ -22,176 +42,244 @@ other_active_trade = {
 POSITION_LIMIT = 100
 HOLD_TICKS = 20  # Number of ticks to hold after entry
 
+EIA_SENSITIVITY = 0.10  # Expected CL move in dollars per mln bbl surprise
+EIA_TRIGGER = 0.2       # Minimum expected move in dollars to trade
+TRADE_QUANTITY = 90     # CL-2F contracts per EIA trade, sent in three orders
+
+SIMILAR_HEADLINES = 5      # Past headlines consulted for a new headline
+MIN_SIMILARITY = 0.5       # Ignore past headlines less similar than this
+SIMILAR_TRIGGER = 0.3      # Minimum expected CL-2F move in dollars to trade
+SIMILAR_QUANTITY = 30
+# Off until the SIMILAR_* constants have been checked with backtest.py/sweep.py
+# (backtest.py --set fundamental.SIMILAR_TRADING=True);
+# until then similar headlines only log the move they expect
+SIMILAR_TRADING = False
+
 
 # === FUNCTIONS ===
 
-def EIA_trade(session):
+def EIA_trade(session, news, snapshot=None):
     """
     Executes trades based on the EIA (Energy Information Administration) report.
 
-    This function retrieves the latest news, checks if it is an EIA report, and calculates
+    This function checks if a new news item is an EIA report, and calculates
     the expected price movement based on the report's data. Depending on the calculated
     price movement, it places buy or sell orders for crude oil futures (CL-2F) while
     respecting position limits and trade quantity constraints.
 
     Args:
         session: The trading session object used to interact with the trading platform.
+        news (dict): New news item from the news feed, with its HeadlineEvent under 'event'.
+        snapshot (MarketSnapshot, optional): Market snapshot for this loop.
 
     Returns:
         None
     """
     
-    global last_traded_news_id, eia_active_trade
-
-    news_items = helper.get_latest_news(session)
+    global eia_active_trade
 
-    if not news_items:
-        print("No news available.")
-        return
-
-    latest_news = news_items[0]
-    news_id = latest_news.get('news_id')
-    headline = latest_news.get('headline', '').upper()
+    event = news['event']
 
-    if news_id == last_traded_news_id:
-        print("Already processed this news. Skipping.")
-        return
-
-    if "ACTUAL" not in headline or "FORECAST" not in headline:
+    if event.category != 'EIA':
         print("Latest news is not EIA report. Skipping.")
         return
 
-    difference = -1 * helper.fundamental_EIA_report(session)
-
-    if difference is None:
-        print("Failed to parse EIA report. Skipping.")
-        return
+    difference = -1 * event.surprise
 
     # Calculate expected price move
-    expected_price_move = difference * 0.10  # dollars
+    expected_price_move = difference * EIA_SENSITIVITY  # dollars
 
     print(f"EIA report difference: {difference:.2f} million barrels")
     print(f"Expected price move in CL: {expected_price_move:.2f} dollars")
 
-    # Check current position
-    net = helper.get_net_position(session)
-
-    
-    TRADE_QUANTITY = 90
+    with eia_lock:
+        # Check current position. Read live rather than from the snapshot, since
+        # earlier models in this loop may already have moved the net position.
+        net = helper.get_net_position(session)
 
+        if expected_price_move > EIA_TRIGGER:
+            # Bullish → Buy
+            max_allowed = (POSITION_LIMIT - net)
+            quantity = min(TRADE_QUANTITY, max_allowed)
+            quantity = quantity - quantity % 3
+            if quantity <= 0:
+                print(f"No room under the position limit (net {net}). No trade executed.")
+                return
 
-    
+        
+            helper.place_order(session,'CL-2F', quantity/3, 'BUY', 'MARKET')
+            helper.place_order(session,'CL-2F', quantity/3, 'BUY', 'MARKET')
+            helper.place_order(session,'CL-2F', quantity/3, 'BUY', 'MARKET')
+            print(f"Placed BUY order for {quantity} contracts of CL-2F.")
 
-    if expected_price_move > 0.2:
-        # Bullish → Buy
-        max_allowed = (POSITION_LIMIT - net)
-        quantity = min(TRADE_QUANTITY, max_allowed)
-        quantity = quantity - quantity % 3
+            eia_active_trade = {
+                "entry_tick": helper.get_tick(session, snapshot),
+                "side": 'BUY',
+                "quantity": quantity
+            }
 
+        elif expected_price_move < -EIA_TRIGGER:
+            # Bearish → Sell
         
-        helper.place_order(session,'CL-2F', quantity/3, 'BUY', 'MARKET')
-        helper.place_order(session,'CL-2F', quantity/3, 'BUY', 'MARKET')
-        helper.place_order(session,'CL-2F', quantity/3, 'BUY', 'MARKET')
-        print(f"Placed BUY order for {quantity} contracts of CL-2F.")
-
-        eia_active_trade = {
-            "entry_tick": helper.get_tick(session),
-            "side": 'BUY',
-            "quantity": quantity
-        }
-
-    elif expected_price_move < -0.2:
-        # Bearish → Sell
-        
-        max_allowed = (POSITION_LIMIT + net)
-        quantity = min(TRADE_QUANTITY, max_allowed)
-        quantity = quantity - quantity % 3
+            max_allowed = (POSITION_LIMIT + net)
+            quantity = min(TRADE_QUANTITY, max_allowed)
+            quantity = quantity - quantity % 3
+            if quantity <= 0:
+                print(f"No room under the position limit (net {net}). No trade executed.")
+                return
 
         
 
-        helper.place_order(session,'CL-2F', quantity/3, 'SELL', 'MARKET')
-        helper.place_order(session,'CL-2F', quantity/3, 'SELL', 'MARKET')
-        helper.place_order(session, 'CL-2F', quantity/3, 'SELL', 'MARKET')
-        print(f"Placed SELL order for {quantity} contracts of CL-2F.")
+            helper.place_order(session,'CL-2F', quantity/3, 'SELL', 'MARKET')
+            helper.place_order(session,'CL-2F', quantity/3, 'SELL', 'MARKET')
+            helper.place_order(session, 'CL-2F', quantity/3, 'SELL', 'MARKET')
+            print(f"Placed SELL order for {quantity} contracts of CL-2F.")
 
-        eia_active_trade = {
-            "entry_tick": helper.get_tick(session),
-            "side": 'SELL',
-            "quantity": quantity
-        }
+            eia_active_trade = {
+                "entry_tick": helper.get_tick(session, snapshot),
+                "side": 'SELL',
+                "quantity": quantity
+            }
 
-    else:
-        print("No significant price move expected. No trade executed.")
+        else:
+            print("No significant price move expected. No trade executed.")
 
-    # Mark news_id as processed
-    last_traded_news_id = news_id
 
 
+def pipeline_news(session, news, snapshot=None):
+    """
+    Pipeline news model: updates the cached pipeline lease cost when a
+    pipeline cost headline comes in.
+    """
 
-def pipeline_news(session):
+    event = news['event']
+    if event.category != 'PIPELINE_COST':
+        return
+
+    print("Pipeline news detected.")
+    print(f"{event.ticker} lease price updated to {event.cost}")
+    if event.ticker == "AK-CS-PIPE":
+        globals.AK_CS_PIPE = event.cost
+    elif event.ticker == "CS-NYC-PIPE":
+        globals.CS_NYC_PIPE = event.cost
+
+
+
+
+def news_impact(session, news, snapshot=None):
     """
-    Pipeline news model to check for any pipeline-related news.
-    Very simple model based on keyword 'PIPELINE'.
+    Log how CL-2F has historically moved after headlines of this category.
     """
+    event = news['event']
+    impact = impact_store.impact(event.category)
+    if impact is None:
+        return
+    print(f"[NEWS] {event.category}: past CL-2F move {impact['mean']:+.2f} "
+          f"(sd {impact['var'] ** 0.5:.2f}, n={impact['count']}, hit rate {impact['hit_rate']:.2f})")
 
-    news_items = helper.get_latest_news(session)
 
-    if news_items is None or len(news_items) == 0:
-        print("No news available.")
+def similar_news_trade(session, news, snapshot=None):
+    """
+    Trade CL-2F on headlines other than EIA and pipeline reports, in the
+    direction past similar headlines moved it.
+
+    The expected move is the similarity-weighted mean of the moves that
+    followed the closest logged headlines. A trade is only placed when all of
+    them moved the same way and the expected move clears SIMILAR_TRIGGER,
+    and only when SIMILAR_TRADING is on; otherwise the expected move is just
+    logged.
+    """
+    global other_active_trade
+
+    event = news['event']
+    if event.category in ('EIA', 'PIPELINE_COST') or other_active_trade["entry_tick"] is not None:
         return
 
-    latest_news = news_items[0]
-    if latest_news.get('ticker') == "AK-CS-PIPE":
-        print("Pipeline news detected.")
-        headline = latest_news.get('headline', '').upper()
-        match = re.search(r"\$?([\d,]+)", headline)
-        number_str = match.group(1)
-        number = int(number_str.replace(',', ''))
-        print(f"AK-CS-PIPE lease price updated to {number}")
-        globals.AK_CS_PIPE = number
-    if  latest_news.get('ticker') == "CS-NYC-PIPE":
-        print("Pipeline news detected.")
-        headline = latest_news.get('headline', '').upper()
-        match = re.search(r"\$?([\d,]+)", headline)
-        number_str = match.group(1)
-        number = int(number_str.replace(',', ''))
-        print(f"CS-NYC-PIPE lease price updated to {number}")
-        globals.CS_NYC_PIPE = number
+    matches = [(similarity, move) for similarity, _, move in impact_store.similar(news['headline'], SIMILAR_HEADLINES)
+               if similarity >= MIN_SIMILARITY]
+    if not matches:
+        return
 
+    weights = sum(similarity for similarity, _ in matches)
+    expected_price_move = sum(similarity * move for similarity, move in matches) / weights
+    agree = all(move * expected_price_move > 0 for _, move in matches)
+    print(f"[NEWS] {len(matches)} similar past headline(s), expected CL-2F move {expected_price_move:+.2f}")
 
-        
+    if not agree or abs(expected_price_move) < SIMILAR_TRIGGER:
+        return
+
+    side = 'BUY' if expected_price_move > 0 else 'SELL'
+    if not SIMILAR_TRADING:
+        print(f"[NEWS] Similar headlines suggest {side} CL-2F; similar-headline trading is off.")
+        return
+    net = helper.get_net_position(session)
+    max_allowed = POSITION_LIMIT - net if side == 'BUY' else POSITION_LIMIT + net
+    quantity = min(SIMILAR_QUANTITY, max_allowed)
+    if quantity <= 0:
+        print(f"No room under the position limit (net {net}). No trade executed.")
+        return
 
+    helper.place_order(session, 'CL-2F', quantity, side, 'MARKET')
+    print(f"Placed {side} order for {quantity} contracts of CL-2F on similar headlines.")
 
-def fundamental_model(session):
+    other_active_trade = {
+        "entry_tick": helper.get_tick(session, snapshot),
+        "side": side,
+        "quantity": quantity
+    }
+
+
+def fundamental_model(session, snapshot=None):
     """
     Main fundamental model function to call EIA and other news strategies,
     and manage closing positions.
     """
     global eia_active_trade, other_active_trade
 
-    current_tick = helper.get_tick(session)
+    current_tick = helper.get_tick(session, snapshot)
 
     # === Handle closing EIA trade ===
-    if eia_active_trade["entry_tick"] is not None:
-        if current_tick - eia_active_trade["entry_tick"] >= HOLD_TICKS:
-            print("Closing EIA trade after 20 ticks.")
+    with eia_lock:
+        if eia_active_trade["entry_tick"] is not None:
+            if current_tick - eia_active_trade["entry_tick"] >= HOLD_TICKS:
+                print("Closing EIA trade after 20 ticks.")
 
 
-            side = "BUY" if eia_active_trade["side"] == "SELL" else "SELL"
-            quantity = eia_active_trade["quantity"]
+                side = "BUY" if eia_active_trade["side"] == "SELL" else "SELL"
+                quantity = eia_active_trade["quantity"]
             
-            helper.place_order(session,'CL-2F', quantity/3, action=side, order_type='MARKET')
-            helper.place_order(session,'CL-2F', quantity/3, action=side, order_type='MARKET')
-            helper.place_order(session,'CL-2F', quantity/3, action=side, order_type='MARKET')
-            print(f"Closed EIA position: {side} {quantity} contracts of CL-2F.")
-
-            eia_active_trade = {
+                helper.place_order(session,'CL-2F', quantity/3, action=side, order_type='MARKET')
+                helper.place_order(session,'CL-2F', quantity/3, action=side, order_type='MARKET')
+                helper.place_order(session,'CL-2F', quantity/3, action=side, order_type='MARKET')
+                print(f"Closed EIA position: {side} {quantity} contracts of CL-2F.")
+
+                eia_active_trade = {
+                    "entry_tick": None,
+                    "side": None,
+                    "quantity": 0
+                }
+
+    # === Handle closing similar-headline trade ===
+    if other_active_trade["entry_tick"] is not None:
+        if current_tick - other_active_trade["entry_tick"] >= HOLD_TICKS:
+            side = "BUY" if other_active_trade["side"] == "SELL" else "SELL"
+            quantity = other_active_trade["quantity"]
+
+            helper.place_order(session, 'CL-2F', quantity, action=side, order_type='MARKET')
+            print(f"Closed similar-headline position: {side} {quantity} contracts of CL-2F.")
+
+            other_active_trade = {
                 "entry_tick": None,
                 "side": None,
                 "quantity": 0
             }
 
+    # === Try to open new trades on any new headlines ===
+    if not news_feed.poll(session, snapshot):
+        print("No new news.")
+
 
-    # === Try to open new trades ===
-    EIA_trade(session)
-    pipeline_news(session)
+news_feed.subscribe(EIA_trade, urgent=True)
+news_feed.subscribe(pipeline_news)
+news_feed.subscribe(news_impact)
+news_feed.subscribe(similar_news_trade)
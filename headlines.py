@@ -0,0 +1,119 @@
+"""
+headlines.py
+
+Headline classifier for the news models. A single precompiled pattern maps
+each headline to a typed HeadlineEvent in one pass: EIA inventory reports,
+pipeline cost changes, and the recurring supply, demand and macro
+headlines seen in news_impact_log.csv.
+
+Usage:
+    python headlines.py          # benchmark over news_impact_log.csv
+"""
+
+import csv
+import re
+import time
+from collections import Counter, namedtuple
+
+NEWS_LOG_FILE = "news_impact_log.csv"
+
+HeadlineEvent = namedtuple(
+    'HeadlineEvent',
+    ['category', 'direction', 'ticker', 'actual', 'forecast', 'surprise', 'cost'],
+    defaults=(0, None, None, None, None, None),
+)
+HeadlineEvent.__doc__ = """
+Classified headline.
+
+category (str): EIA, PIPELINE_COST, SUPPLY_DISRUPTION, SUPPLY_GROWTH,
+    DEMAND_UP, DEMAND_DOWN, RISK_ON, RISK_OFF, REFINERY or OTHER.
+direction (int): Expected sign of the crude price move (+1, -1 or 0).
+ticker (str): Affected ticker ('CL' or a pipeline lease ticker).
+actual, forecast, surprise (float): EIA inventory change in mln bbls,
+    builds positive and draws negative; surprise = actual - forecast.
+cost (int): New pipeline lease cost.
+"""
+
+# Keyword groups for headlines without numbers, with the expected crude direction
+KEYWORD_CATEGORIES = {
+    'SUPPLY_DISRUPTION': (+1, [r'NIGERIA', r'HORMUZ', r'PIRATES', r'SYRIA', r'SUDAN', r'NIGER DELTA',
+                               r'REVOKES DRILLING', r'INSURANCE PREMIUMS', r'DEPLETING RESOURCES']),
+    'SUPPLY_GROWTH': (-1, [r'NEW OIL PROJECT', r'OIL WELLS FOUND', r'REPAIRS SUCCESSFULLY COMPLETED']),
+    'DEMAND_UP': (+1, [r'WEATHER', r'FREEZES']),
+    'DEMAND_DOWN': (-1, [r'SOLAR POWERED', r'ELECTRIC CARS']),
+    'RISK_ON': (+1, [r'S&P 500 GAINS', r'EURO RECOVERS']),
+    'RISK_OFF': (-1, [r'DOLLAR CONTINUES TO STRENGTHEN', r'STOCKS TUMBLE', r'EUR/USD DROPS', r'DEFAULT']),
+    'REFINERY': (0, [r'REFINERY']),
+}
+
+DIRECTIONS = {category: direction for category, (direction, _) in KEYWORD_CATEGORIES.items()}
+CATEGORIES = ('OTHER', 'EIA', 'PIPELINE_COST') + tuple(KEYWORD_CATEGORIES)
+
+_PATTERN = re.compile(
+    r"(?P<EIA>ACTUAL (?P<actual_kind>DRAW|BUILD) (?P<actual>\d+(?:\.\d+)?) MLN BBLS"
+    r" VS FORECAST (?P<forecast_kind>DRAW|BUILD) (?P<forecast>\d+(?:\.\d+)?))"
+    r"|(?P<PIPELINE_COST>PIPELINE COST FOR (?P<route>ALASKA|CUSHING)\D*\$(?P<cost>[\d,]+))"
+    + "".join(f"|(?P<{category}>{'|'.join(keywords)})" for category, (_, keywords) in KEYWORD_CATEGORIES.items())
+)
+
+PIPELINE_TICKERS = {'ALASKA': 'AK-CS-PIPE', 'CUSHING': 'CS-NYC-PIPE'}
+
+OTHER = HeadlineEvent('OTHER')
+
+
+def classify(headline):
+    """
+    Classify a headline into a typed event.
+
+    Args:
+        headline (str): News headline.
+
+    Returns:
+        HeadlineEvent: The classified event; category 'OTHER' if nothing matched.
+    """
+    match = _PATTERN.search(headline.upper())
+    if match is None:
+        return OTHER
+
+    category = match.lastgroup
+    if match.group('EIA'):
+        actual = float(match.group('actual')) * (-1 if match.group('actual_kind') == 'DRAW' else 1)
+        forecast = float(match.group('forecast')) * (-1 if match.group('forecast_kind') == 'DRAW' else 1)
+        surprise = actual - forecast
+        # A smaller build / bigger draw than forecast is bullish for crude
+        direction = (surprise < 0) - (surprise > 0)
+        return HeadlineEvent('EIA', direction, 'CL', actual, forecast, surprise)
+    if match.group('PIPELINE_COST'):
+        cost = int(match.group('cost').replace(',', ''))
+        return HeadlineEvent('PIPELINE_COST', 0, PIPELINE_TICKERS[match.group('route')], cost=cost)
+
+    return HeadlineEvent(category, DIRECTIONS[category], 'CL')
+
+
+def load_logged_headlines(path=NEWS_LOG_FILE):
+    # The log holds one row per followed ticker; every headline has a CL-2F row
+    with open(path, newline='') as file:
+        return [row['headline'] for row in csv.DictReader(file) if row.get('ticker', 'CL-2F') == 'CL-2F']
+
+
+def benchmark(headlines, repeat=1000):
+    """
+    Time classify() over a list of headlines.
+
+    Returns:
+        float: Mean microseconds per headline.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for headline in headlines:
+            classify(headline)
+    return (time.perf_counter() - start) / (repeat * len(headlines)) * 1e6
+
+
+if __name__ == "__main__":
+    logged = load_logged_headlines()
+    counts = Counter(classify(headline).category for headline in logged)
+    print(f"Classified {len(logged)} logged headlines:")
+    for category, count in counts.most_common():
+        print(f"  {category:<18} {count}")
+    print(f"Mean classification time: {benchmark(logged):.2f} us per headline")
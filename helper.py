@@ -8,23 +8,60 @@ and refinery operations.
 
 import requests
 import re
+import time
+import numpy as np
+import headlines
+import metrics
 from config import API_BASE_URL
 
+# --- Request Function ---
+
+def api_request(session, method, path, params=None):
+    """
+    Send a request to the trading API, recording its latency and outcome in metrics.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        method (str): HTTP method ('GET', 'POST' or 'DELETE').
+        path (str): Endpoint path below the API base URL (e.g. '/securities/book').
+        params (dict, optional): Query parameters.
+
+    Returns:
+        requests.Response: Raw API response.
+    """
+
+    start = time.perf_counter()
+    try:
+        resp = session.request(method, f'{API_BASE_URL}{path}', params=params)
+    except Exception:
+        metrics.record(method, path, time.perf_counter() - start, error=True)
+        raise
+
+    metrics.record(method, path, time.perf_counter() - start, error=not resp.ok)
+    return resp
+
+
 # --- Data Retrieval Functions ---
 
-def get_position_ticker(session, ticker):
+def get_position_ticker(session, ticker, snapshot=None):
     """
     Get the current position (inventory) for a specific security.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
         ticker (str): Security ticker symbol.
+        snapshot (MarketSnapshot, optional): Read from this snapshot instead of the API.
 
     Returns:
         int: Number of units currently held (can be negative for short positions).
     """
 
-    resp = session.get(f'{API_BASE_URL}/securities')
+    if snapshot is not None:
+        if ticker not in snapshot.positions:
+            raise ApiException(f"Ticker {ticker} not found in securities list.")
+        return snapshot.positions[ticker]
+
+    resp = api_request(session, 'GET', '/securities')
     if not resp.ok:
         raise ApiException(f"Failed to get securities list: {resp.text}")
     
@@ -35,12 +72,13 @@ def get_position_ticker(session, ticker):
     
     raise ApiException(f"Ticker {ticker} not found in securities list.")
 
-def get_positions(session):
+def get_positions(session, snapshot=None):
     """
     Retrieve the current positions for all securities.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Read from this snapshot instead of the API.
 
     Returns:
         dict: Dictionary of ticker symbols and their corresponding positions.
@@ -49,7 +87,10 @@ def get_positions(session):
         ApiException: If the request fails.
     """
 
-    resp = session.get(f'{API_BASE_URL}/securities')
+    if snapshot is not None:
+        return dict(snapshot.positions)
+
+    resp = api_request(session, 'GET', '/securities')
     if not resp.ok:
         raise ApiException(f"Failed to get securities list: {resp.text}")
     
@@ -60,13 +101,42 @@ def get_positions(session):
 
 
 
-def ticker_bid_ask(session, ticker):
+def get_book(session, ticker, snapshot=None):
+    """
+    Retrieve the full order book for a given security.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        ticker (str): Security ticker symbol.
+        snapshot (MarketSnapshot, optional): Read the book from this snapshot if it holds one for the ticker.
+
+    Returns:
+        dict: Book with 'bids' and 'asks' lists, best price first.
+
+    Raises:
+        ApiException: If the request fails.
+    """
+
+    book = snapshot.book(ticker) if snapshot is not None else None
+    if book is None:
+        params = {'ticker': ticker}
+        resp = api_request(session, 'GET', '/securities/book', params=params)
+        if not resp.ok:
+            raise ApiException(f"Failed to get book for {ticker}: {resp.text}")
+
+        book = resp.json()
+
+    return book
+
+
+def ticker_bid_ask(session, ticker, snapshot=None):
     """
     Retrieve the best bid and ask prices for a given security.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
         ticker (str): Security ticker symbol.
+        snapshot (MarketSnapshot, optional): Read the book from this snapshot if it holds one for the ticker.
 
     Returns:
         tuple: (best_bid_price (float), best_ask_price (float)).
@@ -75,12 +145,7 @@ def ticker_bid_ask(session, ticker):
         ApiException: If the request fails.
     """
 
-    params = {'ticker': ticker}
-    resp = session.get(f'{API_BASE_URL}/securities/book', params=params)
-    if not resp.ok:
-        raise ApiException(f"Failed to get book for {ticker}: {resp.text}")
-    
-    book = resp.json()
+    book = get_book(session, ticker, snapshot)
     bids = book.get('bids', [])
     asks = book.get('asks', [])
     
@@ -90,12 +155,45 @@ def ticker_bid_ask(session, ticker):
     return bids[0]['price'], asks[0]['price']
 
 
-def get_tick(session):
+def get_quotes(session, tickers, snapshot=None):
+    """
+    Retrieve the best bid and ask for several securities with one request.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        tickers (list): Security ticker symbols.
+        snapshot (MarketSnapshot, optional): Read from this snapshot instead of the API.
+
+    Returns:
+        dict: Ticker -> (best_bid_price (float), best_ask_price (float)).
+
+    Raises:
+        ApiException: If the request fails or a ticker is missing.
+    """
+
+    if snapshot is not None:
+        securities_list = snapshot.securities
+    else:
+        resp = api_request(session, 'GET', '/securities')
+        if not resp.ok:
+            raise ApiException(f"Failed to get securities list: {resp.text}")
+        securities_list = resp.json()
+
+    quotes = {security['ticker']: (security.get('bid'), security.get('ask')) for security in securities_list}
+    missing = [ticker for ticker in tickers if ticker not in quotes]
+    if missing:
+        raise ApiException(f"No quotes available for tickers {missing}.")
+
+    return {ticker: quotes[ticker] for ticker in tickers}
+
+
+def get_tick(session, snapshot=None):
     """
     Get the current simulation tick (time step).
 
     Args:
         session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Read from this snapshot instead of the API.
 
     Returns:
         int: Current tick number.
@@ -104,7 +202,10 @@ def get_tick(session):
         ApiException: If the request fails.
     """
 
-    resp = session.get(f'{API_BASE_URL}/case')
+    if snapshot is not None:
+        return snapshot.tick
+
+    resp = api_request(session, 'GET', '/case')
     if not resp.ok:
         raise ApiException(f"Failed to get case info: {resp.text}")
     
@@ -128,7 +229,7 @@ def get_orders(session, status):
     """
 
     params = {'status': status}
-    resp = session.get(f'{API_BASE_URL}/orders', params=params)
+    resp = api_request(session, 'GET', '/orders', params=params)
     if not resp.ok:
         raise ApiException(f"Failed to get orders with status {status}: {resp.text}")
     
@@ -149,19 +250,20 @@ def get_nlv(session):
         ApiException: If the request fails.
     """
 
-    resp = session.get(f'{API_BASE_URL}/trader')
+    resp = api_request(session, 'GET', '/trader')
     if not resp.ok:
         raise ApiException(f"Failed to get trader info: {resp.text}")
     
     trader_info = resp.json()
     return trader_info.get('nlv', 0.0)
 
-def get_net_position(session):
+def get_net_position(session, snapshot=None):
     """
     Get the trader's current net position across all securities.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Read from this snapshot instead of the API.
 
     Returns:
         dict: Dictionary of ticker symbols and their corresponding net positions.
@@ -170,7 +272,10 @@ def get_net_position(session):
         ApiException: If the request fails.
     """
 
-    resp = session.get(f'{API_BASE_URL}/limits')
+    if snapshot is not None:
+        return snapshot.net_position
+
+    resp = api_request(session, 'GET', '/limits')
     if not resp.ok:
         raise ApiException(f"Failed to get securities list: {resp.text}")
     
@@ -194,7 +299,7 @@ def get_portfolio(session):
         ApiException: If the request fails.
     """
 
-    resp = session.get(f'{API_BASE_URL}/trader')
+    resp = api_request(session, 'GET', '/trader')
     if not resp.ok:
         raise ApiException(f"Failed to get trader info: {resp.text}")
     
@@ -203,7 +308,7 @@ def get_portfolio(session):
 
 # --- Order Management Functions ---
 
-def place_order(session, ticker, quantity, action, order_type='MARKET'):
+def place_order(session, ticker, quantity, action, order_type='MARKET', price=None):
     """
     Submit a new order to the exchange.
 
@@ -212,6 +317,8 @@ def place_order(session, ticker, quantity, action, order_type='MARKET'):
         ticker (str): Security ticker symbol.
         quantity (int): Number of contracts to trade.
         side (str): 'BUY' or 'SELL'.
+        order_type (str): 'MARKET' or 'LIMIT'.
+        price (float, optional): Limit price, required for LIMIT orders.
 
     Returns:
         dict: API response containing order details.
@@ -226,8 +333,10 @@ def place_order(session, ticker, quantity, action, order_type='MARKET'):
         'action': action,
         'type': order_type,
     }
+    if price is not None:
+        payload['price'] = price
 
-    resp = session.post(f'{API_BASE_URL}/orders', params=payload)
+    resp = api_request(session, 'POST', '/orders', params=payload)
 
     if not resp.ok:
         raise ApiException(f"Failed to place order for {ticker}: {resp.text}")
@@ -251,13 +360,36 @@ def cancel_order(session, order_id):
         ApiException: If the request fails.
     """
 
-    resp = session.delete(f'{API_BASE_URL}/orders/{order_id}')
+    resp = api_request(session, 'DELETE', f'/orders/{order_id}')
     if not resp.ok:
         raise ApiException(f"Failed to cancel order {order_id}: {resp.text}")
     
     return resp.json()
 
 
+def cancel_orders(session, order_ids):
+    """
+    Cancel several open orders in a single request.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        order_ids (list): Identifiers of the orders to cancel.
+
+    Returns:
+        list: IDs of the orders that were cancelled.
+    
+    Raises:
+        ApiException: If the request fails.
+    """
+
+    ids = ','.join(str(order_id) for order_id in order_ids)
+    resp = api_request(session, 'POST', '/commands/cancel', params={'ids': ids})
+    if not resp.ok:
+        raise ApiException(f"Failed to cancel orders {ids}: {resp.text}")
+    
+    return resp.json().get('cancelled_order_ids', [])
+
+
 # --- Storage and Refining Functions ---
 
 def lease_storage(session, ticker):
@@ -275,9 +407,9 @@ def lease_storage(session, ticker):
         ApiException: If the request fails.
     """
 
-    resp = session.post(f'{API_BASE_URL}/leases', params={'ticker': ticker})
+    resp = api_request(session, 'POST', '/leases', params={'ticker': ticker})
     if not resp.ok:
-        raise ApiException(f"Failed to lease storage for {ticker}: {resp.text}")
+        raise ApiException(f"Failed to lease {ticker}: {resp.text}")
     
     return resp.json()
 
@@ -297,14 +429,60 @@ def lease_refinery(session):
         ApiException: If the request fails.
     """
 
-    resp = session.post(f'{API_BASE_URL}/leases', params={'ticker': 'CL-REFINERY'})
+    resp = api_request(session, 'POST', '/leases', params={'ticker': 'CL-REFINERY'})
     if not resp.ok:
-        raise ApiException("Failed to lease refinery: {resp.text}")
+        raise ApiException(f"Failed to lease refinery: {resp.text}")
     
     return resp.json()
 
 
-def use_refinery(session, from_ticker, quantity):
+def get_leases(session, snapshot=None):
+    """
+    Get all open leases.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Read leases from this snapshot instead of the API.
+
+    Returns:
+        list: Lease dicts as returned by /leases.
+
+    Raises:
+        ApiException: If the request fails.
+    """
+
+    if snapshot is not None:
+        return snapshot.leases
+
+    resp = api_request(session, 'GET', '/leases')
+    if not resp.ok:
+        raise ApiException(f"Failed to get leases: {resp.text}")
+    return resp.json()
+
+
+def release_lease(session, lease_id):
+    """
+    Close a lease.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        lease_id (int): ID of the lease to close.
+
+    Returns:
+        dict: API response confirming lease closure.
+
+    Raises:
+        ApiException: If the request fails.
+    """
+
+    resp = api_request(session, 'DELETE', f'/leases/{lease_id}')
+    if not resp.ok:
+        raise ApiException(f"Failed to close lease {lease_id}: {resp.text}")
+
+    return resp.json()
+
+
+def use_refinery(session, from_ticker, quantity, lease_id=None, snapshot=None):
     """
     Send crude oil to the leased refinery for processing.
 
@@ -312,23 +490,23 @@ def use_refinery(session, from_ticker, quantity):
         session (requests.Session): Authenticated session for API requests.
         from_ticker (str): Ticker of the input commodity (e.g., 'CL').
         quantity (int): Amount to refine.
+        lease_id (int, optional): Refinery lease to use; the first CL-REFINERY lease if None.
+        snapshot (MarketSnapshot, optional): Read leases from this snapshot instead of the API.
 
     Returns:
         dict: API response confirming processing order.
     
     Raises:
-        ApiException: If the request fails.
+        ApiException: If there is no refinery lease or the request fails.
     """
 
-    resp = session.get(f'{API_BASE_URL}/leases', params={'ticker': 'CL-REFINERY'})
-    leaseinfo = resp.json()
+    if lease_id is None:
+        _, lease_id, _ = get_refinery_lease_info(session, snapshot)
+        if lease_id is None:
+            raise ApiException(f"Failed to use refinery for {from_ticker}: no refinery lease")
 
     payload = {'from1': from_ticker, 'quantity1': quantity}
-    for x in leaseinfo:
-        if "CL-REFINERY" in x['ticker']:
-            leaseid = x['id']
-            print(leaseid)
-            session.post(f'{API_BASE_URL}/leases/{leaseid}', params=payload)
+    resp = api_request(session, 'POST', f"/leases/{lease_id}", params=payload)
     if not resp.ok:
         raise ApiException(f"Failed to use refinery for {from_ticker}: {resp.text}")
     
@@ -337,156 +515,105 @@ def use_refinery(session, from_ticker, quantity):
 
 
 
-def close_unused_storage_leases(session):
+def close_unused_storage_leases(session, snapshot=None):
     """
     Terminate storage leases where the containment usage is zero.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Read leases from this snapshot instead of the API.
 
     Returns:
         list: List of successfully closed lease IDs.
     
     Raises:
-        ApiException: If the request fails.
+        ApiException: If the leases could not be fetched.
     """
 
-    resp = session.get(f'{API_BASE_URL}/leases')
-    if not resp.ok:
-        raise ApiException(f"Failed to get leases: {resp.text}")
-    
-    lease_info = resp.json()
     closed_lease_ids = []
-    for lease in lease_info:
-        if lease.get('containment_usage', 0) == 0:
-            lease_id = lease['id']
-            resp = session.delete(f'{API_BASE_URL}/leases/{lease_id}')
+    for lease in get_leases(session, snapshot):
+        if lease['ticker'].endswith('-STORAGE') and not lease.get('containment_usage'):
+            resp = api_request(session, 'DELETE', f"/leases/{lease['id']}")
             if resp.ok:
-                closed_lease_ids.append(lease_id)
-    
+                closed_lease_ids.append(lease['id'])
     return closed_lease_ids
 
 
 
-def get_refinery_lease_info(session):
+def get_refinery_lease_info(session, snapshot=None):
     """
     Get refinery lease ID and next lease renewal tick.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Read leases from this snapshot instead of the API.
 
     Returns:
-        tuple: (lease_id (int), next_lease_tick (int)).
+        tuple: (refinery leased (bool), lease_id (int), next_lease_tick (int)).
     
     Raises:
         ApiException: If the request fails.
     """
 
-    resp = session.get(f'{API_BASE_URL}/leases')
-    if not resp.ok:
-        raise ApiException(f"Failed to get leases: {resp.text}")
-    
-    lease_info = resp.json()
-    for lease in lease_info:
+    for lease in get_leases(session, snapshot):
         if lease['ticker'] == 'CL-REFINERY':
-            lease_id = lease['id']
-            lease_finish = lease['next_lease_tick']
-            return True, lease_id, lease_finish
-    else:
-        return False, None, None  # No refinery lease found
+            return True, lease['id'], lease['next_lease_tick']
+    return False, None, None  # No refinery lease found
     
 
 
 
-def wait_and_close_refinery(session, lease_id, lease_finish_tick):
-    """
-    Wait until one tick before refinery lease renewal and then close the lease.
-
-    Args:
-        session (requests.Session): Authenticated session for API requests.
-        lease_id (int): ID of the refinery lease to close.
-        lease_finish_tick (int): Next renewal tick.
-
-    Returns:
-        dict: API response confirming lease closure.
-    
-    Raises:
-        ApiException: If the request fails.
-    """
-
-    current_tick = get_tick(session)
-    while current_tick < lease_finish_tick - 1:
-        current_tick = get_tick(session)
-    
-    resp = session.delete(f'{API_BASE_URL}/leases/{lease_id}')
-    if not resp.ok:
-        raise ApiException(f"Failed to close refinery lease {lease_id}: {resp.text}")
-    
-    return resp.json()
-
-def close_refinery(session, lease_id):
+def close_refinery(session, lease_id=None, snapshot=None):
     """
     Close the refinery lease.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
-        lease_id (int): ID of the refinery lease to close.
+        lease_id (int, optional): ID of the refinery lease to close; every
+            CL-REFINERY lease if None.
+        snapshot (MarketSnapshot, optional): Read leases from this snapshot instead of the API.
 
     Returns:
-        dict: API response confirming lease closure.
+        list: IDs of the closed leases.
     
     Raises:
-        ApiException: If the request fails.
+        ApiException: If a lease could not be closed.
     """
     if lease_id is None:
-        resp = session.get(f'{API_BASE_URL}/leases')
-        if not resp.ok:
-            raise ApiException(f"Failed to get leases: {resp.text}")
-        
-        lease_info = resp.json()
-        for lease in lease_info:
-            if lease['ticker'] == 'CL-REFINERY':
-                lease_id = lease['id']
-                resp = session.delete(f'{API_BASE_URL}/leases/{lease_id}')
-    
+        lease_ids = [lease['id'] for lease in get_leases(session, snapshot) if lease['ticker'] == 'CL-REFINERY']
     else:
-        resp = session.delete(f'{API_BASE_URL}/leases/{lease_id}')
-        if not resp.ok:
-            raise ApiException(f"Failed to close refinery lease {lease_id}: {resp.text}")
-    
-    return resp.json()
+        lease_ids = [lease_id]
 
-def close_empty_leases(session):
+    for refinery_id in lease_ids:
+        release_lease(session, refinery_id)
+    return lease_ids
+
+def close_empty_leases(session, snapshot=None, keep=()):
     """
     Close any empty leases in the system.
 
+    See LeaseManager.close_empty for the version that keeps claimed and
+    reusable storage open.
+
     Args:
         session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Read leases from this snapshot instead of the API.
+        keep (iterable, optional): Lease ids to leave open even if empty.
 
     Returns:
         list: List of successfully closed lease IDs.
     
     Raises:
-        ApiException: If the request fails.
+        ApiException: If the leases could not be fetched.
     """
 
-    resp = session.get(f'{API_BASE_URL}/leases')
-    if not resp.ok:
-        raise ApiException(f"Failed to get leases: {resp.text}")
-    
-    lease_info = resp.json()
     closed_lease_ids = []
-    for lease in lease_info:
-        if lease.get('containment_usage', 0) == None:
-            lease_id = lease['id']
-            resp = session.delete(f'{API_BASE_URL}/leases/{lease_id}')
-            if resp.ok:
-                closed_lease_ids.append(lease_id)
-        if lease.get('containment_usage', 0) == 0:
-            lease_id = lease['id']
-            resp = session.delete(f'{API_BASE_URL}/leases/{lease_id}')
-            if resp.ok:
-                closed_lease_ids.append(lease_id)
+    for lease in get_leases(session, snapshot):
+        if lease['id'] in keep or lease.get('containment_usage'):
+            continue
+        resp = api_request(session, 'DELETE', f"/leases/{lease['id']}")
+        if resp.ok:
+            closed_lease_ids.append(lease['id'])
     return closed_lease_ids
 
 # -- Fundamental (News) Functions --
@@ -507,19 +634,40 @@ def extract_number_from_text(text):
     else:
         raise ValueError(f"No number found in text: {text}")
 
-def get_latest_news(session):
+def get_latest_news(session, since=None):
     """
     Fetch the most recent news items.
 
     Args:
         session (requests.Session): Authenticated session.
+        since (int, optional): Only return items with a news_id after this one.
 
     Returns:
-        list: List of news dictionaries.
+        list: List of news dictionaries, newest first.
     """
-    resp = session.get(f"{API_BASE_URL}/news")
+    params = {'since': since} if since is not None else None
+    resp = api_request(session, 'GET', '/news', params=params)
     resp.raise_for_status()
     return resp.json()
+
+
+def parse_EIA_headline(headline):
+    """
+    Parse an EIA report headline into the difference between actual and forecast.
+
+    Args:
+        headline (str): News headline, e.g. "WEEK 1 ACTUAL DRAW 14 MLN BBLS VS FORECAST DRAW 5 MLN BBLS".
+
+    Returns:
+        float: Actual minus forecast, with draws negative and builds positive.
+        None: If the headline is not a parseable EIA report.
+    """
+    event = headlines.classify(headline)
+    if event.category != 'EIA':
+        return None
+    return event.surprise
+
+
 def fundamental_EIA_report(session):
     """
     Parse the latest EIA report headline and return the difference between actual and forecast.
@@ -535,34 +683,9 @@ def fundamental_EIA_report(session):
     news_items = get_latest_news(session)
 
     for news in news_items:
-        headline = news.get("headline", "").upper()
-
-        if "ACTUAL" in headline and "FORECAST" in headline:
-            try:
-                # Example format: "WEEK 1 ACTUAL DRAW 14 MLN BBLS VS FORECAST DRAW 5 MLN BBLS"
-                actual_str = headline.split("ACTUAL")[1].split("VS")[0].strip()
-                forecast_str = headline.split("FORECAST")[1].strip()
-
-                # Find numbers in each section
-                actual_number = extract_number_from_text(actual_str)
-                forecast_number = extract_number_from_text(forecast_str)
-
-                # Determine if it was a DRAW or BUILD
-                if "DRAW" in actual_str:
-                    actual = -actual_number  # Draw = negative
-                else:
-                    actual = actual_number   # Build = positive
-
-                if "DRAW" in forecast_str:
-                    forecast = -forecast_number
-                else:
-                    forecast = forecast_number
-
-                return actual - forecast
-
-            except Exception as e:
-                print(f"Failed to parse EIA report: {e}")
-                return None
+        difference = parse_EIA_headline(news.get("headline", ""))
+        if difference is not None:
+            return difference
 
     return None
 
@@ -592,7 +715,7 @@ def lease_use_transport(session, ticker, from1, quantity):
         'quantity1': quantity,
     }
 
-    resp = session.post(f'{API_BASE_URL}/leases', params=payload)
+    resp = api_request(session, 'POST', '/leases', params=payload)
     
     if not resp.ok:
         raise ApiException(f"Failed to lease transport for {ticker}: {resp.text}")
@@ -601,6 +724,88 @@ def lease_use_transport(session, ticker, from1, quantity):
 
 
 
+# --- Order Book Depth ---
+
+class OrderBook:
+    """
+    Full-depth order book for one security, held as price and size arrays per side.
+    """
+
+    def __init__(self, ticker, book):
+        self.ticker = ticker
+        self.bid_prices, self.bid_sizes = self._side_arrays(book.get('bids', []))
+        self.ask_prices, self.ask_sizes = self._side_arrays(book.get('asks', []))
+
+    @staticmethod
+    def _side_arrays(levels):
+        prices = np.array([level['price'] for level in levels], dtype=float)
+        sizes = np.array([level['quantity'] - level.get('quantity_filled', 0) for level in levels], dtype=float)
+        return prices, sizes
+
+    def estimate_fill(self, action, quantity):
+        """
+        Estimate the average price of a market order walking the book.
+
+        Args:
+            action (str): 'BUY' (fills against asks) or 'SELL' (fills against bids).
+            quantity (int): Number of contracts to trade.
+
+        Returns:
+            tuple: (expected VWAP (float), slippage versus the best price (float)).
+                Quantity beyond the visible depth is priced at the last level.
+
+        Raises:
+            ApiException: If that side of the book is empty.
+        """
+
+        prices, sizes = (self.ask_prices, self.ask_sizes) if action == 'BUY' else (self.bid_prices, self.bid_sizes)
+        if prices.size == 0:
+            raise ApiException(f"No {'asks' if action == 'BUY' else 'bids'} available for ticker {self.ticker}.")
+
+        filled_before = np.cumsum(sizes) - sizes
+        taken = np.clip(quantity - filled_before, 0, sizes)
+        taken[-1] += max(quantity - taken.sum(), 0)
+
+        vwap = float(np.dot(taken, prices) / quantity)
+        return vwap, float(abs(vwap - prices[0]))
+
+
+def get_order_book(session, ticker, snapshot=None):
+    """
+    Retrieve the full-depth order book for a given security.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        ticker (str): Security ticker symbol.
+        snapshot (MarketSnapshot, optional): Read the book from this snapshot if it holds one for the ticker.
+
+    Returns:
+        OrderBook: Order book with full depth.
+    """
+
+    if snapshot is not None and snapshot.book(ticker) is not None:
+        return snapshot.order_book(ticker)
+    return OrderBook(ticker, get_book(session, ticker))
+
+
+def estimate_fill(session, ticker, action, quantity, snapshot=None):
+    """
+    Estimate the VWAP and slippage of a market order for a given security.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        ticker (str): Security ticker symbol.
+        action (str): 'BUY' or 'SELL'.
+        quantity (int): Number of contracts to trade.
+        snapshot (MarketSnapshot, optional): Read the book from this snapshot if it holds one for the ticker.
+
+    Returns:
+        tuple: (expected VWAP (float), slippage versus the best price (float)).
+    """
+
+    return get_order_book(session, ticker, snapshot).estimate_fill(action, quantity)
+
+
 # --- Error Handling Class ---
 
 class ApiException(Exception):
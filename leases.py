@@ -0,0 +1,335 @@
+"""
+leases.py
+
+Lease manager. Open leases are held in a local registry indexed by id,
+ticker and next_lease_tick, refreshed at most once per tick (from the
+tick's snapshot when there is one), so lease lookups never hit /leases.
+New leases and closes are submitted as concurrent batches through
+execution.
+
+Storage leases are shared: a model claims the capacity it needs with
+ensure_storage for as long as it needs it, and an empty tank nobody has
+claimed is kept open for reuse until just before its next renewal instead
+of being closed at once and leased again later.
+"""
+
+import clock
+import execution
+import helper
+
+REFINERY = 'CL-REFINERY'
+RENEWAL_MARGIN_TICKS = 1  # Close idle storage this many ticks before it renews
+STORAGE_ATTEMPTS = 2      # Lease rounds ensure_storage makes before giving up on missing capacity
+
+# Units held by one storage lease
+STORAGE_CAPACITY = {'CL-STORAGE': 10, 'AK-STORAGE': 10, 'NYC-STORAGE': 10}
+DEFAULT_STORAGE_CAPACITY = 10
+
+
+class LeaseManager:
+    """
+    Registry of open leases with batched lease and close operations.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.by_id = {}
+        self.by_ticker = {}
+        self.by_renewal = {}
+        self.claims = {}  # Lease id -> owner
+        self.tick = None
+
+    # --- Registry ---
+
+    def _add(self, lease):
+        self.by_id[lease['id']] = lease
+        self.by_ticker.setdefault(lease['ticker'], []).append(lease['id'])
+        self.by_renewal.setdefault(lease.get('next_lease_tick'), set()).add(lease['id'])
+
+    def _remove(self, lease_id):
+        lease = self.by_id.pop(lease_id, None)
+        if lease is None:
+            return
+        self.by_ticker[lease['ticker']].remove(lease_id)
+        self.by_renewal[lease.get('next_lease_tick')].discard(lease_id)
+        self.claims.pop(lease_id, None)
+
+    def refresh(self, session, snapshot=None):
+        """
+        Reload the registry, at most once per tick.
+
+        Leases come from the snapshot when one is given, otherwise from
+        /leases; without a snapshot or a running case clock every call
+        reloads.
+
+        Args:
+            session (requests.Session): Authenticated session for API requests.
+            snapshot (MarketSnapshot, optional): Market snapshot for this tick.
+        """
+        tick = snapshot.tick if snapshot is not None else clock.case_clock.last_tick
+        if tick is not None and tick == self.tick:
+            return
+
+        leases = helper.get_leases(session, snapshot)
+        claims = self.claims
+        self.reset()
+        for lease in leases:
+            self._add(lease)
+        self.claims = {lease_id: owner for lease_id, owner in claims.items() if lease_id in self.by_id}
+        self.tick = tick
+
+    def get(self, lease_id):
+        return self.by_id.get(lease_id)
+
+    def find(self, ticker):
+        """
+        Return the open leases of a ticker, oldest first.
+        """
+        return [self.by_id[lease_id] for lease_id in self.by_ticker.get(ticker, ())]
+
+    def first(self, ticker):
+        """
+        Return the oldest open lease of a ticker, or None.
+        """
+        ids = self.by_ticker.get(ticker)
+        return self.by_id[ids[0]] if ids else None
+
+    def renewing_by(self, tick):
+        """
+        Return the leases whose next renewal falls at or before a tick.
+        """
+        return [self.by_id[lease_id] for renewal, ids in self.by_renewal.items()
+                if renewal is not None and renewal <= tick for lease_id in ids]
+
+    @staticmethod
+    def is_empty(lease):
+        return not lease.get('containment_usage')
+
+    @staticmethod
+    def is_storage(lease):
+        return lease.get('type') == 'STORAGE' or lease['ticker'].endswith('-STORAGE')
+
+    # --- Lifecycle ---
+
+    def lease(self, session, ticker, count=1, owner=None):
+        """
+        Open new leases of a ticker concurrently.
+
+        Args:
+            session (requests.Session): Authenticated session for API requests.
+            ticker (str): Lease ticker (e.g. 'CL-STORAGE').
+            count (int): Number of leases to open.
+            owner (str, optional): Claim the new leases for this owner.
+
+        Returns:
+            list: The leases opened; fewer than count if some requests failed.
+        """
+        if count <= 0:
+            return []
+        result = execution.execute_legs(session, [[execution.lease_leg(ticker) for _ in range(count)]])
+        if not result.ok:
+            result.report()
+        leased = [response for _, response in result.acks]
+        for lease in leased:
+            self._add(lease)
+            if owner is not None:
+                self.claims[lease['id']] = owner
+        return leased
+
+    def release(self, session, lease_ids):
+        """
+        Close leases concurrently, one DELETE per lease.
+
+        Returns:
+            list: Ids of the leases closed.
+        """
+        lease_ids = list(dict.fromkeys(lease_ids))
+        if not lease_ids:
+            return []
+        legs = [execution.release_leg(lease_id) for lease_id in lease_ids]
+        result = execution.execute_legs(session, [legs])
+        if not result.ok:
+            result.report()
+        closed = [leg['lease_id'] for leg, _ in result.acks]
+        for lease_id in closed:
+            self._remove(lease_id)
+        return closed
+
+    # --- Shared storage ---
+
+    def claim(self, ticker, count, owner):
+        """
+        Claim up to count empty, unclaimed leases of a ticker for an owner,
+        latest renewal first so the claimed tanks run longest before renewing.
+
+        Returns:
+            list: Ids of the leases claimed.
+        """
+        idle = [lease for lease in self.find(ticker) if lease['id'] not in self.claims and self.is_empty(lease)]
+        idle.sort(key=lambda lease: -(lease.get('next_lease_tick') or 0))
+        claimed = [lease['id'] for lease in idle[:count]]
+        for lease_id in claimed:
+            self.claims[lease_id] = owner
+        return claimed
+
+    @staticmethod
+    def capacity(ticker):
+        return STORAGE_CAPACITY.get(ticker, DEFAULT_STORAGE_CAPACITY)
+
+    def free_capacity(self, ticker, owner):
+        """
+        Units still free in the tanks of a ticker claimed by an owner.
+        """
+        capacity = self.capacity(ticker)
+        return sum(capacity - (lease.get('containment_usage') or 0) for lease in self.find(ticker)
+                   if self.claims.get(lease['id']) == owner)
+
+    def ensure_storage(self, session, ticker, units, owner, attempts=STORAGE_ATTEMPTS):
+        """
+        Make sure an owner holds storage for a number of units.
+
+        Free capacity in the owner's tanks counts first, then idle tanks are
+        claimed, and only the tanks still missing are leased, all in one
+        concurrent batch. Failed leases are retried for up to attempts rounds.
+
+        Args:
+            session (requests.Session): Authenticated session for API requests.
+            ticker (str): Storage ticker (e.g. 'CL-STORAGE').
+            units (int): Units the owner needs room for.
+            owner (str): Owner the tanks are claimed for.
+            attempts (int): Lease rounds before giving up.
+
+        Returns:
+            int: Confirmed free capacity held by the owner; less than units if leasing failed.
+        """
+        capacity = self.capacity(ticker)
+        free = self.free_capacity(ticker, owner)
+        if free < units:
+            self.claim(ticker, -(-(units - free) // capacity), owner)
+            free = self.free_capacity(ticker, owner)
+
+        for _ in range(attempts):
+            missing = -(-(units - free) // capacity)
+            if missing <= 0:
+                break
+            result = execution.execute_legs(session, [[execution.storage_leg(ticker, capacity) for _ in range(missing)]])
+            for _, lease in result.acks:
+                self._add(lease)
+                self.claims[lease['id']] = owner
+            free += capacity * len(result.acks)
+            if not result.ok:
+                result.report()
+        return free
+
+    def unclaim(self, owner):
+        """
+        Release an owner's claims. The leases stay open for reuse.
+        """
+        self.claims = {lease_id: claimant for lease_id, claimant in self.claims.items() if claimant != owner}
+
+    def claimed_by(self, owner):
+        return [lease_id for lease_id, claimant in self.claims.items() if claimant == owner]
+
+    def close_idle(self, session, tick=None, keep=()):
+        """
+        Close empty leases nobody has claimed.
+
+        Storage is only closed once its renewal is RENEWAL_MARGIN_TICKS away,
+        so it can be reused until then; other facilities are closed at once.
+
+        Args:
+            session (requests.Session): Authenticated session for API requests.
+            tick (int, optional): Current tick; defaults to the registry's tick.
+            keep (iterable, optional): Further lease ids to leave open.
+
+        Returns:
+            list: Ids of the leases closed.
+        """
+        tick = self.tick if tick is None else tick
+        keep = set(keep) | set(self.claims)
+        closing = [lease['id'] for lease in self.by_id.values()
+                   if not self.is_storage(lease) and self.is_empty(lease) and lease['id'] not in keep]
+        renewing = self.by_id.values() if tick is None else self.renewing_by(tick + RENEWAL_MARGIN_TICKS)
+        closing += [lease['id'] for lease in renewing
+                    if self.is_storage(lease) and self.is_empty(lease) and lease['id'] not in keep]
+        return self.release(session, closing)
+
+    def close_empty(self, session, snapshot=None, keep=()):
+        """
+        Refresh the registry and close empty leases nobody has claimed; see close_idle.
+        """
+        self.refresh(session, snapshot)
+        return self.close_idle(session, keep=keep)
+
+    # --- Refinery ---
+
+    def refinery_info(self, session, snapshot=None):
+        """
+        Get the refinery lease from the registry, including one leased earlier this tick.
+
+        Returns:
+            tuple: (refinery leased (bool), lease_id (int), next_lease_tick (int)).
+        """
+        self.refresh(session, snapshot)
+        refinery = self.first(REFINERY)
+        if refinery is None:
+            return False, None, None
+        return True, refinery['id'], refinery['next_lease_tick']
+
+    def use_refinery(self, session, from_ticker, quantity, snapshot=None):
+        """
+        Send crude oil to the refinery lease held in the registry.
+
+        Raises:
+            ApiException: If there is no refinery lease or the request fails.
+        """
+        _, lease_id, _ = self.refinery_info(session, snapshot)
+        if lease_id is None:
+            raise helper.ApiException(f"Failed to use refinery for {from_ticker}: no refinery lease")
+        return helper.use_refinery(session, from_ticker, quantity, lease_id)
+
+    def close_refinery(self, session, lease_id=None, snapshot=None):
+        """
+        Close a refinery lease, or every one in the registry if lease_id is None.
+
+        Returns:
+            list: IDs of the closed leases.
+
+        Raises:
+            ApiException: If a lease could not be closed.
+        """
+        if lease_id is None:
+            self.refresh(session, snapshot)
+            lease_ids = [lease['id'] for lease in self.find(REFINERY)]
+        else:
+            lease_ids = [lease_id]
+
+        closed = self.release(session, lease_ids)
+        if len(closed) < len(lease_ids):
+            raise helper.ApiException(f"Failed to close refinery lease(s) {sorted(set(lease_ids) - set(closed))}")
+        return closed
+
+
+# Shared registry for every model
+lease_manager = LeaseManager()
+
+
+def wait_and_close_refinery(session, lease_id, lease_finish_tick):
+    """
+    Sleep on the case clock until one tick before refinery lease renewal and then close the lease.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        lease_id (int): ID of the refinery lease to close.
+        lease_finish_tick (int): Next renewal tick.
+
+    Returns:
+        list: IDs of the closed leases.
+
+    Raises:
+        ApiException: If the lease could not be closed.
+    """
+    clock.case_clock.sleep_until_tick(session, lease_finish_tick - 1)
+    return lease_manager.close_refinery(session, lease_id)
@@ -11,8 +11,13 @@ import refining
 import fundamental
 import transportation
 import storage
-import time
-from config import API_KEY, API_BASE_URL
+import metrics
+import execution
+import leases
+from recorder import MarketRecorder
+from config import API_KEY
+from news_feed import NewsListener
+from scheduler import TickScheduler
 
 
 def initialize_session():
@@ -24,48 +29,59 @@ def initialize_session():
     """
     session = requests.Session()
     session.headers.update({'X-API-Key': API_KEY})
+    # Pool enough connections for concurrently executed trade legs
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=execution.MAX_WORKERS))
     return session
 
-def main():
+def housekeeping(session, snapshot):
     """
-    Main orchestration function for running the trading system.
+    Per-tick bookkeeping run ahead of the models: close empty leases and log state.
 
-    - Initialize session
-    - Run each strategy
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot): Market snapshot for this tick.
 
     Returns:
         None
     """
-    session = initialize_session()
-    tick = helper.get_tick(session)
-    
-    while True:
-        print("")
-        tick = helper.get_tick(session)
-        helper.close_empty_leases(session)
-        net_position = helper.get_net_position(session)
-        print(f"Net position: {net_position}")
-        print(f"Tick: {tick}")
+    print("")
+    leases.lease_manager.close_empty(session, snapshot)
+    print(f"Net position: {helper.get_net_position(session, snapshot)}")
+    print(f"Tick: {helper.get_tick(session, snapshot)}")
 
-        # Refining Model
 
-        refining.refining_model(session)
-    
-        # Fundamental Model
-
-        fundamental.fundamental_model(session)
-
-        # Transportation Model
-
-        transportation.transportation_model(session)
-        
-        # Storage Model
+def main():
+    """
+    Main orchestration function for running the trading system.
 
-        storage.storage_model(session)
+    - Initialize session
+    - Start the news listener, which fires the EIA trade as soon as a headline arrives
+    - Register each strategy with the tick scheduler, after the market data recorder
+    - Run every strategy once per new case tick against a shared snapshot
 
-        # Extra
-        
-        time.sleep(.6)
+    Returns:
+        None
+    """
+    session = initialize_session()
+    metrics.install()
+
+    # The listener polls /news on its own session so it never waits on the models
+    news_listener = NewsListener(fundamental.news_feed, initialize_session())
+    news_listener.start()
+
+    scheduler = TickScheduler(session)
+    scheduler.add_event_source('news', fundamental.news_feed.poll)
+    scheduler.add('housekeeping', housekeeping, budget=0.1)
+    # Record each tick's books and positions before the models trade on them
+    market_recorder = MarketRecorder()
+    fundamental.news_feed.subscribe(market_recorder.record_news)
+    scheduler.add('recorder', market_recorder.record, budget=0.1)
+    scheduler.add('refining_model', refining.refining_model)
+    scheduler.add('fundamental_model', fundamental.fundamental_model)
+    scheduler.add('transportation_model', transportation.transportation_model)
+    scheduler.add('storage_model', storage.storage_model)
+
+    scheduler.run()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,328 @@
+"""
+market_maker.py
+
+Market-making engine for the ALGO2 cases. Each variant (ALGO2FAST,
+ALGO2SLOW, ALGO2eFAST, ALGO2eSLOW) is a parameter profile, and several
+profiles can quote their tickers together in one process.
+
+Usage:
+    python market_maker.py ALGO2FAST ALGO2eFAST
+"""
+
+import signal
+import sys
+import time
+import requests
+import helper
+from config import API_KEY
+
+RETRY_DELAY = 0.1
+RECONCILE_INTERVAL = 1.0  # Seconds between full open-order refreshes
+
+# Fixed parameter values (tuned from experiment.py; re-tune with sweep.py)
+PROFILES = {
+    'ALGO2FAST': {
+        'ticker': 'ALGO', 'starttime': 0, 'endtime': 299,
+        'ordersize': 5000, 'rebalancesize': 0, 'orderslimit': 7, 'rebalance_limit': 4000, 'sleep_time': 0.5,
+    },
+    'ALGO2SLOW': {
+        'ticker': 'ALGO', 'starttime': 0, 'endtime': 299,
+        'ordersize': 5000, 'rebalancesize': 0, 'orderslimit': 5, 'rebalance_limit': 4000, 'sleep_time': 0.5,
+    },
+    'ALGO2eFAST': {
+        'ticker': 'RY', 'starttime': 0, 'endtime': 295,
+        'ordersize': 5000, 'rebalancesize': 1500, 'orderslimit': 6, 'rebalance_limit': 4000, 'sleep_time': 0.3,
+    },
+    'ALGO2eSLOW': {
+        'ticker': 'RY', 'starttime': 0, 'endtime': 295,
+        'ordersize': 5000, 'rebalancesize': 1500, 'orderslimit': 7, 'rebalance_limit': 4000, 'sleep_time': 0.3,
+    },
+}
+
+shutdown = False
+
+
+# this signal handler allows for a graceful shutdown when CTRL+C is pressed
+def signal_handler(signum, frame):
+    global shutdown
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    shutdown = True
+
+
+def initialize_session():
+    """
+    Initialize and authenticate a requests session for API communication.
+
+    Returns:
+        requests.Session: Authenticated session object.
+    """
+    session = requests.Session()
+    session.headers.update({'X-API-Key': API_KEY})
+    return session
+
+
+class OrderRegistry:
+    """
+    Local record of our open orders, populated from order responses and
+    periodically reconciled against the exchange.
+    """
+
+    def __init__(self, reconcile_interval=RECONCILE_INTERVAL):
+        self.orders = {}
+        self.reconcile_interval = reconcile_interval
+        self.last_reconcile = 0.0
+
+    def add(self, order):
+        if order.get('status') == 'OPEN':
+            self.orders[order['order_id']] = order
+
+    def remove(self, order_ids):
+        for order_id in order_ids:
+            self.orders.pop(order_id, None)
+
+    def open_orders(self, ticker):
+        return [order for order in self.orders.values() if order['ticker'] == ticker]
+
+    def reconcile(self, session, force=False):
+        """
+        Replace the local state with the exchange's open orders, at most once per reconcile_interval.
+        """
+        now = time.time()
+        if not force and now - self.last_reconcile < self.reconcile_interval:
+            return
+        self.orders = {order['order_id']: order for order in helper.get_orders(session, 'OPEN')}
+        self.last_reconcile = now
+
+
+
+def _remaining(order):
+    return order['quantity'] - order.get('quantity_filled', 0)
+
+
+class QuoteManager:
+    """
+    Brings our resting orders for one ticker in line with the desired quotes
+    using the fewest requests: a side is only requoted when no live order
+    already sits at the desired price with the desired remaining size, and
+    all cancels go out in one request.
+    """
+
+    def __init__(self, ticker, orderslimit, registry):
+        self.ticker = ticker
+        self.orderslimit = orderslimit
+        self.registry = registry
+
+    def diff(self, quotes):
+        """
+        Work out the orders to cancel and to post for the desired quotes.
+
+        Orders on a side with more left to fill than the desired quantity
+        (quotes cut back to rebalancesize) are cancelled wherever they rest,
+        and so are orders at the desired price with a different remaining
+        size, which is then posted again at the desired size.
+
+        Args:
+            quotes (dict): 'BUY'/'SELL' -> (price, quantity). A zero quantity
+                pulls every resting order on that side.
+
+        Returns:
+            tuple: (order IDs to cancel (list), (action, price, quantity) orders to post (list)).
+        """
+        live = self.registry.open_orders(self.ticker)
+        cancels = []
+        posts = []
+
+        for action, (price, quantity) in quotes.items():
+            side = [order for order in live if order['action'] == action]
+            if quantity <= 0:
+                cancels.extend(order['order_id'] for order in side)
+                continue
+            at_price = [order for order in side if abs(order['price'] - price) < 1e-9]
+            if any(_remaining(order) == quantity for order in at_price):
+                stale = [order for order in side if _remaining(order) > quantity]
+            else:
+                stale = at_price + [order for order in side if _remaining(order) > quantity]
+                posts.append((action, price, quantity))
+            cancels.extend(dict.fromkeys(order['order_id'] for order in stale))
+
+        # Keep at most orderslimit resting orders, dropping the oldest first
+        kept = sorted(order['order_id'] for order in live if order['order_id'] not in cancels)
+        excess = len(kept) + len(posts) - self.orderslimit
+        if excess > 0:
+            cancels.extend(kept[:excess])
+
+        return cancels, posts
+
+    def sync(self, session, quotes):
+        """
+        Send the cancels and new orders needed to reach the desired quotes.
+
+        Returns:
+            tuple: (number of orders cancelled (int), number of orders posted (int)).
+        """
+        self.registry.reconcile(session)
+        cancels, posts = self.diff(quotes)
+
+        if cancels:
+            helper.cancel_orders(session, cancels)
+            self.registry.remove(cancels)
+        for action, price, quantity in posts:
+            self.registry.add(helper.place_order(session, self.ticker, quantity, action, 'LIMIT', price))
+
+        return len(cancels), len(posts)
+
+
+class MarketMaker:
+    """
+    Quotes one ticker on both sides of the book according to a parameter profile.
+
+    Open orders are tracked in an OrderRegistry, which several makers can
+    share while each only trims the orders for its own ticker.
+    """
+
+    def __init__(self, name, ticker, ordersize, rebalancesize, orderslimit, rebalance_limit, sleep_time,
+                 starttime=0, endtime=299, registry=None):
+        self.name = name
+        self.ticker = ticker
+        self.ordersize = ordersize
+        self.rebalancesize = rebalancesize
+        self.orderslimit = orderslimit
+        self.rebalance_limit = rebalance_limit
+        self.sleep_time = sleep_time
+        self.starttime = starttime
+        self.endtime = endtime
+
+        self.registry = registry if registry is not None else OrderRegistry()
+        self.quotes = QuoteManager(ticker, orderslimit, self.registry)
+        self.position = 0
+        self.next_run = 0.0
+
+    @classmethod
+    def from_profile(cls, name, **overrides):
+        """
+        Build a market maker from a named profile, optionally overriding parameters.
+        """
+        params = dict(PROFILES[name], **overrides)
+        return cls(name, **params)
+
+    def active(self, tick):
+        return self.starttime <= tick < self.endtime
+
+    def quote_sizes(self):
+        """
+        Return the (buy, sell) quantities, cut back to rebalancesize on the side
+        that would grow the position beyond rebalance_limit.
+        """
+        buy_quantity = self.ordersize
+        sell_quantity = self.ordersize
+
+        if self.position > self.rebalance_limit:
+            buy_quantity = self.rebalancesize
+        elif self.position < -self.rebalance_limit:
+            sell_quantity = self.rebalancesize
+
+        return buy_quantity, sell_quantity
+
+    def market_bid_ask(self, session):
+        """
+        Return the best bid and ask of the rest of the market, ignoring our own
+        resting orders so our quotes do not chase themselves.
+        """
+        book = helper.get_book(session, self.ticker)
+        own = self.registry.orders
+        bids = [level['price'] for level in book.get('bids', []) if level.get('order_id') not in own]
+        asks = [level['price'] for level in book.get('asks', []) if level.get('order_id') not in own]
+        if not bids or not asks:
+            raise helper.ApiException(f"No bids or asks available for ticker {self.ticker}.")
+        return bids[0], asks[0]
+
+    def quote(self, session):
+        """
+        Quote one cent below the best bid and one cent above the best ask,
+        only touching the book where our resting orders differ from that.
+        """
+        best_bid, best_ask = self.market_bid_ask(session)
+        self.position = helper.get_position_ticker(session, self.ticker)
+        buy_quantity, sell_quantity = self.quote_sizes()
+
+        return self.quotes.sync(session, {
+            'BUY': (round(best_bid - 0.01, 2), buy_quantity),
+            'SELL': (round(best_ask + 0.01, 2), sell_quantity),
+        })
+
+    def step(self, session):
+        self.quote(session)
+        self.next_run = time.time() + self.sleep_time
+
+    def print_parameters(self):
+        print(f"[{self.name}] Starting trading session on {self.ticker} with parameters:")
+        print(f"ordersize: {self.ordersize}, rebalancesize: {self.rebalancesize}")
+        print(f"orderslimit: {self.orderslimit}, rebalance_limit: {self.rebalance_limit}")
+        print(f"SLEEP_TIME: {self.sleep_time}")
+        print(f"End time: {self.endtime}")
+
+
+def run(session, makers):
+    """
+    Run market makers together until every one of them has passed its end time.
+
+    Each maker steps on its own sleep_time cadence.
+
+    Args:
+        session (requests.Session): Authenticated session for API requests.
+        makers (list): MarketMaker instances.
+
+    Returns:
+        int: Tick at which the session ended.
+    """
+    tick = helper.get_tick(session)
+    for maker in makers:
+        maker.print_parameters()
+    print(f"Current tick: {tick}")
+
+    last_printed = None
+    while not shutdown and any(maker.active(tick) for maker in makers):
+        try:
+            now = time.time()
+            for maker in makers:
+                if maker.active(tick) and now >= maker.next_run:
+                    maker.step(session)
+
+            due = [maker.next_run for maker in makers if maker.active(tick)]
+            time.sleep(max(0.0, min(due) - time.time()) if due else 0.0)
+
+            # refresh the case time. THIS IS IMPORTANT FOR THE WHILE LOOP
+            tick = helper.get_tick(session)
+
+            if tick % 10 == 0 and tick != last_printed:  # Print progress every 10 ticks
+                last_printed = tick
+                positions = ", ".join(f"{maker.ticker}: {maker.position}" for maker in makers)
+                print(f"Current tick: {tick}, positions: {positions}, NLV: {helper.get_nlv(session)}")
+
+        except Exception as e:
+            print(f"Error in main loop: {str(e)}")
+            time.sleep(RETRY_DELAY)
+
+    return tick
+
+
+def main(profile_names):
+    """
+    Run the named profiles together in one session.
+    """
+    registry = OrderRegistry()
+    makers = [MarketMaker.from_profile(name, registry=registry) for name in profile_names]
+
+    with initialize_session() as session:
+        tick = run(session, makers)
+
+        if all(tick >= maker.endtime for maker in makers):
+            print(f"Session completed successfully at tick {tick}")
+        else:
+            print(f"Session ended unexpectedly at tick {tick}")
+        print(f"Final NLV: {helper.get_nlv(session)}")
+
+
+if __name__ == '__main__':
+    signal.signal(signal.SIGINT, signal_handler)
+    main(sys.argv[1:] or ['ALGO2FAST'])
@@ -0,0 +1,165 @@
+"""
+metrics.py
+
+Call counters, latency histograms and error counts for API requests,
+broken down by endpoint and by the model that issued the call.
+
+Usage:
+    metrics.install()                      # dump summary at exit / on signal
+    with metrics.track_model('refining_model'):
+        refining.refining_model(session)
+"""
+
+import atexit
+import re
+import signal
+import threading
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds: 0.1 ms growing by 20% up to ~5 s
+BUCKET_BOUNDS = [0.0001 * 1.2 ** i for i in range(60)]
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+_local = threading.local()
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with percentile estimates.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency, error=False):
+        index = 0
+        while index < len(BUCKET_BOUNDS) and latency > BUCKET_BOUNDS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+        if error:
+            self.errors += 1
+
+    def percentile(self, q):
+        """
+        Estimate the q-th percentile (0-100) as the upper bound of its bucket.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+
+class ApiMetrics:
+    """
+    Registry of latency histograms keyed by (endpoint, model).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def record(self, method, path, latency, error=False):
+        key = (f"{method} {_ID_SEGMENT.sub('/{id}', path)}", current_model())
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.add(latency, error)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def summary(self, by_model=True):
+        """
+        Format a table of call counts, errors and latency percentiles.
+
+        Args:
+            by_model (bool): Break each endpoint down by calling model.
+
+        Returns:
+            str: Summary table, endpoints sorted by total time spent.
+        """
+        with self.lock:
+            merged = {}
+            for (endpoint, model), histogram in self.histograms.items():
+                key = (endpoint, model) if by_model else (endpoint, '*')
+                target = merged.setdefault(key, LatencyHistogram())
+                target.counts = [a + b for a, b in zip(target.counts, histogram.counts)]
+                target.count += histogram.count
+                target.errors += histogram.errors
+                target.total += histogram.total
+                target.max = max(target.max, histogram.max)
+
+        lines = [f"{'endpoint':<28} {'model':<22} {'calls':>7} {'errors':>6} {'total s':>8} "
+                 f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        for (endpoint, model), h in sorted(merged.items(), key=lambda item: -item[1].total):
+            lines.append(f"{endpoint:<28} {model:<22} {h.count:>7} {h.errors:>6} {h.total:>8.2f} "
+                         f"{h.percentile(50) * 1000:>8.1f} {h.percentile(95) * 1000:>8.1f} "
+                         f"{h.percentile(99) * 1000:>8.1f} {h.max * 1000:>8.1f}")
+        return "\n".join(lines)
+
+    def dump(self):
+        print("\n[METRICS] API call summary")
+        print(self.summary())
+
+
+registry = ApiMetrics()
+
+
+def current_model():
+    """
+    Return the name of the model currently issuing API calls on this thread.
+    """
+    return getattr(_local, 'model', 'main')
+
+
+@contextmanager
+def track_model(name):
+    """
+    Attribute API calls made inside the block to the given model name.
+    """
+    previous = current_model()
+    _local.model = name
+    try:
+        yield
+    finally:
+        _local.model = previous
+
+
+def record(method, path, latency, error=False):
+    registry.record(method, path, latency, error)
+
+
+def install(dump_signal=None):
+    """
+    Dump the metrics summary at interpreter exit and whenever dump_signal is received.
+
+    Args:
+        dump_signal (int, optional): Signal that triggers a dump. Defaults to
+            SIGUSR1, or SIGBREAK (Ctrl+Break) on Windows.
+    """
+    atexit.register(registry.dump)
+
+    if dump_signal is None:
+        dump_signal = getattr(signal, 'SIGUSR1', None) or getattr(signal, 'SIGBREAK', None)
+    if dump_signal is not None:
+        signal.signal(dump_signal, _dump_in_thread)
+
+
+def _dump_in_thread(signum, frame):
+    # The handler runs on the main thread, possibly while record() holds the
+    # registry lock there, so the dump waits for the lock on its own thread.
+    threading.Thread(target=registry.dump, name='metrics-dump', daemon=True).start()
@@ -0,0 +1,657 @@
+"""
+mock_server.py
+
+Local stand-in for the RIT REST API used for offline testing and benchmarking.
+
+Implements the endpoints the trading code relies on (/case, /securities,
+/securities/book, /orders, /commands/cancel, /leases, /limits, /news and
+/trader) on top of a small simulated exchange: a tick clock, random-walk
+prices with synthetic depth, a matching engine for trader orders, scripted
+news and lease timing for storage, refining and pipelines.
+
+The Exchange class has no HTTP dependency, so it can also be driven
+in-process by tick (see Exchange.step) for fast simulations.
+
+Usage:
+    python mock_server.py --port 9998 --tick-seconds 1.0 --seed 0
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import API_KEY, PORT
+
+NEWS_LOG_FILE = "news_impact_log.csv"
+
+# Tradable securities. Linked securities follow anchor * scale + basis, where
+# the basis mean-reverts around its starting value.
+SECURITIES = {
+    'CL':     {'price': 100.00, 'vol': 0.08, 'spread': 0.04, 'depth_qty': 40, 'multiplier': 1000, 'decimals': 2},
+    'CL-AK':  {'anchor': 'CL', 'scale': 1.0, 'basis': -4.40, 'basis_vol': 0.06, 'spread': 0.04, 'depth_qty': 40, 'multiplier': 1000, 'decimals': 2},
+    'CL-NYC': {'anchor': 'CL', 'scale': 1.0, 'basis': 2.30, 'basis_vol': 0.05, 'spread': 0.04, 'depth_qty': 40, 'multiplier': 1000, 'decimals': 2},
+    'CL-1F':  {'anchor': 'CL', 'scale': 1.0, 'basis': 1.00, 'basis_vol': 0.02, 'spread': 0.04, 'depth_qty': 40, 'multiplier': 1000, 'decimals': 2},
+    'CL-2F':  {'anchor': 'CL', 'scale': 1.0, 'basis': 2.00, 'basis_vol': 0.02, 'spread': 0.04, 'depth_qty': 40, 'multiplier': 1000, 'decimals': 2},
+    'HO':     {'anchor': 'CL', 'scale': 1 / 42, 'basis': 0.34, 'basis_vol': 0.003, 'spread': 0.002, 'depth_qty': 20, 'multiplier': 42000, 'decimals': 4},
+    'RB':     {'anchor': 'CL', 'scale': 1 / 42, 'basis': 0.27, 'basis_vol': 0.003, 'spread': 0.002, 'depth_qty': 30, 'multiplier': 42000, 'decimals': 4},
+    'ALGO':   {'price': 20.00, 'vol': 0.02, 'spread': 0.04, 'depth_qty': 5000, 'multiplier': 1, 'decimals': 2},
+    'RY':     {'price': 60.00, 'vol': 0.04, 'spread': 0.04, 'depth_qty': 5000, 'multiplier': 1, 'decimals': 2},
+}
+
+# Physical securities and the storage ticker that holds them
+PHYSICAL_STORAGE = {'CL': 'CL-STORAGE', 'CL-AK': 'AK-STORAGE', 'CL-NYC': 'NYC-STORAGE'}
+
+# Securities counted towards the net/gross limit
+LIMIT_TICKERS = ['CL', 'CL-AK', 'CL-NYC', 'CL-1F', 'CL-2F']
+
+LEASES = {
+    'CL-STORAGE':  {'type': 'STORAGE', 'capacity': 10, 'cost': 1000, 'period': 30},
+    'AK-STORAGE':  {'type': 'STORAGE', 'capacity': 10, 'cost': 1000, 'period': 30},
+    'NYC-STORAGE': {'type': 'STORAGE', 'capacity': 10, 'cost': 1000, 'period': 30},
+    'CL-REFINERY': {'type': 'REFINERY', 'cost': 300000, 'period': 45, 'duration': 30,
+                    'inputs': {'CL': 30}, 'outputs': {'HO': 10, 'RB': 20}},
+    'AK-CS-PIPE':  {'type': 'TRANSPORT', 'cost': 40000, 'duration': 30, 'destination': 'CL'},
+    'CS-NYC-PIPE': {'type': 'TRANSPORT', 'cost': 20000, 'duration': 30, 'destination': 'CL-NYC'},
+}
+
+DEPTH_LEVELS = 10
+DISTRESSED_DISCOUNT = 5.0  # $/bbl haircut on barrels with no storage
+EIA_SENSITIVITY = 0.10     # $ move in CL per mln bbl surprise
+
+EIA_PATTERN = re.compile(r"ACTUAL (DRAW|BUILD) (\d+) MLN BBLS VS FORECAST (DRAW|BUILD) (\d+)")
+PIPELINE_COST_PATTERN = re.compile(r"\$([\d,]+)")
+
+
+class Exchange:
+    """
+    Simulated RIT case: prices, books, orders, leases, news and the tick clock.
+
+    In real-time mode (tick_seconds set) the clock follows wall time and
+    pending ticks are processed lazily on the next request. Without
+    tick_seconds the clock only moves when step() is called.
+    """
+
+    def __init__(self, seed=0, ticks_per_period=600, tick_seconds=None, news_script=None):
+        self.rng = random.Random(seed)
+        self.ticks_per_period = ticks_per_period
+        self.tick_seconds = tick_seconds
+        self.start_time = time.time()
+        self.lock = threading.RLock()
+
+        self.tick = 0
+        self.cash = 0.0
+        self.prices = {}
+        self.basis = {}
+        self.books = {}
+        self.positions = {ticker: 0 for ticker in SECURITIES}
+        self.volume = {ticker: 0 for ticker in SECURITIES}
+        self.orders = {}
+        self.next_order_id = 1
+        self.leases = {}
+        self.next_lease_id = 1
+        self.lease_costs = {ticker: spec['cost'] for ticker, spec in LEASES.items()}
+        self.news = []
+        self.next_news_id = 1
+        self.news_script = sorted(news_script if news_script is not None else default_news_script(self.rng, ticks_per_period))
+
+        for ticker, spec in SECURITIES.items():
+            if 'anchor' in spec:
+                self.basis[ticker] = spec['basis']
+            else:
+                self.prices[ticker] = spec['price']
+        self._update_linked_prices()
+        self._rebuild_books()
+        self._release_news()
+
+    # --- Clock ---
+
+    def sync(self):
+        """
+        Advance the clock to wall time when running in real-time mode.
+        """
+        if self.tick_seconds is None:
+            return
+        target = min(int((time.time() - self.start_time) / self.tick_seconds), self.ticks_per_period)
+        while self.tick < target:
+            self.step()
+
+    def step(self):
+        """
+        Advance the case by one tick.
+
+        Returns:
+            bool: False once the case has reached its final tick.
+        """
+        if self.tick >= self.ticks_per_period:
+            return False
+
+        self.tick += 1
+        self._move_prices()
+        self._release_news()
+        self._rebuild_books()
+        self._cross_resting()
+        self._simulate_flow()
+        self._process_leases()
+        self._enforce_storage()
+        return self.tick < self.ticks_per_period
+
+    # --- Prices and books ---
+
+    def _move_prices(self):
+        for ticker, spec in SECURITIES.items():
+            if 'anchor' in spec:
+                self.basis[ticker] += 0.1 * (spec['basis'] - self.basis[ticker]) + self.rng.gauss(0, spec['basis_vol'])
+            else:
+                self.prices[ticker] = max(0.01, self.prices[ticker] + self.rng.gauss(0, spec['vol']))
+        self._update_linked_prices()
+
+    def _update_linked_prices(self):
+        for ticker, spec in SECURITIES.items():
+            if 'anchor' in spec:
+                self.prices[ticker] = self.prices[spec['anchor']] * spec['scale'] + self.basis[ticker]
+
+    def _rebuild_books(self):
+        for ticker, spec in SECURITIES.items():
+            mid = self.prices[ticker]
+            half = spec['spread'] / 2
+            step = 10 ** -spec['decimals']
+            levels = [max(1, int(spec['depth_qty'] * (0.5 + self.rng.random()))) for _ in range(2 * DEPTH_LEVELS)]
+            self.books[ticker] = {
+                'bids': [[round(mid - half - i * step, spec['decimals']), levels[i]] for i in range(DEPTH_LEVELS)],
+                'asks': [[round(mid + half + i * step, spec['decimals']), levels[DEPTH_LEVELS + i]] for i in range(DEPTH_LEVELS)],
+            }
+
+    def last_price(self, ticker):
+        return round(self.prices[ticker], SECURITIES[ticker]['decimals'])
+
+    # --- Matching ---
+
+    def _fill(self, order, price, quantity):
+        sign = 1 if order['action'] == 'BUY' else -1
+        multiplier = SECURITIES[order['ticker']]['multiplier']
+        filled = order['quantity_filled']
+        order['vwap'] = ((order['vwap'] or 0) * filled + price * quantity) / (filled + quantity)
+        order['quantity_filled'] = filled + quantity
+        self.positions[order['ticker']] += sign * quantity
+        self.cash -= sign * price * quantity * multiplier
+        self.volume[order['ticker']] += quantity
+        if order['quantity_filled'] >= order['quantity']:
+            order['status'] = 'TRANSACTED'
+
+    def _match_synthetic(self, order, limit_price=None):
+        side = 'asks' if order['action'] == 'BUY' else 'bids'
+        levels = self.books[order['ticker']][side]
+        while levels and order['quantity_filled'] < order['quantity']:
+            price, available = levels[0]
+            if limit_price is not None:
+                if order['action'] == 'BUY' and price > limit_price:
+                    break
+                if order['action'] == 'SELL' and price < limit_price:
+                    break
+            quantity = min(available, order['quantity'] - order['quantity_filled'])
+            self._fill(order, price, quantity)
+            if quantity == available:
+                levels.pop(0)
+            else:
+                levels[0][1] = available - quantity
+
+    def _cross_resting(self):
+        """
+        Execute resting trader orders that the new synthetic book trades through.
+        """
+        for order in self.orders.values():
+            if order['status'] == 'OPEN':
+                self._match_synthetic(order, order['price'])
+
+    def _simulate_flow(self):
+        """
+        Send random market flow through the combined synthetic and trader book,
+        filling resting trader orders in price priority.
+        """
+        for ticker, spec in SECURITIES.items():
+            for action in ('BUY', 'SELL'):
+                remaining = int(self.rng.expovariate(1 / (1.5 * spec['depth_qty'])))
+                if remaining <= 0:
+                    continue
+                resting = sorted(
+                    (o for o in self.orders.values()
+                     if o['ticker'] == ticker and o['status'] == 'OPEN' and o['action'] != action),
+                    key=lambda o: (o['price'] if action == 'BUY' else -o['price'], o['order_id']),
+                )
+                side = 'asks' if action == 'BUY' else 'bids'
+                for level_price, level_qty in self.books[ticker][side]:
+                    for order in resting:
+                        if order['status'] != 'OPEN':
+                            continue
+                        better = order['price'] < level_price if action == 'BUY' else order['price'] > level_price
+                        if not better:
+                            break
+                        quantity = min(remaining, order['quantity'] - order['quantity_filled'])
+                        self._fill(order, order['price'], quantity)
+                        remaining -= quantity
+                        if remaining <= 0:
+                            break
+                    remaining -= level_qty
+                    if remaining <= 0:
+                        break
+
+    def place_order(self, ticker, quantity, action, order_type, price=None):
+        if ticker not in SECURITIES:
+            return 400, {'code': 'INVALID_TICKER', 'message': f'Unknown ticker {ticker}'}
+        if action not in ('BUY', 'SELL') or order_type not in ('MARKET', 'LIMIT'):
+            return 400, {'code': 'INVALID_ORDER', 'message': 'Invalid action or type'}
+        if quantity <= 0:
+            return 400, {'code': 'INVALID_ORDER', 'message': 'Quantity must be positive'}
+        if order_type == 'LIMIT' and price is None:
+            return 400, {'code': 'INVALID_ORDER', 'message': 'Limit orders require a price'}
+
+        order = {
+            'order_id': self.next_order_id,
+            'period': 1,
+            'tick': self.tick,
+            'trader_id': 'mock',
+            'ticker': ticker,
+            'type': order_type,
+            'quantity': quantity,
+            'action': action,
+            'price': price,
+            'quantity_filled': 0,
+            'vwap': None,
+            'status': 'OPEN',
+        }
+        self.next_order_id += 1
+        self._match_synthetic(order, price if order_type == 'LIMIT' else None)
+        if order_type == 'MARKET':
+            order['status'] = 'TRANSACTED'
+        self.orders[order['order_id']] = order
+        return 200, dict(order)
+
+    def cancel_order(self, order_id):
+        order = self.orders.get(order_id)
+        if order is None or order['status'] != 'OPEN':
+            return 404, {'code': 'NOT_FOUND', 'message': f'Order {order_id} is not open'}
+        order['status'] = 'CANCELLED'
+        return 200, {'success': True}
+
+    def book(self, ticker, limit=20):
+        """
+        Return the book as RIT does: synthetic depth merged with trader orders.
+        """
+        if ticker not in SECURITIES:
+            return 400, {'code': 'INVALID_TICKER', 'message': f'Unknown ticker {ticker}'}
+
+        result = {}
+        for side, action in (('bids', 'BUY'), ('asks', 'SELL')):
+            entries = [{'order_id': None, 'ticker': ticker, 'trader_id': 'ANON', 'type': 'LIMIT', 'action': action,
+                        'price': price, 'quantity': quantity, 'quantity_filled': 0, 'tick': self.tick, 'status': 'OPEN'}
+                       for price, quantity in self.books[ticker][side]]
+            entries.extend(dict(o) for o in self.orders.values()
+                           if o['ticker'] == ticker and o['status'] == 'OPEN' and o['action'] == action)
+            entries.sort(key=lambda e: -e['price'] if side == 'bids' else e['price'])
+            result[side] = entries[:limit]
+        return 200, result
+
+    # --- Leases ---
+
+    def lease(self, ticker, from1=None, quantity1=None):
+        spec = LEASES.get(ticker)
+        if spec is None:
+            return 400, {'code': 'INVALID_TICKER', 'message': f'Unknown lease {ticker}'}
+
+        lease = {
+            'id': self.next_lease_id,
+            'ticker': ticker,
+            'type': spec['type'],
+            'start_lease_period': 1,
+            'start_lease_tick': self.tick,
+            'next_lease_period': 1,
+            'next_lease_tick': self.tick + spec.get('period', spec.get('duration', 0)),
+            'containment_usage': 0,
+            'in_process': [],
+        }
+
+        if spec['type'] == 'TRANSPORT':
+            if from1 is None or quantity1 is None:
+                return 400, {'code': 'INVALID_LEASE', 'message': 'Transport leases require from1 and quantity1'}
+            if self.positions.get(from1, 0) < quantity1:
+                return 400, {'code': 'INSUFFICIENT', 'message': f'Not enough {from1} to transport'}
+            self.positions[from1] -= quantity1
+            lease['containment_usage'] = quantity1
+            lease['in_process'].append((self.tick + spec['duration'], spec['destination'], quantity1))
+
+        self.next_lease_id += 1
+        self.cash -= self.lease_costs[ticker]
+        self.leases[lease['id']] = lease
+        return 200, _public_lease(lease)
+
+    def use_lease(self, lease_id, from1, quantity1):
+        lease = self.leases.get(lease_id)
+        if lease is None:
+            return 404, {'code': 'NOT_FOUND', 'message': f'Lease {lease_id} not found'}
+        spec = LEASES[lease['ticker']]
+        if spec['type'] != 'REFINERY':
+            return 400, {'code': 'INVALID_LEASE', 'message': f"{lease['ticker']} cannot be used"}
+        if lease['in_process'] or from1 not in spec['inputs'] or quantity1 != spec['inputs'][from1]:
+            return 400, {'code': 'INVALID_LEASE', 'message': 'Refinery is busy or input is invalid'}
+        if self.positions.get(from1, 0) < quantity1:
+            return 400, {'code': 'INSUFFICIENT', 'message': f'Not enough {from1} to refine'}
+
+        self.positions[from1] -= quantity1
+        lease['containment_usage'] = quantity1
+        for output, quantity in spec['outputs'].items():
+            lease['in_process'].append((self.tick + spec['duration'], output, quantity))
+        return 200, _public_lease(lease)
+
+    def close_lease(self, lease_id):
+        lease = self.leases.pop(lease_id, None)
+        if lease is None:
+            return 404, {'code': 'NOT_FOUND', 'message': f'Lease {lease_id} not found'}
+        return 200, {'success': True}
+
+    def _process_leases(self):
+        for lease in list(self.leases.values()):
+            spec = LEASES[lease['ticker']]
+            done = [item for item in lease['in_process'] if item[0] <= self.tick]
+            for _, ticker, quantity in done:
+                self.positions[ticker] += quantity
+            lease['in_process'] = [item for item in lease['in_process'] if item[0] > self.tick]
+            if done and not lease['in_process']:
+                lease['containment_usage'] = 0
+                if spec['type'] == 'TRANSPORT':
+                    del self.leases[lease['id']]
+                    continue
+            if 'period' in spec and self.tick >= lease['next_lease_tick']:
+                self.cash -= self.lease_costs[lease['ticker']]
+                lease['next_lease_tick'] += spec['period']
+
+    def _enforce_storage(self):
+        """
+        Update storage usage and sell any barrels without storage at a distressed price.
+        """
+        for ticker, storage in PHYSICAL_STORAGE.items():
+            tanks = sorted((lease for lease in self.leases.values() if lease['ticker'] == storage), key=lambda l: l['id'])
+            held = max(0, self.positions[ticker])
+            for tank in tanks:
+                tank['containment_usage'] = min(held, LEASES[storage]['capacity'])
+                held -= tank['containment_usage']
+            if held > 0:
+                price = self.last_price(ticker) - DISTRESSED_DISCOUNT
+                self.positions[ticker] -= held
+                self.cash += price * held * SECURITIES[ticker]['multiplier']
+
+    # --- News ---
+
+    def _release_news(self):
+        while self.news_script and self.news_script[0][0] <= self.tick:
+            _, headline, ticker = self.news_script.pop(0)
+            self.news.insert(0, {
+                'news_id': self.next_news_id,
+                'period': 1,
+                'tick': self.tick,
+                'ticker': ticker,
+                'headline': headline,
+                'body': headline,
+            })
+            self.next_news_id += 1
+            self._apply_news(headline, ticker)
+
+    def _apply_news(self, headline, ticker):
+        match = EIA_PATTERN.search(headline)
+        if match:
+            actual = int(match.group(2)) * (-1 if match.group(1) == 'DRAW' else 1)
+            forecast = int(match.group(4)) * (-1 if match.group(3) == 'DRAW' else 1)
+            self.prices['CL'] -= (actual - forecast) * EIA_SENSITIVITY
+        elif ticker in self.lease_costs:
+            match = PIPELINE_COST_PATTERN.search(headline)
+            if match:
+                self.lease_costs[ticker] = int(match.group(1).replace(',', ''))
+        else:
+            self.prices['CL'] += self.rng.gauss(0, 0.5)
+        self._update_linked_prices()
+
+    # --- Account ---
+
+    def nlv(self):
+        return self.cash + sum(position * self.prices[ticker] * SECURITIES[ticker]['multiplier']
+                               for ticker, position in self.positions.items())
+
+    def limits(self):
+        net = sum(self.positions[ticker] for ticker in LIMIT_TICKERS)
+        gross = sum(abs(self.positions[ticker]) for ticker in LIMIT_TICKERS)
+        return [{'name': 'LIMIT-CRUDE', 'gross': gross, 'net': net, 'gross_limit': 500, 'net_limit': 100,
+                 'gross_fine': 0, 'net_fine': 0}]
+
+    def securities(self):
+        result = []
+        for ticker, spec in SECURITIES.items():
+            bids, asks = self.books[ticker]['bids'], self.books[ticker]['asks']
+            result.append({
+                'ticker': ticker,
+                'type': 'FUTURE' if ticker.endswith('F') else 'STOCK' if spec['multiplier'] == 1 else 'SPOT',
+                'position': self.positions[ticker],
+                'last': self.last_price(ticker),
+                'bid': bids[0][0] if bids else 0,
+                'ask': asks[0][0] if asks else 0,
+                'volume': self.volume[ticker],
+                'multiplier': spec['multiplier'],
+            })
+        return result
+
+    # --- Dispatch ---
+
+    def dispatch(self, method, path, params):
+        """
+        Handle one API request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path below /v1, e.g. '/orders/12'.
+            params (dict): Query parameters, single-valued.
+
+        Returns:
+            tuple: (status code (int), JSON-serializable payload).
+        """
+        with self.lock:
+            self.sync()
+            parts = [p for p in path.split('/') if p]
+            try:
+                return self._route(method, parts, params)
+            except (KeyError, ValueError) as e:
+                return 400, {'code': 'BAD_REQUEST', 'message': str(e)}
+
+    def _route(self, method, parts, params):
+        route = (method, parts[0] if parts else '', len(parts))
+
+        if route == ('GET', 'case', 1):
+            status = 'ACTIVE' if self.tick < self.ticks_per_period else 'STOPPED'
+            return 200, {'name': 'MOCK', 'period': 1, 'tick': self.tick, 'ticks_per_period': self.ticks_per_period,
+                         'total_periods': 1, 'status': status, 'is_enforce_trading_limits': False}
+        if route == ('GET', 'trader', 1):
+            return 200, {'trader_id': 'mock', 'first_name': 'Mock', 'last_name': 'Trader', 'nlv': round(self.nlv(), 2)}
+        if route == ('GET', 'limits', 1):
+            return 200, self.limits()
+        if route == ('GET', 'securities', 1):
+            securities = self.securities()
+            if 'ticker' in params:
+                securities = [s for s in securities if s['ticker'] == params['ticker']]
+            return 200, securities
+        if route == ('GET', 'securities', 2) and parts[1] == 'book':
+            return self.book(params['ticker'], int(params.get('limit', 20)))
+        if route == ('GET', 'news', 1):
+            since = int(params.get('since', 0))
+            items = [n for n in self.news if n['news_id'] > since]
+            return 200, items[:int(params.get('limit', 20))]
+        if route == ('GET', 'orders', 1):
+            status = params.get('status', 'OPEN')
+            return 200, [dict(o) for o in self.orders.values() if o['status'] == status]
+        if route == ('GET', 'orders', 2):
+            order = self.orders.get(int(parts[1]))
+            return (200, dict(order)) if order else (404, {'code': 'NOT_FOUND', 'message': 'Order not found'})
+        if route == ('POST', 'orders', 1):
+            price = float(params['price']) if 'price' in params else None
+            quantity = int(float(params['quantity']))
+            return self.place_order(params['ticker'], quantity, params['action'], params.get('type', 'MARKET'), price)
+        if route == ('DELETE', 'orders', 2):
+            return self.cancel_order(int(parts[1]))
+        if route == ('POST', 'commands', 2) and parts[1] == 'cancel':
+            return 200, {'cancelled_order_ids': self._bulk_cancel(params)}
+        if route == ('GET', 'leases', 1):
+            leases = [_public_lease(l) for l in self.leases.values()]
+            if 'ticker' in params:
+                leases = [l for l in leases if l['ticker'] == params['ticker']]
+            return 200, leases
+        if route == ('POST', 'leases', 1):
+            quantity1 = int(float(params['quantity1'])) if 'quantity1' in params else None
+            return self.lease(params['ticker'], params.get('from1'), quantity1)
+        if route == ('POST', 'leases', 2):
+            return self.use_lease(int(parts[1]), params.get('from1'), int(float(params.get('quantity1', 0))))
+        if route == ('DELETE', 'leases', 2):
+            return self.close_lease(int(parts[1]))
+
+        return 404, {'code': 'NOT_FOUND', 'message': f"No route for {method} /{'/'.join(parts)}"}
+
+    def _bulk_cancel(self, params):
+        open_orders = [o for o in self.orders.values() if o['status'] == 'OPEN']
+        if params.get('all') in ('1', 'true', 'True'):
+            targets = open_orders
+        elif 'ticker' in params:
+            targets = [o for o in open_orders if o['ticker'] == params['ticker']]
+        elif 'ids' in params:
+            ids = {int(i) for i in params['ids'].split(',') if i}
+            targets = [o for o in open_orders if o['order_id'] in ids]
+        else:
+            targets = []
+        for order in targets:
+            order['status'] = 'CANCELLED'
+        return [o['order_id'] for o in targets]
+
+
+def _public_lease(lease):
+    return {key: value for key, value in lease.items() if key != 'in_process'}
+
+
+def _pipeline_ticker(headline):
+    if 'ALASKA TO CUS' in headline:
+        return 'AK-CS-PIPE'
+    if 'CUSHING TO NYC' in headline:
+        return 'CS-NYC-PIPE'
+    return 'CL'
+
+
+def default_news_script(rng, ticks, interval=30):
+    """
+    Build a news script: a weekly EIA report alternating with headlines taken
+    from the news impact log.
+
+    Args:
+        rng (random.Random): Random source.
+        ticks (int): Length of the case in ticks.
+        interval (int): Ticks between headlines.
+
+    Returns:
+        list: (tick, headline, ticker) tuples.
+    """
+    headlines = []
+    if os.path.exists(NEWS_LOG_FILE):
+        with open(NEWS_LOG_FILE, newline='') as file:
+            headlines = sorted({row['headline'] for row in csv.DictReader(file)
+                                if 'ACTUAL' not in row['headline'] and 'Welcome' not in row['headline']})
+
+    script = [(1, 'Welcome to the COM5 case', '')]
+    week = 1
+    for i, tick in enumerate(range(interval, ticks, interval)):
+        if i % 2 == 0 or not headlines:
+            actual, forecast = rng.randint(1, 15), rng.randint(1, 10)
+            headline = (f"WEEK {week} CL ACTUAL {rng.choice(['DRAW', 'BUILD'])} {actual} MLN BBLS "
+                        f"VS FORECAST {rng.choice(['DRAW', 'BUILD'])} {forecast} MLN BBLS")
+            script.append((tick, headline, 'CL'))
+            week += 1
+        else:
+            headline = rng.choice(headlines)
+            script.append((tick, headline, _pipeline_ticker(headline)))
+    return script
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end for an Exchange, mimicking the RIT client's REST API.
+    """
+    exchange = None
+    latency = 0.0
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        if self.headers.get('X-API-Key') != API_KEY:
+            return self._respond(401, {'code': 'UNAUTHORIZED', 'message': 'Invalid API key'})
+        if not url.path.startswith('/v1'):
+            return self._respond(404, {'code': 'NOT_FOUND', 'message': url.path})
+
+        if self.latency:
+            time.sleep(self.latency)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        status, payload = self.exchange.dispatch(method, url.path[len('/v1'):], params)
+        self._respond(status, payload)
+
+    def _respond(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    """
+    Threading HTTP server with a listen backlog deep enough for concurrent request batches.
+    """
+    request_queue_size = 128
+
+
+def serve(port=PORT, tick_seconds=1.0, seed=0, ticks=600, latency_ms=0.0):
+    """
+    Run the mock RIT server until interrupted.
+    """
+    exchange = Exchange(seed=seed, ticks_per_period=ticks, tick_seconds=tick_seconds)
+    RequestHandler.exchange = exchange
+    RequestHandler.latency = latency_ms / 1000
+    server = MockHTTPServer(('localhost', port), RequestHandler)
+    server.daemon_threads = True
+    print(f"[INFO] Mock RIT server on http://localhost:{port}/v1 ({ticks} ticks, {tick_seconds}s per tick)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[INFO] Stopped at tick {exchange.tick}, NLV {exchange.nlv():,.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the RIT REST API.")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--tick-seconds', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Artificial delay added to every request")
+    args = parser.parse_args()
+    serve(args.port, args.tick_seconds, args.seed, args.ticks, args.latency_ms)
@@ -0,0 +1,160 @@
+"""
+news_feed.py
+
+Incremental news feed. Fetches only the items after the last seen news_id,
+parses each headline once, and hands every new item to each subscriber
+exactly once.
+
+A NewsListener can take over fetching on a background thread: urgent
+subscribers then fire the moment a headline arrives, and the rest are
+queued until the main loop drains the feed.
+"""
+
+from collections import OrderedDict
+import queue
+import threading
+import time
+import helper
+import metrics
+
+CACHE_SIZE = 500  # Parsed items kept in memory
+LISTENER_POLL_INTERVAL = 0.02  # Seconds between /news polls on the listener thread
+RETRY_DELAY = 0.1
+
+
+class NewsFeed:
+    """
+    Cursor-based reader of /news with fan-out to subscribers.
+
+    Subscribers are called as callback(session, item, snapshot), oldest item
+    first. If a parser is given, its result for the headline is stored on the
+    item under 'event' before dispatch.
+    """
+
+    def __init__(self, parser=None, replay_backlog=False):
+        self.parser = parser
+        self.replay_backlog = replay_backlog
+        self.cursor = None
+        self.items = OrderedDict()
+        self.subscribers = []
+        self.urgent_subscribers = []
+        self.pending = queue.Queue()  # Items fetched by a listener, awaiting regular subscribers
+        self.listener = None
+
+    def subscribe(self, callback, urgent=False):
+        """
+        Register a subscriber. Urgent subscribers run on the listener thread
+        as soon as an item is fetched, when a listener is attached.
+        """
+        (self.urgent_subscribers if urgent else self.subscribers).append(callback)
+        return callback
+
+    def fetch(self, session):
+        """
+        Fetch and parse the items published since the last fetch.
+
+        On the first fetch only the newest item is returned, unless the feed
+        was created with replay_backlog, so stale headlines are not acted on.
+
+        Returns:
+            list: New news items, oldest first.
+        """
+        news_items = helper.get_latest_news(session, since=self.cursor)
+        new_items = sorted((news for news in news_items
+                            if self.cursor is None or news['news_id'] > self.cursor),
+                           key=lambda news: news['news_id'])
+        if not new_items:
+            return []
+
+        first_fetch = self.cursor is None
+        self.cursor = new_items[-1]['news_id']
+        if first_fetch and not self.replay_backlog:
+            new_items = new_items[-1:]
+
+        for news in new_items:
+            news['headline'] = news.get('headline', '').upper()
+            if self.parser is not None:
+                news['event'] = self.parser(news['headline'])
+            self.items[news['news_id']] = news
+        while len(self.items) > CACHE_SIZE:
+            self.items.popitem(last=False)
+
+        return new_items
+
+    def dispatch(self, session, news, snapshot, callbacks):
+        for callback in callbacks:
+            try:
+                callback(session, news, snapshot)
+            except Exception as e:
+                print(f"[ERROR] News subscriber {callback.__name__} failed on news {news['news_id']}: {e}")
+
+    def drain(self):
+        """
+        Take every item queued by the listener.
+
+        Returns:
+            list: Queued news items, oldest first.
+        """
+        items = []
+        while True:
+            try:
+                items.append(self.pending.get_nowait())
+            except queue.Empty:
+                return items
+
+    def poll(self, session, snapshot=None):
+        """
+        Dispatch new items to the subscribers.
+
+        With a running listener, this hands the queued items to the regular
+        subscribers (urgent ones have already seen them). Otherwise it fetches
+        new items and dispatches each one to every subscriber.
+
+        Returns:
+            list: New news items, oldest first.
+        """
+        if self.listener is not None and self.listener.is_alive():
+            new_items = self.drain()
+            callbacks = self.subscribers
+        else:
+            new_items = self.fetch(session)
+            callbacks = self.urgent_subscribers + self.subscribers
+
+        for news in new_items:
+            self.dispatch(session, news, snapshot, callbacks)
+        return new_items
+
+
+class NewsListener(threading.Thread):
+    """
+    Background thread that polls a NewsFeed at high frequency on its own
+    session, runs the urgent subscribers immediately and queues every item
+    for the regular subscribers.
+    """
+
+    def __init__(self, feed, session, poll_interval=LISTENER_POLL_INTERVAL):
+        super().__init__(name='news-listener', daemon=True)
+        self.feed = feed
+        self.session = session
+        self.poll_interval = poll_interval
+        self.stopped = threading.Event()
+        feed.listener = self
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        with metrics.track_model('news_listener'):
+            while not self.stopped.is_set():
+                try:
+                    for news in self.feed.fetch(self.session):
+                        received = time.perf_counter()
+                        self.feed.dispatch(self.session, news, None, self.feed.urgent_subscribers)
+                        if self.feed.urgent_subscribers:
+                            elapsed = (time.perf_counter() - received) * 1000
+                            print(f"[NEWS] Handled news {news['news_id']} in {elapsed:.1f} ms")
+                        self.feed.pending.put(news)
+                except Exception as e:
+                    print(f"[ERROR] News listener: {e}")
+                    self.stopped.wait(RETRY_DELAY)
+                self.stopped.wait(self.poll_interval)
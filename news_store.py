@@ -0,0 +1,303 @@
+"""
+news_store.py
+
+Columnar store of logged news impacts. Rows of news_impact_log.csv are
+classified once and held in NumPy columns (news_id, category, start, end,
+tick, ticker, plus the headline, its expected direction and EIA surprise),
+cached on disk as .npz, and summarised with vectorized aggregates.
+
+Usage:
+    python news_store.py         # rebuild the store and print category stats
+"""
+
+import csv
+import os
+import re
+import numpy as np
+import headlines
+
+LOG_FILE = "news_impact_log.csv"
+STORE_FILE = "news_impact_store.npz"
+DEFAULT_TICKER = 'CL-2F'
+STOPWORDS = frozenset({'A', 'AN', 'THE', 'TO', 'OF', 'IN', 'ON', 'FOR', 'AND', 'AS', 'BY', 'AT', 'IS', 'WITH', 'PER'})
+
+_TOKEN = re.compile(r"[A-Z][A-Z&/'-]*")
+
+COLUMNS = ('news_id', 'category', 'start', 'end', 'tick', 'ticker', 'headline', 'direction', 'surprise')
+CATEGORY_CODES = {category: code for code, category in enumerate(headlines.CATEGORIES)}
+
+
+class NewsImpactStore:
+    """
+    Column arrays of logged headlines and the price moves that followed them.
+
+    Category is stored as an index into headlines.CATEGORIES; tick is -1 and
+    surprise NaN where unknown. Per (category, ticker) statistics are computed
+    in one vectorized pass and cached, so impact() is a dictionary lookup.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = columns if columns is not None else _empty_columns()
+        self._stats = None
+        self._index = None
+
+    def __len__(self):
+        return len(self.columns['news_id'])
+
+    @property
+    def move(self):
+        return self.columns['end'] - self.columns['start']
+
+    # --- Ingestion and persistence ---
+
+    def ingest(self, rows):
+        """
+        Classify and append log rows. Rows without a start or end price (a
+        quote that had no bid when it was logged) are skipped.
+
+        Args:
+            rows (iterable): Dicts with the news_impact_log.csv columns.
+
+        Returns:
+            int: Number of rows added.
+        """
+        added = {name: [] for name in COLUMNS}
+        skipped = 0
+        for row in rows:
+            try:
+                news_id, start, end = int(row['news_id']), float(row['start']), float(row['end'])
+                tick = int(row['tick']) if row.get('tick') else -1
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            event = headlines.classify(row['headline'])
+            added['news_id'].append(news_id)
+            added['category'].append(CATEGORY_CODES[event.category])
+            added['start'].append(start)
+            added['end'].append(end)
+            added['tick'].append(tick)
+            added['ticker'].append(row.get('ticker') or DEFAULT_TICKER)
+            added['headline'].append(row['headline'])
+            added['direction'].append(event.direction)
+            added['surprise'].append(event.surprise if event.surprise is not None else np.nan)
+
+        if skipped:
+            print(f"[INFO] Skipped {skipped} news impact row(s) without a start or end price.")
+        if added['news_id']:
+            new = _as_columns(added)
+            self.columns = {name: np.concatenate([self.columns[name], new[name]]) for name in COLUMNS}
+            self._stats = None
+            self._index = None
+        return len(added['news_id'])
+
+    @classmethod
+    def from_csv(cls, path=LOG_FILE):
+        store = cls()
+        if os.path.exists(path):
+            with open(path, newline='') as file:
+                store.ingest(csv.DictReader(file))
+        return store
+
+    def save(self, path=STORE_FILE):
+        np.savez(path, **self.columns)
+
+    @classmethod
+    def load(cls, path=STORE_FILE, log_path=LOG_FILE):
+        """
+        Load the store, rebuilding it from the log when the log is newer than the cache.
+
+        Returns:
+            NewsImpactStore: The loaded store.
+        """
+        if os.path.exists(path) and (not os.path.exists(log_path)
+                                     or os.path.getmtime(path) >= os.path.getmtime(log_path)):
+            with np.load(path) as data:
+                return cls({name: data[name] for name in COLUMNS})
+
+        store = cls.from_csv(log_path)
+        if len(store):
+            store.save(path)
+        return store
+
+    # --- Queries ---
+
+    def category_stats(self, ticker=DEFAULT_TICKER):
+        """
+        Price move statistics per headline category for one ticker.
+
+        The hit rate is the share of headlines with an expected direction whose
+        move had that sign; it is NaN for categories without one.
+
+        Returns:
+            dict: Category -> {'count', 'mean', 'var', 'hit_rate'}.
+        """
+        mask = self.columns['ticker'] == ticker
+        codes = self.columns['category'][mask]
+        move = self.move[mask]
+        direction = self.columns['direction'][mask]
+        size = len(headlines.CATEGORIES)
+
+        count = np.bincount(codes, minlength=size)
+        total = np.bincount(codes, weights=move, minlength=size)
+        squares = np.bincount(codes, weights=move ** 2, minlength=size)
+        directed = np.bincount(codes, weights=(direction != 0), minlength=size)
+        hits = np.bincount(codes, weights=(np.sign(move) == direction) & (direction != 0), minlength=size)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            var = squares / count - mean ** 2
+            hit_rate = hits / directed
+
+        return {category: {'count': int(count[code]), 'mean': mean[code], 'var': max(var[code], 0.0),
+                           'hit_rate': hit_rate[code]}
+                for code, category in enumerate(headlines.CATEGORIES) if count[code]}
+
+    def impact(self, category, ticker=DEFAULT_TICKER):
+        """
+        Historical impact of a headline category, from the cached statistics.
+
+        Returns:
+            dict: {'count', 'mean', 'var', 'hit_rate'}, or None if the category was never logged.
+        """
+        if self._stats is None:
+            self._stats = {}
+        if ticker not in self._stats:
+            self._stats[ticker] = self.category_stats(ticker)
+        return self._stats[ticker].get(category)
+
+    def distribution(self, category, ticker=DEFAULT_TICKER, bins=10):
+        """
+        Histogram of the price moves that followed a headline category.
+
+        Returns:
+            tuple: (counts (np.ndarray), bin edges (np.ndarray)).
+        """
+        mask = (self.columns['ticker'] == ticker) & (self.columns['category'] == CATEGORY_CODES[category])
+        return np.histogram(self.move[mask], bins=bins)
+
+    def conditional_moves(self, edges, ticker=DEFAULT_TICKER):
+        """
+        Mean move and count of EIA reports grouped by surprise bucket.
+
+        Args:
+            edges (array-like): Surprise bucket edges in mln bbls.
+
+        Returns:
+            tuple: (counts (np.ndarray), mean moves (np.ndarray)), one entry per bucket.
+        """
+        mask = (self.columns['ticker'] == ticker) & ~np.isnan(self.columns['surprise'])
+        buckets = np.digitize(self.columns['surprise'][mask], edges) - 1
+        inside = (buckets >= 0) & (buckets < len(edges) - 1)
+        counts = np.bincount(buckets[inside], minlength=len(edges) - 1)
+        totals = np.bincount(buckets[inside], weights=self.move[mask][inside], minlength=len(edges) - 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return counts, totals / counts
+
+    def similar(self, headline, k=5, ticker=DEFAULT_TICKER):
+        """
+        Most similar logged headlines and the moves that followed them.
+
+        Returns:
+            list: (similarity (float), headline (str), move (float)), most similar first.
+        """
+        return self.build_index(ticker).query(headline, k)
+
+    def build_index(self, ticker=DEFAULT_TICKER):
+        """
+        Build (once) the headline index of one ticker's rows, so similar() is a lookup.
+
+        Returns:
+            HeadlineIndex: The ticker's index.
+        """
+        if self._index is None:
+            self._index = {}
+        if ticker not in self._index:
+            rows = np.flatnonzero(self.columns['ticker'] == ticker)
+            self._index[ticker] = HeadlineIndex(self.columns['headline'][rows], self.move[rows])
+        return self._index[ticker]
+
+
+def tokenize(headline):
+    """
+    Split a headline into its distinct word tokens, dropping numbers and stopwords.
+    """
+    return {token for token in _TOKEN.findall(headline.upper()) if token not in STOPWORDS}
+
+
+class HeadlineIndex:
+    """
+    Inverted token index over logged headlines.
+
+    Each token maps to the array of rows containing it, weighted by inverse
+    document frequency. A query only touches the postings of its own tokens
+    and scores rows by cosine similarity of their IDF-weighted token sets.
+    """
+
+    def __init__(self, headlines, moves):
+        self.headlines = np.asarray(headlines)
+        self.moves = np.asarray(moves, dtype=np.float64)
+
+        postings = {}
+        row_tokens = []
+        for row, headline in enumerate(self.headlines):
+            tokens = tokenize(str(headline))
+            row_tokens.append(tokens)
+            for token in tokens:
+                postings.setdefault(token, []).append(row)
+
+        size = max(len(self.headlines), 1)
+        self.idf = {token: np.log(1 + size / len(rows)) for token, rows in postings.items()}
+        self.postings = {token: np.asarray(rows, dtype=np.int32) for token, rows in postings.items()}
+        self.norms = np.array([np.sqrt(sum(self.idf[token] ** 2 for token in tokens)) or 1.0
+                               for tokens in row_tokens])
+
+    def query(self, headline, k=5):
+        """
+        Find the k logged headlines most similar to a headline.
+
+        Returns:
+            list: (similarity (float), headline (str), move (float)), most similar first.
+        """
+        tokens = [token for token in tokenize(headline) if token in self.postings]
+        if not tokens:
+            return []
+
+        scores = np.zeros(len(self.headlines))
+        for token in tokens:
+            scores[self.postings[token]] += self.idf[token] ** 2
+        query_norm = np.sqrt(sum(self.idf[token] ** 2 for token in tokens))
+        scores /= self.norms * query_norm
+
+        k = min(k, np.count_nonzero(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(scores[row], str(self.headlines[row]), self.moves[row]) for row in top]
+
+
+def _as_columns(values):
+    return {
+        'news_id': np.asarray(values['news_id'], dtype=np.int32),
+        'category': np.asarray(values['category'], dtype=np.int8),
+        'start': np.asarray(values['start'], dtype=np.float64),
+        'end': np.asarray(values['end'], dtype=np.float64),
+        'tick': np.asarray(values['tick'], dtype=np.int32),
+        'ticker': np.asarray(values['ticker'], dtype='U12'),
+        'headline': np.asarray(values['headline'], dtype=str),
+        'direction': np.asarray(values['direction'], dtype=np.int8),
+        'surprise': np.asarray(values['surprise'], dtype=np.float64),
+    }
+
+
+def _empty_columns():
+    return _as_columns({name: [] for name in COLUMNS})
+
+
+if __name__ == "__main__":
+    store = NewsImpactStore.from_csv()
+    store.save()
+    print(f"Stored {len(store)} rows in {STORE_FILE}")
+    for ticker in np.unique(store.columns['ticker']):
+        print(f"{ticker}:")
+        for category, stats in store.category_stats(ticker).items():
+            print(f"  {category:<18} n={stats['count']:<4} mean={stats['mean']:+.3f} "
+                  f"var={stats['var']:.3f} hit={stats['hit_rate']:.2f}")
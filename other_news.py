@@ -1,7 +1,10 @@
 # other_news.py
 
 import time
+import atexit
 import csv
+import hashlib
+import heapq
 import os
 import helper
 import requests
@@ -9,6 +12,12 @@ from config import API_KEY
 
 CSV_FILE = "news_impact_log.csv"
 HOLD_TICKS = 20
+TICKERS = ['CL', 'CL-2F', 'HO', 'RB']  # Prices followed for every headline
+FIELDNAMES = ['news_id', 'headline', 'start', 'end', 'tick', 'ticker']
+LEGACY_TICKER = 'CL-2F'  # Ticker of rows logged before the tick/ticker columns existed
+INDEX_FILE = "news_impact_log.ids"  # Sidecar index of news_ids logged this session
+FLUSH_ROWS = 40       # Buffered rows that trigger a write
+FLUSH_INTERVAL = 5.0  # Seconds between writes while rows are buffered
 
 
 def initialize_session():
@@ -17,32 +26,155 @@ def initialize_session():
     return session
 
 
-def load_seen_ids():
-    seen = set()
-    if os.path.exists(CSV_FILE):
-        with open(CSV_FILE, mode='r', newline='') as file:
-            reader = csv.DictReader(file)
-            if 'news_id' in reader.fieldnames:
-                for row in reader:
-                    seen.add(row['news_id'])
-            else:
-                print("[WARN] Existing CSV has no 'news_id' column. Starting fresh.")
-    return seen
-
-
-def save_to_csv(news_id, headline, start_price, end_price):
-    file_exists = os.path.isfile(CSV_FILE)
-    with open(CSV_FILE, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(['news_id', 'headline', 'start', 'end'])
-        writer.writerow([news_id, headline, start_price, end_price])
+def upgrade_log():
+    """
+    Rewrite a log in the old news_id/headline/start/end layout with the tick
+    and ticker columns, so new rows can be appended to it.
+    """
+    if not os.path.exists(CSV_FILE):
+        return
+    with open(CSV_FILE, mode='r', newline='') as file:
+        reader = csv.DictReader(file)
+        if reader.fieldnames is None or 'ticker' in reader.fieldnames or 'news_id' not in reader.fieldnames:
+            return
+        rows = list(reader)
+
+    with open(CSV_FILE, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(row, tick='', ticker=LEGACY_TICKER))
+    print(f"[INFO] Upgraded {CSV_FILE} with tick and ticker columns.")
+
+
+class NewsLogWriter:
+    """
+    Appends rows to the news impact log through one open file handle.
+
+    Rows are buffered and written when flush_rows are waiting or
+    flush_interval seconds have passed, and on close. Logged news_ids go to
+    a sidecar index (one "news_id,headline hash" line each) so a restarted
+    logger knows what it already logged without rereading the log. news_ids
+    restart every case session, so the index is only reused when it agrees
+    with the items /news currently returns: every id in both has the same
+    headline, and /news has got at least as far as the index.
+    """
+
+    def __init__(self, path=CSV_FILE, index_path=INDEX_FILE, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.index_path = index_path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rows = []
+        self.logged = []
+        self.last_flush = time.time()
+        self.file = None
+        self.index = None
+
+    def open(self, news_items):
+        """
+        Open the log and index for appending.
+
+        Args:
+            news_items (list): Current /news items, used to tell whether the index belongs to this session.
+
+        Returns:
+            set: news_ids already logged in this session.
+        """
+        upgrade_log()
+        seen = set()
+        if os.path.exists(self.index_path):
+            with open(self.index_path, mode='r') as file:
+                entries = [line.strip().split(',') for line in file if line.strip()]
+            logged = {int(entry[0]): entry[1] for entry in entries if len(entry) == 2 and entry[0].isdigit()}
+            if len(logged) == len(entries) and same_session(logged, news_items):
+                seen = set(logged)
+
+        new_file = not os.path.isfile(self.path)
+        self.file = open(self.path, mode='a', newline='')
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(FIELDNAMES)
+        # A fresh session starts a fresh index
+        self.index = open(self.index_path, mode='a' if seen else 'w')
+        return seen
+
+    def write(self, news_id, headline, rows):
+        """
+        Buffer the rows logged for one news item.
+
+        Args:
+            news_id (int): News item ID.
+            headline (str): The item's headline.
+            rows (list): Rows in FIELDNAMES order.
+        """
+        self.rows.extend(rows)
+        self.logged.append(f"{news_id},{headline_hash(headline)}\n")
+        if len(self.rows) >= self.flush_rows:
+            self.flush()
+
+    def maybe_flush(self):
+        if self.rows and time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.writer.writerows(self.rows)
+        self.file.flush()
+        # The index is written after the rows, so an item is never marked seen without its rows
+        self.index.writelines(self.logged)
+        self.index.flush()
+        self.rows = []
+        self.logged = []
+        self.last_flush = time.time()
+
+    def close(self):
+        if self.file is None or self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        self.index.close()
+
+
+def headline_hash(headline):
+    return hashlib.sha1(headline.encode()).hexdigest()[:8]
+
+
+def same_session(logged, news_items):
+    """
+    Tell whether logged news_ids come from the session the news items are from.
+
+    Args:
+        logged (dict): news_id -> headline hash, from the index.
+        news_items (list): Current /news items.
+
+    Returns:
+        bool: True if /news has reached the last logged id and agrees on every id in both.
+    """
+    current = {item['news_id']: headline_hash(item.get('headline', '')) for item in news_items}
+    if not logged or not current or max(logged) > max(current):
+        return False
+    return all(current[news_id] == digest for news_id, digest in logged.items() if news_id in current)
+
+
+def tick_bids(session, tick, cache):
+    """
+    Return the bids of all followed tickers for this tick, fetching them with
+    one request the first time the tick is seen.
+    """
+    if cache.get('tick') != tick:
+        quotes = helper.get_quotes(session, TICKERS)
+        cache['tick'] = tick
+        cache['bids'] = {ticker: bid for ticker, (bid, ask) in quotes.items()}
+    return cache['bids']
 
 
 def main():
     session = initialize_session()
-    seen_news_ids = load_seen_ids()
-    pending = []
+    log_writer = NewsLogWriter()
+    seen_news_ids = log_writer.open(helper.get_latest_news(session))
+    atexit.register(log_writer.close)
+    pending = []  # Min-heap of (maturity tick, news_id, item)
+    quote_cache = {}
 
     print("[INFO] Starting tick-based news impact logger...")
 
@@ -50,7 +182,6 @@ def main():
         try:
             current_tick = helper.get_tick(session)
             news_items = helper.get_latest_news(session)
-            first_bid = helper.ticker_bid_ask(session, 'CL-2F')[0]  # Get only the bid
 
             # Add new unseen news items
             for news in news_items:
@@ -59,24 +190,25 @@ def main():
                 if news_id not in seen_news_ids:
                     print(f"[NEW] {headline}")
                     seen_news_ids.add(news_id)
-                    pending.append({
+                    heapq.heappush(pending, (current_tick + HOLD_TICKS, news_id, {
                         "headline": headline,
                         "start_tick": current_tick,
-                        "start_price": first_bid,
+                        "start_prices": tick_bids(session, current_tick, quote_cache),
                         "news_id": news_id
-                    })
-
-            # Process matured news entries
-            still_pending = []
-            for item in pending:
-                if current_tick - item['start_tick'] >= HOLD_TICKS:
-                    last_bid = helper.ticker_bid_ask(session, 'CL-2F')[0]  # Get only the bid
-                    save_to_csv(item['news_id'], item['headline'], item['start_price'], last_bid)
-                    print(f"[LOGGED] {item['headline']} | {item['start_price']} → {last_bid}")
-                else:
-                    still_pending.append(item)
-
-            pending = still_pending
+                    }))
+
+            # Process matured news entries; all of them share this tick's prices
+            while pending and pending[0][0] <= current_tick:
+                _, _, item = heapq.heappop(pending)
+                end_prices = tick_bids(session, current_tick, quote_cache)
+                log_writer.write(item['news_id'], item['headline'], [
+                    [item['news_id'], item['headline'], item['start_prices'][ticker],
+                     end_prices[ticker], item['start_tick'], ticker]
+                    for ticker in TICKERS
+                ])
+                print(f"[LOGGED] {item['headline']} | CL-2F {item['start_prices']['CL-2F']} → {end_prices['CL-2F']}")
+
+            log_writer.maybe_flush()
             time.sleep(0.5)
 
         except Exception as e:
@@ -0,0 +1,246 @@
+"""
+recorder.py
+
+Tick-level market data recorder. Every snapshot (tick, wall time, top-N
+bids/asks per ticker, positions and net position) is written into a
+fixed-size ring of structured records in a memory-mapped file, so a
+session can be replayed afterwards and other processes can read the data
+zero-copy while trading.
+
+File layout: one HEADER_DTYPE record, then `capacity` RECORD_DTYPE records.
+The header's `count` is the number of records ever written; record i lives
+in slot i % capacity and carries seq = i + 1 once complete. News items are
+appended as JSON lines to a sidecar file next to the recording.
+
+Usage:
+    python recorder.py [path]    # print the latest recorded ticks
+"""
+
+import json
+import os
+import sys
+import time
+import numpy as np
+import helper
+
+RECORDING_FILE = "market_data.rec"
+RECORD_TICKERS = ['CL', 'CL-AK', 'CL-NYC', 'CL-1F', 'CL-2F', 'HO', 'RB', 'ALGO', 'RY']
+DEPTH = 5          # Book levels kept per side
+CAPACITY = 8192    # Records kept before the oldest are overwritten
+MAGIC = b'FTSREC1'
+NEWS_SUFFIX = '.news.jsonl'
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('capacity', np.uint64),
+    ('depth', np.uint32),
+    ('n_tickers', np.uint32),
+    ('tickers', 'S8', (16,)),
+    ('count', np.uint64),
+])
+
+
+def record_dtype(n_tickers, depth):
+    return np.dtype([
+        ('seq', np.uint64),
+        ('tick', np.int32),
+        ('wall_time', np.float64),
+        ('bid_price', np.float64, (n_tickers, depth)),
+        ('bid_qty', np.float64, (n_tickers, depth)),
+        ('ask_price', np.float64, (n_tickers, depth)),
+        ('ask_qty', np.float64, (n_tickers, depth)),
+        ('position', np.float64, (n_tickers,)),
+        ('net', np.float64),
+    ])
+
+
+class MarketRecorder:
+    """
+    Writes snapshots into a memory-mapped ring buffer.
+
+    An existing file with the same tickers, depth and capacity is appended
+    to; otherwise a new one is created. The per-field views are taken once, so
+    writing a record only performs scalar stores into the mapping.
+    """
+
+    def __init__(self, path=RECORDING_FILE, tickers=RECORD_TICKERS, depth=DEPTH, capacity=CAPACITY):
+        self.path = path
+        self.tickers = list(tickers)
+        self.depth = depth
+        self.capacity = capacity
+        self.dtype = record_dtype(len(self.tickers), depth)
+
+        size = HEADER_DTYPE.itemsize + capacity * self.dtype.itemsize
+        reuse = os.path.exists(path) and os.path.getsize(path) == size and self._header_matches()
+        if not reuse:
+            with open(path, 'wb') as file:
+                file.truncate(size)
+        self.header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+        self.records = np.memmap(path, dtype=self.dtype, mode='r+', offset=HEADER_DTYPE.itemsize,
+                                 shape=(capacity,))
+
+        if not reuse:
+            header = self.header[0]
+            header['magic'] = MAGIC
+            header['capacity'] = capacity
+            header['depth'] = depth
+            header['n_tickers'] = len(self.tickers)
+            header['tickers'][:len(self.tickers)] = [ticker.encode() for ticker in self.tickers]
+            header['count'] = 0
+            self.header.flush()
+
+        self.count = int(self.header['count'][0])
+        self._seq = self.records['seq']
+        self._tick = self.records['tick']
+        self._wall_time = self.records['wall_time']
+        self._bid_price = self.records['bid_price']
+        self._bid_qty = self.records['bid_qty']
+        self._ask_price = self.records['ask_price']
+        self._ask_qty = self.records['ask_qty']
+        self._position = self.records['position']
+        self._net = self.records['net']
+        self._count = self.header['count']
+        self.news_file = None
+
+    def _header_matches(self):
+        header = np.memmap(self.path, dtype=HEADER_DTYPE, mode='r', shape=(1,))[0]
+        tickers = [ticker.decode() for ticker in header['tickers'][:header['n_tickers']]]
+        return (header['magic'] == MAGIC and header['capacity'] == self.capacity
+                and header['depth'] == self.depth and tickers == self.tickers)
+
+    def write(self, tick, books, positions, net, wall_time=None):
+        """
+        Write one record.
+
+        Args:
+            tick (int): Case tick.
+            books (dict): Ticker -> book with 'bids' and 'asks' lists, best first.
+                Missing tickers are recorded as NaN.
+            positions (dict): Ticker -> position.
+            net (float): Net position.
+            wall_time (float, optional): Defaults to time.time().
+        """
+        slot = self.count % self.capacity
+        self._seq[slot] = 0  # Mark the slot as being rewritten
+        self._tick[slot] = tick
+        self._wall_time[slot] = time.time() if wall_time is None else wall_time
+
+        for t, ticker in enumerate(self.tickers):
+            book = books.get(ticker)
+            self._write_side(self._bid_price, self._bid_qty, slot, t, book['bids'] if book else ())
+            self._write_side(self._ask_price, self._ask_qty, slot, t, book['asks'] if book else ())
+            self._position[slot, t] = positions.get(ticker, 0)
+        self._net[slot] = net
+
+        self.count += 1
+        self._seq[slot] = self.count
+        self._count[0] = self.count
+
+    def _write_side(self, prices, quantities, slot, t, levels):
+        j = 0
+        for level in levels:
+            if j == self.depth:
+                break
+            prices[slot, t, j] = level['price']
+            quantities[slot, t, j] = level['quantity'] - level.get('quantity_filled', 0)
+            j += 1
+        while j < self.depth:
+            prices[slot, t, j] = np.nan
+            quantities[slot, t, j] = 0.0
+            j += 1
+
+    def record(self, session, snapshot):
+        """
+        Record a MarketSnapshot, fetching the books it does not hold for
+        recorded tickers that trade in this case.
+
+        Args:
+            session (requests.Session): Authenticated session for API requests.
+            snapshot (MarketSnapshot): Market snapshot for this tick.
+        """
+        books = snapshot.books
+        missing = [ticker for ticker in self.tickers if ticker not in books and ticker in snapshot.positions]
+        if missing:
+            books = dict(books)
+            for ticker in missing:
+                books[ticker] = helper.get_book(session, ticker)
+        self.write(snapshot.tick, books, snapshot.positions, snapshot.net_position)
+
+    def record_news(self, session, news, snapshot=None):
+        """
+        Append a news item to the sidecar file. Usable as a NewsFeed subscriber.
+        """
+        if self.news_file is None:
+            self.news_file = open(self.path + NEWS_SUFFIX, mode='a')
+        self.news_file.write(json.dumps({'wall_time': time.time(), 'tick': news.get('tick'), 'news_id': news['news_id'],
+                                         'ticker': news.get('ticker', ''), 'headline': news['headline']}) + '\n')
+        self.news_file.flush()
+
+    def flush(self):
+        self.records.flush()
+        self.header.flush()
+
+
+class RecordingReader:
+    """
+    Read-only, zero-copy view of a recording, usable while it is being written.
+    """
+
+    def __init__(self, path=RECORDING_FILE):
+        self.path = path
+        self.header = np.memmap(path, dtype=HEADER_DTYPE, mode='r', shape=(1,))
+        header = self.header[0]
+        if header['magic'] != MAGIC:
+            raise ValueError(f"{path} is not a market data recording.")
+        self.capacity = int(header['capacity'])
+        self.tickers = [ticker.decode() for ticker in header['tickers'][:header['n_tickers']]]
+        self.dtype = record_dtype(len(self.tickers), int(header['depth']))
+        self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=HEADER_DTYPE.itemsize,
+                                 shape=(self.capacity,))
+
+    @property
+    def count(self):
+        return int(self.header['count'][0])
+
+    def ticker_index(self, ticker):
+        return self.tickers.index(ticker)
+
+    def latest(self, n=None):
+        """
+        Return the last n complete records (all held records if None), oldest first.
+
+        The result is a view into the mapping unless the range wraps around the
+        end of the ring, in which case the two halves are joined into a copy.
+        """
+        count = self.count
+        held = min(count, self.capacity)
+        n = held if n is None else min(n, held)
+        start = (count - n) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            records = self.records[start:end]
+        else:
+            records = np.concatenate([self.records[start:], self.records[:end - self.capacity]])
+        # Drop records still being written or already overwritten
+        complete = records['seq'] == np.arange(count - n + 1, count + 1, dtype=np.uint64)
+        return records if complete.all() else records[complete]
+
+    def news(self, start_time=0.0, end_time=float('inf')):
+        """
+        Return the recorded news items seen between two wall times, oldest first.
+        """
+        if not os.path.exists(self.path + NEWS_SUFFIX):
+            return []
+        with open(self.path + NEWS_SUFFIX) as file:
+            items = [json.loads(line) for line in file if line.strip()]
+        return [item for item in items if start_time <= item['wall_time'] <= end_time]
+
+
+if __name__ == "__main__":
+    reader = RecordingReader(sys.argv[1] if len(sys.argv) > 1 else RECORDING_FILE)
+    records = reader.latest(10)
+    print(f"{reader.count} records written, showing {len(records)}:")
+    for record in records:
+        quotes = ", ".join(f"{ticker} {record['bid_price'][t, 0]:.2f}/{record['ask_price'][t, 0]:.2f}"
+                           for t, ticker in enumerate(reader.tickers))
+        print(f"tick {record['tick']:>4}  net {record['net']:>6.0f}  {quotes}")
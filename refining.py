@@ -1,7 +1,13 @@
 import helper
-import time
+import leases
 import visualization
 
+REFINING_COST = 300_000
+MIN_PROFIT_THRESHOLD = 40_000
+CONTRACTS = 30
+BARRELS_PER_CONTRACT = 1000
+BBL_TO_GALLONS = 42_000
+
 def should_refine(ho_price, rb_price, cl_price):
     """
     Determine if it is profitable to refine 30 contracts of crude oil based on crack spread.
@@ -15,35 +21,27 @@ def should_refine(ho_price, rb_price, cl_price):
         bool: True if refining is profitable, False otherwise.
         float: Expected profit after refining costs.
     """
-    REFINING_COST = 300_000
-    MIN_PROFIT_THRESHOLD = 40_000
-    CONTRACTS = 30
-    BARRELS_PER_CONTRACT = 1000
-    BBL_TO_GALLONS = 42_000
-
     total_revenue = (10 * ho_price * BBL_TO_GALLONS) + (20 * rb_price * BBL_TO_GALLONS)
     total_cost = (CONTRACTS * cl_price * BARRELS_PER_CONTRACT) + REFINING_COST
     total_profit = total_revenue - total_cost
 
     return total_profit >= MIN_PROFIT_THRESHOLD, total_profit
 
-def try_refining(session):
+def try_refining(session, snapshot=None):
     """
     Check if refining is profitable and send crude oil for refining if it is.
 
     Args:
         session (requests.Session): Authenticated session for API requests.
+        snapshot (MarketSnapshot, optional): Market snapshot for this loop.
 
     Returns:
         dict or None: API response from use_refinery if refining, otherwise None.
     """
-    ho_bid, ho_ask = helper.ticker_bid_ask(session, 'HO')
-    rb_bid, rb_ask = helper.ticker_bid_ask(session, 'RB')
-    cl_bid, cl_ask = helper.ticker_bid_ask(session, 'CL')
-
-    ho_price = ho_bid
-    rb_price = rb_bid
-    cl_price = cl_ask
+    # Price each leg at the expected fill of a market order at our size, not the top of book
+    ho_price, ho_slippage = helper.estimate_fill(session, 'HO', 'SELL', 10, snapshot)
+    rb_price, rb_slippage = helper.estimate_fill(session, 'RB', 'SELL', 20, snapshot)
+    cl_price, cl_slippage = helper.estimate_fill(session, 'CL', 'BUY', 30, snapshot)
 
     refine_now, expected_profit = should_refine(ho_price, rb_price, cl_price)
 
@@ -52,12 +50,14 @@ def try_refining(session):
 
     if refine_now:
         print("Refining opportunity found!")
-        helper.lease_storage(session, 'CL-STORAGE')
-        helper.lease_storage(session, 'CL-STORAGE')
-        helper.lease_storage(session, 'CL-STORAGE')
-        print("Leased storage (3) for crude oil.")
+        storage = leases.lease_manager.ensure_storage(session, 'CL-STORAGE', CONTRACTS, owner='refining')
+        if storage < CONTRACTS:
+            print(f"[ERROR] Only {storage} units of CL storage secured. Skipping refining.")
+            leases.lease_manager.unclaim('refining')
+            return None
+        print(f"Secured storage for {CONTRACTS} CL.")
         
-        net_position = helper.get_net_position(session)
+        net_position = helper.get_net_position(session, snapshot)
         
 
         if net_position > 70:
@@ -81,11 +81,14 @@ def try_refining(session):
         helper.place_order(session, 'CL-2F', 30, 'SELL', 'MARKET')
         print("Placed SELL order for 30 contracts of CL-2F.")
         '''
-        helper.lease_refinery(session)
+        leases.lease_manager.lease(session, 'CL-REFINERY')
         print("Leased refinery.")
-        time.sleep(.5) # Wait for lease to be confirmed
-        helper.use_refinery(session, 'CL', 30)
-        print("Sent crude oil for refining.")
+        try:
+            leases.lease_manager.use_refinery(session, 'CL', 30, snapshot)
+            print("Sent crude oil for refining.")
+        finally:
+            # The crude is in the refinery (or the trade failed): the tanks can be reused
+            leases.lease_manager.unclaim('refining')
         
 
         
@@ -94,24 +97,24 @@ def try_refining(session):
         return None
 
 
-def refining_model(session):
+def refining_model(session, snapshot=None):
     """
     Manage refining process: check if refinery is available and attempt refining if possible.
 
     Args:
         session (requests.Session): Authenticated session.
+        snapshot (MarketSnapshot, optional): Market snapshot for this loop.
 
     Returns:
         None
     """
-    refining_now, lease_id, lease_end_tick = helper.get_refinery_lease_info(session)
+    refining_now, lease_id, lease_end_tick = leases.lease_manager.refinery_info(session, snapshot)
     print(f"refining_now: {refining_now}")
     
     if refining_now:
         print("Refinery is being used. Continuing to next model.")
-        time.sleep(1)
     else:
-        positions = helper.get_positions(session)
+        positions = helper.get_positions(session, snapshot)
 
         if positions['HO'] > 0 and positions['RB'] > 0 and positions['CL-2F'] < 0:
             print("Closing Refinery positions.")
@@ -121,4 +124,4 @@ def refining_model(session):
             print("Refinery is available. Attempting to refine.")
             
             
-        try_refining(session)
+        try_refining(session, snapshot)
@@ -0,0 +1,140 @@
+"""
+scheduler.py
+
+Tick-driven scheduler for the trading models. Sleeps on the case clock (see
+clock.py) and runs each registered model once per new tick, optionally at an
+offset into the tick, with a latency budget per model. Event sources (e.g.
+the queued news feed) and due clock deadlines are handled before every model
+so events are handled without waiting for the rest of the tick. A failed
+API call while waiting for a tick or fetching its snapshot is logged and
+that wait or offset retried or skipped, so the loop keeps running.
+"""
+
+import time
+import requests
+import clock
+import helper
+import metrics
+from snapshot import MarketSnapshot
+
+RETRY_DELAY = 0.2  # Seconds before waiting for the next tick again after a failed request
+
+# Errors from a single API call: a non-OK response or a failed connection
+REQUEST_ERRORS = (helper.ApiException, requests.RequestException)
+
+
+class TickScheduler:
+    """
+    Run registered models once per case tick.
+
+    Each model is called as func(session, snapshot). Models sharing an offset
+    share one snapshot, fetched when that offset is reached.
+    """
+
+    def __init__(self, session, case_clock=None):
+        self.session = session
+        self.clock = case_clock or clock.case_clock
+        self.models = []
+        self.event_sources = []
+        self.last_tick = None
+        self.overruns = {}
+
+    def add(self, name, func, offset=0.0, budget=0.5):
+        """
+        Register a model.
+
+        Args:
+            name (str): Model name used in logs and metrics.
+            func (callable): Called as func(session, snapshot).
+            offset (float): Seconds after the tick transition to run the model.
+            budget (float): Seconds the model may take before an overrun is logged.
+        """
+        self.models.append({'name': name, 'func': func, 'offset': offset, 'budget': budget})
+        self.overruns[name] = 0
+
+    def add_event_source(self, name, func):
+        """
+        Register an event source, called as func(session, snapshot) before every model.
+
+        Args:
+            name (str): Source name used in logs and metrics.
+            func (callable): Handles any queued events; should return quickly when there are none.
+        """
+        self.event_sources.append({'name': name, 'func': func})
+
+    def drain_events(self, snapshot):
+        self.clock.fire_deadlines(self.session, snapshot)
+        for source in self.event_sources:
+            try:
+                with metrics.track_model(source['name']):
+                    source['func'](self.session, snapshot)
+            except Exception as e:
+                print(f"[ERROR] {source['name']}: {e}")
+
+    def wait_for_tick(self):
+        """
+        Sleep until the next case tick (or a new period) starts.
+
+        Returns:
+            tuple: (new tick (int), estimated wall time it started (float)).
+        """
+        if self.last_tick is None:
+            tick = self.clock.sample(self.session)
+        else:
+            tick = self.clock.sleep_until_tick(self.session, self.last_tick + 1)
+        return tick, self.clock.tick_time(tick)
+
+    def run_tick(self, tick, tick_start):
+        """
+        Run every model for one tick, grouped by offset.
+        """
+        for offset in sorted({model['offset'] for model in self.models}):
+            delay = tick_start + offset - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                with metrics.track_model('snapshot'):
+                    snapshot = MarketSnapshot.fetch(self.session)
+            except REQUEST_ERRORS as e:
+                print(f"[ERROR] Snapshot for tick {tick} at offset {offset}s failed, skipping its models: {e}")
+                continue
+            if snapshot.tick != tick:
+                print(f"[SCHEDULER] Tick moved to {snapshot.tick} before offset {offset}s models ran.")
+
+            for model in self.models:
+                if model['offset'] == offset:
+                    self.drain_events(snapshot)
+                    self._run_model(model, snapshot)
+
+    def _run_model(self, model, snapshot):
+        start = time.perf_counter()
+        try:
+            with metrics.track_model(model['name']):
+                model['func'](self.session, snapshot)
+        except Exception as e:
+            print(f"[ERROR] {model['name']}: {e}")
+
+        elapsed = time.perf_counter() - start
+        if elapsed > model['budget']:
+            self.overruns[model['name']] += 1
+            print(f"[SCHEDULER] {model['name']} overran its {model['budget']:.2f}s budget: {elapsed:.3f}s")
+
+    def run(self, until_tick=None):
+        """
+        Run the models on every new tick until until_tick (forever if None).
+        """
+        while True:
+            try:
+                tick, tick_start = self.wait_for_tick()
+            except REQUEST_ERRORS as e:
+                print(f"[ERROR] Waiting for the next tick: {e}")
+                time.sleep(RETRY_DELAY)
+                continue
+            if self.last_tick is not None and tick > self.last_tick + 1:
+                print(f"[SCHEDULER] Missed {tick - self.last_tick - 1} tick(s) before tick {tick}.")
+            self.last_tick = tick
+
+            if until_tick is not None and tick >= until_tick:
+                return
+            self.run_tick(tick, tick_start)
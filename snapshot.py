@@ -0,0 +1,80 @@
+"""
+snapshot.py
+
+Per-loop market snapshot shared by all models, so that every decision made
+within one pass of the main loop sees the same view of the case and the
+API is only hit once per endpoint.
+"""
+
+import execution
+import helper
+
+# Books needed by the refining, transportation and storage models
+BOOK_TICKERS = ['CL', 'CL-AK', 'CL-NYC', 'CL-2F', 'HO', 'RB']
+
+
+class MarketSnapshot:
+    """
+    Point-in-time view of the case, limits, securities, leases and order books.
+
+    The helper functions accept an optional snapshot and read from it instead
+    of calling the API when the requested data is present.
+    """
+
+    def __init__(self, case, limits, securities, leases, books):
+        self.case = case
+        self.limits = limits
+        self.securities = securities
+        self.leases = leases
+        self.books = books
+        self.order_books = {}
+
+        self.tick = case.get('tick', 0)
+        self.positions = {security['ticker']: security.get('position', 0) for security in securities}
+        self.net_position = limits[0]['net'] if limits else 0
+
+    @classmethod
+    def fetch(cls, session, tickers=BOOK_TICKERS):
+        """
+        Fetch a new snapshot from the API.
+
+        Args:
+            session (requests.Session): Authenticated session for API requests.
+            tickers (list): Tickers whose order books should be included.
+
+        Returns:
+            MarketSnapshot: Snapshot of the current market state.
+
+        Raises:
+            ApiException: If any of the requests fail.
+        """
+
+        # Every request is independent, so they are issued at once and the
+        # fetch costs about the slowest call rather than the sum of them.
+        calls = [(_get_json, ('/case',)), (_get_json, ('/limits',)), (_get_json, ('/securities',)),
+                 (_get_json, ('/leases',))]
+        calls += [(_get_json, ('/securities/book', {'ticker': ticker})) for ticker in tickers]
+        case, limits, securities, leases, *books = execution.run_concurrently(session, calls)
+
+        return cls(case, limits, securities, leases, dict(zip(tickers, books)))
+
+    def book(self, ticker):
+        """
+        Return the cached order book for a ticker, or None if it was not fetched.
+        """
+        return self.books.get(ticker)
+
+    def order_book(self, ticker):
+        """
+        Return the full-depth OrderBook for a fetched ticker, built once per snapshot.
+        """
+        if ticker not in self.order_books:
+            self.order_books[ticker] = helper.OrderBook(ticker, self.books[ticker])
+        return self.order_books[ticker]
+
+
+def _get_json(session, path, params=None):
+    resp = helper.api_request(session, 'GET', path, params)
+    if not resp.ok:
+        raise helper.ApiException(f"Failed to get {path}: {resp.text}")
+    return resp.json()
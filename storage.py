@@ -4,14 +4,14 @@ from time import sleep
 # Set the current round (1 or 2) at the top
 round_num = 2  # Change to 2 after 600 ticks
 
-def CL_future_arb(session, future, tick, threshold=0.15):
+def CL_future_arb(session, future, tick, threshold=0.15, snapshot=None):
     if future == "CL-2F":
         expected_difference = 2 if round_num == 1 else 1
     elif future == "CL-1F":
         expected_difference = 1
 
-    CL_bid, CL_ask = helper.ticker_bid_ask(session, "CL")
-    CL_future_bid, CL_future_ask = helper.ticker_bid_ask(session, future)
+    CL_bid, CL_ask = helper.ticker_bid_ask(session, "CL", snapshot)
+    CL_future_bid, CL_future_ask = helper.ticker_bid_ask(session, future, snapshot)
 
     if not CL_bid or not CL_ask or not CL_future_bid or not CL_future_ask:
         print(f"Error fetching bid/ask prices for CL or {future}")
@@ -25,14 +25,14 @@ def CL_future_arb(session, future, tick, threshold=0.15):
     spread = cl_future_price - cl_price - expected_difference
     print(f"[Tick {tick}] {future} storage spread: {spread:.2f}")
 
-def storage_model(session):
+def storage_model(session, snapshot=None):
     # Call for both futures
-    tick = helper.get_tick(session)
+    tick = helper.get_tick(session, snapshot)
     # In round 1, both futures exist
     if round_num == 1:
-        CL_future_arb(session, "CL-1F", tick)
-        CL_future_arb(session, "CL-2F", tick)
+        CL_future_arb(session, "CL-1F", tick, snapshot=snapshot)
+        CL_future_arb(session, "CL-2F", tick, snapshot=snapshot)
     # In round 2, CL-1F has expired
     elif round_num == 2:
-        CL_future_arb(session, "CL-2F", tick)
+        CL_future_arb(session, "CL-2F", tick, snapshot=snapshot)
 
@@ -0,0 +1,153 @@
+"""
+sweep.py
+
+Parameter sweep for the ALGO2 market maker. Every combination of the grid is
+run against the simulated exchange in manual-step mode on a virtual clock
+(see backtest.py), spread over a process pool, and scored by final NLV and
+inventory statistics.
+
+Usage:
+    python sweep.py --profile ALGO2FAST --seeds 0 1 --out sweep_results.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import backtest
+import market_maker
+import mock_server
+
+TICKS = 300
+
+# Values swept for each MarketMaker parameter
+GRID = {
+    'ordersize': [1000, 2500, 5000],
+    'rebalancesize': [0, 750, 1500],
+    'orderslimit': [5, 6, 7],
+    'rebalance_limit': [2000, 4000, 6000],
+    'sleep_time': [0.2, 0.3, 0.5],
+}
+
+
+class TrackedExchange(mock_server.Exchange):
+    """
+    Simulated exchange that records one ticker's position after every tick.
+    """
+
+    def __init__(self, ticker, **kwargs):
+        self.tracked = ticker
+        self.inventory = []
+        super().__init__(**kwargs)
+
+    def step(self):
+        running = super().step()
+        self.inventory.append(self.positions[self.tracked])
+        return running
+
+
+def simulate(profile, params, seed, ticks=TICKS, latency=backtest.REQUEST_LATENCY):
+    """
+    Run one market maker over a simulated session.
+
+    Args:
+        profile (str): Base profile name in market_maker.PROFILES.
+        params (dict): Parameter overrides for the profile.
+        seed (int): Random seed for the exchange.
+        ticks (int): Session length in ticks.
+        latency (float): Virtual seconds charged per API request.
+
+    Returns:
+        dict: Final NLV and inventory statistics.
+    """
+    ticker = market_maker.PROFILES[profile]['ticker']
+    exchange = TrackedExchange(ticker, seed=seed, ticks_per_period=ticks, news_script=[])
+    clock = backtest.VirtualClock(exchange)
+    session = backtest.ReplaySession(exchange, clock, latency)
+    maker = market_maker.MarketMaker.from_profile(profile, endtime=min(market_maker.PROFILES[profile]['endtime'], ticks - 1),
+                                                  **params)
+
+    with backtest.virtual_time(clock, {'market_maker': market_maker}), contextlib.redirect_stdout(io.StringIO()):
+        try:
+            market_maker.run(session, [maker])
+        except backtest.CaseEnded:
+            pass
+
+    inventory = np.abs(np.asarray(exchange.inventory, dtype=np.float64))
+    return {
+        'nlv': exchange.nlv(),
+        'final_position': exchange.positions[ticker],
+        'mean_abs_inventory': float(inventory.mean()) if len(inventory) else 0.0,
+        'max_abs_inventory': float(inventory.max()) if len(inventory) else 0.0,
+        'volume': exchange.volume[ticker],
+        'orders': len(exchange.orders),
+    }
+
+
+def _run_combination(task):
+    profile, params, seeds, ticks = task
+    runs = [simulate(profile, params, seed, ticks) for seed in seeds]
+    result = dict(params)
+    for key in runs[0]:
+        result[key] = float(np.mean([run[key] for run in runs]))
+    result['nlv_std'] = float(np.std([run['nlv'] for run in runs]))
+    return result
+
+
+def sweep(profile, grid=GRID, seeds=(0,), ticks=TICKS, processes=None):
+    """
+    Evaluate every combination of the grid over the given seeds in a process pool.
+
+    Returns:
+        list: One result dict per combination (parameters plus mean stats), best NLV first.
+    """
+    names = list(grid)
+    tasks = [(profile, dict(zip(names, values)), list(seeds), ticks) for values in itertools.product(*grid.values())]
+    processes = processes or os.cpu_count()
+    with Pool(processes=processes) as pool:
+        results = list(pool.imap_unordered(_run_combination, tasks, chunksize=max(1, len(tasks) // (8 * processes))))
+    return sorted(results, key=lambda result: -result['nlv'])
+
+
+def save_results(results, path):
+    with open(path, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep ALGO2 market-making parameters on the simulated exchange.")
+    parser.add_argument('--profile', default='ALGO2FAST', choices=list(market_maker.PROFILES))
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument('--ticks', type=int, default=TICKS)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--top', type=int, default=10, help="Combinations to print")
+    parser.add_argument('--out', default=None, help="Write all results to this CSV file")
+    args = parser.parse_args()
+
+    combinations = int(np.prod([len(values) for values in GRID.values()]))
+    print(f"Sweeping {combinations} combinations x {len(args.seeds)} seed(s) for {args.profile}...")
+    start = time.perf_counter()
+    results = sweep(args.profile, GRID, args.seeds, args.ticks, args.processes)
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+
+    for result in results[:args.top]:
+        params = ", ".join(f"{name}={result[name]}" for name in GRID)
+        print(f"NLV {result['nlv']:>12,.2f} (sd {result['nlv_std']:,.0f})  mean|inv| {result['mean_abs_inventory']:>7.0f}  "
+              f"max|inv| {result['max_abs_inventory']:>7.0f}  {params}")
+
+    if args.out:
+        save_results(results, args.out)
+        print(f"Saved results to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,14 @@
 test_helper.py
 
 Basic tests for helper.py functions.
+
+Requires a running RIT client, or the local stand-in:
+    python mock_server.py
 """
 
 import requests
 import helper
+import leases
 from config import API_KEY
 import time
 
@@ -97,7 +101,7 @@ def test_get_refinery_lease_info(session):
 def test_wait_and_close_refinery(session):
     lease_id = 1
     lease_finish_tick = 543
-    close_refinery_response = helper.wait_and_close_refinery(session, lease_id, lease_finish_tick)
+    close_refinery_response = leases.wait_and_close_refinery(session, lease_id, lease_finish_tick)
     print(f"Refinery lease closed: {close_refinery_response}")
 
 def test_lease_use_transport(session):
@@ -0,0 +1,56 @@
+"""
+test_market_maker.py
+
+Tests for QuoteManager.diff. No RIT client needed:
+    python -m pytest test_market_maker.py
+"""
+
+from market_maker import OrderRegistry, QuoteManager
+
+
+def make_quotes(orders, orderslimit=7):
+    registry = OrderRegistry()
+    for order_id, action, price, quantity, filled in orders:
+        registry.add({'order_id': order_id, 'ticker': 'RY', 'action': action, 'price': price,
+                      'quantity': quantity, 'quantity_filled': filled, 'status': 'OPEN'})
+    return QuoteManager('RY', orderslimit, registry)
+
+
+def test_diff_keeps_matching_orders():
+    quotes = make_quotes([(1, 'BUY', 59.99, 5000, 0), (2, 'SELL', 60.01, 5000, 0)])
+    assert quotes.diff({'BUY': (59.99, 5000), 'SELL': (60.01, 5000)}) == ([], [])
+
+
+def test_diff_posts_on_price_move():
+    quotes = make_quotes([(1, 'BUY', 59.99, 5000, 0), (2, 'SELL', 60.01, 5000, 0)])
+    assert quotes.diff({'BUY': (59.98, 5000), 'SELL': (60.01, 5000)}) == ([], [('BUY', 59.98, 5000)])
+
+
+def test_diff_requotes_on_size_change():
+    quotes = make_quotes([(1, 'BUY', 59.99, 5000, 0), (2, 'SELL', 60.01, 5000, 0)])
+    assert quotes.diff({'BUY': (59.99, 1500), 'SELL': (60.01, 5000)}) == ([1], [('BUY', 59.99, 1500)])
+
+
+def test_diff_compares_remaining_quantity():
+    quotes = make_quotes([(1, 'BUY', 59.99, 5000, 3500), (2, 'SELL', 60.01, 5000, 1000)])
+    cancels, posts = quotes.diff({'BUY': (59.99, 1500), 'SELL': (60.01, 5000)})
+    assert cancels == [2]
+    assert posts == [('SELL', 60.01, 5000)]
+
+
+def test_diff_cancels_oversized_orders_at_other_prices():
+    quotes = make_quotes([(1, 'BUY', 59.98, 5000, 0), (2, 'BUY', 59.99, 1500, 0)])
+    assert quotes.diff({'BUY': (59.99, 1500)}) == ([1], [])
+
+
+def test_diff_pulls_side_with_zero_quantity():
+    quotes = make_quotes([(1, 'BUY', 59.99, 5000, 0), (2, 'BUY', 59.98, 5000, 0), (3, 'SELL', 60.01, 5000, 0)])
+    assert quotes.diff({'BUY': (59.99, 0), 'SELL': (60.01, 5000)}) == ([1, 2], [])
+
+
+def test_diff_trims_to_orderslimit():
+    quotes = make_quotes([(1, 'BUY', 59.97, 5000, 0), (2, 'BUY', 59.98, 5000, 0), (3, 'SELL', 60.02, 5000, 0)],
+                         orderslimit=3)
+    cancels, posts = quotes.diff({'BUY': (59.99, 5000), 'SELL': (60.01, 5000)})
+    assert posts == [('BUY', 59.99, 5000), ('SELL', 60.01, 5000)]
+    assert cancels == [1, 2]
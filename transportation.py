@@ -1,44 +1,137 @@
 import helper
-import time
+import clock
 import globals
+import execution
+import leases
 
 
-# State to track transportation trades
-transportation_trade_info_AK = {
-    "active": False,
-    "entry_tick": None,
-    "quantity": 0,
-    "current_time": None
-}
+# Transport trade states, advanced one step per scheduler pass
+IDLE = 'IDLE'              # No trade on the route
+ENTERING = 'ENTERING'      # Entry legs submitted, waiting for the pipeline leases to show up
+IN_TRANSIT = 'IN_TRANSIT'  # Barrels in the pipeline
+LANDED = 'LANDED'          # Barrels delivered, position not yet unwound
+UNWINDING = 'UNWINDING'    # Exit legs submitted, retrying any that failed
 
-transportation_trade_info_NYC = {
-    "active": False,
-    "entry_tick": None,
-    "quantity": 0,
-    "current_time": None    
+MIN_PROFIT_THRESHOLD = 3500 # Minimum profit threshold for transportation
+TRADE_QUANTITY = 100 # Quantity of crude oil to transport
+LOT_SIZE = 10 # Contracts per order and per pipeline lease
+CLOSE_LOT_SIZE = 25 # Contracts per order when unwinding
+TRANSIT_TICKS = 30 # Ticks a shipment spends in the pipeline
+STORAGE_LEAD_TICKS = 4 # Ticks before landing to lease destination storage
+STORAGE_CUTOFF_TICKS = 1 # Ticks before landing after which leasing storage is too late
+LANDING_GRACE_TICKS = 5 # Ticks past TRANSIT_TICKS before a trade is unwound without seeing its leases close
+UNWIND_ATTEMPTS = 3 # Passes spent retrying failed exit legs
+
+
+def idle_trade():
+    return {
+        "state": IDLE,
+        "entry_tick": None,
+        "quantity": 0,           # Barrels shipped
+        "stranded": 0,           # Barrels bought but not shipped, still at the origin
+        "hedge": 0,              # CL-2F contracts shorted
+        "pipeline_leases": [],   # Lease ids of the shipments
+        "storage_leased": False, # Destination storage handled (leased, or too late)
+        "storage_leases": [],    # Destination storage lease ids claimed for the landing
+        "attempts": 0,
+    }
+
+
+# State to track transportation trades, one per route
+transport_trades = {
+    'AK': idle_trade(),
+    'NYC': idle_trade(),
 }
 
 
-MIN_PROFIT_THRESHOLD = 3500 # Minimum profit threshold for transportation
-TRADE_QUANTITY = 100 # Quantity of crude oil to transport
+def _lots(quantity, lot_size):
+    lots = [lot_size] * (quantity // lot_size)
+    if quantity % lot_size:
+        lots.append(quantity % lot_size)
+    return lots
+
+
+def enter_transport(session, spot_ticker, pipeline, net):
+    """
+    Buy spot, short CL-2F and ship the spot barrels, submitting each leg type as a concurrent batch.
+
+    The leg that is traded first depends on the net position, as before:
+    spot first when net < 70, futures first otherwise. Each spot lot is
+    chained with its pipeline lease so the barrels are shipped as soon as
+    they are bought.
+
+    Args:
+        session (requests.Session): Authenticated session object.
+        spot_ticker (str): Spot ticker to buy and ship (e.g. 'CL-AK').
+        pipeline (str): Pipeline lease ticker (e.g. 'AK-CS-PIPE').
+        net (int): Current net position.
+
+    Returns:
+        tuple: (barrels bought (int), barrels shipped (int), CL-2F contracts shorted (int),
+            pipeline lease ids (list)).
+    """
+
+    lots = int(TRADE_QUANTITY / LOT_SIZE)
+    shipments = [[execution.order_leg(spot_ticker, LOT_SIZE, 'BUY'),
+                  execution.transport_leg(pipeline, spot_ticker, LOT_SIZE)] for _ in range(lots)]
+    futures = [execution.order_leg('CL-2F', LOT_SIZE, 'SELL') for _ in range(lots)]
+
+    if net < 70:
+        waves = [shipments + futures]
+    else:
+        waves = [futures, shipments]
+
+    result = execution.execute_legs(session, waves)
+    print(f"Bought {TRADE_QUANTITY} {spot_ticker}, shorted {TRADE_QUANTITY} CL-2F and leased {pipeline}.")
+    result.report()
+
+    buys = [chain[0] for chain in shipments]
+    transports = [chain[1] for chain in shipments]
+    lease_ids = [response['id'] for response in result.responses(transports) if 'id' in response]
+    return result.filled(buys), result.filled(transports), result.filled(futures), lease_ids
+
+def exit_transport(session, spot_ticker, net, quantity=TRADE_QUANTITY, hedge=TRADE_QUANTITY):
+    """
+    Sell the delivered spot barrels and buy back the CL-2F hedge as concurrent batches.
+
+    Args:
+        session (requests.Session): Authenticated session object.
+        spot_ticker (str): Spot ticker that was delivered (e.g. 'CL').
+        net (int): Current net position.
+        quantity (int): Spot barrels to sell.
+        hedge (int): CL-2F contracts to buy back.
+
+    Returns:
+        tuple: (spot barrels sold (int), CL-2F contracts bought (int)).
+    """
 
-def should_transport_AK_CS(session):
+    spot = [execution.order_leg(spot_ticker, lot, 'SELL') for lot in _lots(quantity, CLOSE_LOT_SIZE)]
+    futures = [execution.order_leg('CL-2F', lot, 'BUY') for lot in _lots(hedge, CLOSE_LOT_SIZE)]
+
+    waves = [spot, futures] if net > 70 else [futures, spot]
+
+    result = execution.execute_legs(session, waves)
+    print(f"Closed spot position: SELL {quantity} {spot_ticker}, closed futures position: BUY {hedge} CL-2F")
+    result.report()
+    return result.filled(spot), result.filled(futures)
+
+def should_transport_AK_CS(session, snapshot=None):
     """
     Check if the transport model should be executed based on the current tick.
 
     Args:
         session (requests.Session): Authenticated session object.
+        snapshot (MarketSnapshot, optional): Market snapshot for this loop.
 
     Returns:
         bool: True if transport model should be executed, False otherwise.
     """
 
     
-    # Get price data for CL-AK and CL
-    cl_AK_bid, cl_AK_ask = helper.ticker_bid_ask(session, 'CL-AK')
-    cl_bid, cl_ask = helper.ticker_bid_ask(session, 'CL')
-    net = helper.get_net_position(session)
-    Expected_profit = (10000*cl_bid - 10000*cl_AK_bid - globals.AK_CS_PIPE)
+    # Expected fills for buying CL-AK and later selling CL at the full trade size
+    cl_AK_buy, cl_AK_slippage = helper.estimate_fill(session, 'CL-AK', 'BUY', TRADE_QUANTITY, snapshot)
+    cl_sell, cl_slippage = helper.estimate_fill(session, 'CL', 'SELL', TRADE_QUANTITY, snapshot)
+    Expected_profit = (10000*cl_sell - 10000*cl_AK_buy - globals.AK_CS_PIPE)
 
     if Expected_profit > MIN_PROFIT_THRESHOLD:
         print("Transporting from AK to CS is profitable. Expected profit: ", Expected_profit)
@@ -48,22 +141,23 @@ def should_transport_AK_CS(session):
         print("Transporting from AK to CS is not profitable. Expected profit: ", Expected_profit)
         return False
     
-def should_transport_CS_NYC(session):
+def should_transport_CS_NYC(session, snapshot=None):
     """
     Check if the transport model should be executed based on the current tick.
 
     Args:
         session (requests.Session): Authenticated session object.
+        snapshot (MarketSnapshot, optional): Market snapshot for this loop.
 
     Returns:
         bool: True if transport model should be executed, False otherwise.
     """
 
     
-    # Get price data for CL-AK and CL
-    cl_bid, cl_ask = helper.ticker_bid_ask(session, 'CL')
-    cl_nyc_bid, cl_nyc_ask = helper.ticker_bid_ask(session, 'CL-NYC')
-    Expected_profit = (10000*cl_nyc_bid - 10000*cl_ask - globals.CS_NYC_PIPE)
+    # Expected fills for buying CL and later selling CL-NYC at the full trade size
+    cl_buy, cl_slippage = helper.estimate_fill(session, 'CL', 'BUY', TRADE_QUANTITY, snapshot)
+    cl_nyc_sell, cl_nyc_slippage = helper.estimate_fill(session, 'CL-NYC', 'SELL', TRADE_QUANTITY, snapshot)
+    Expected_profit = (10000*cl_nyc_sell - 10000*cl_buy - globals.CS_NYC_PIPE)
 
     if Expected_profit > MIN_PROFIT_THRESHOLD:
         print("Transporting from CS to NYC is profitable. Expected profit: ", Expected_profit)
@@ -73,194 +167,160 @@ def should_transport_CS_NYC(session):
         print("Transporting from CS to NYC is not profitable. Expected profit: ", Expected_profit)
         return False
     
-def try_transport_AK_CS(session):
-    """
-    Execute the transportation model from AK to CS if conditions are met.
+# Routes: spot ticker shipped, pipeline, delivered ticker and the storage at each end
+ROUTES = {
+    'AK': {'spot': 'CL-AK', 'pipeline': 'AK-CS-PIPE', 'destination': 'CL',
+           'origin_storage': 'AK-STORAGE', 'destination_storage': 'CL-STORAGE',
+           'should_transport': should_transport_AK_CS},
+    'NYC': {'spot': 'CL', 'pipeline': 'CS-NYC-PIPE', 'destination': 'CL-NYC',
+            'origin_storage': 'CL-STORAGE', 'destination_storage': 'NYC-STORAGE',
+            'should_transport': should_transport_CS_NYC},
+}
 
-    Args:
-        session (requests.Session): Authenticated session object.
 
-    Returns:
-        None
+def _open(session, lease_ids, snapshot=None):
     """
+    True if any of the leases is still open.
+    """
+    leases.lease_manager.refresh(session, snapshot)
+    return any(leases.lease_manager.get(lease_id) is not None for lease_id in lease_ids)
 
-    global transportation_trade_info_AK
-
-    # Check if transport is profitable
-    if should_transport_AK_CS(session):
-
-        net = helper.get_net_position(session)
-
-        tick = helper.get_tick(session)
-        current_tick = tick
-        current_time = time.time()
-
-        quantity = TRADE_QUANTITY
-
-        helper.lease_storage(session, 'AK-STORAGE')
 
-        if net < 70:
-            for i in range(0, int(quantity/10)):
-                helper.place_order(session, 'CL-AK', 10, 'BUY', 'MARKET')
-                print(f"Bought spot position: BUY 10 CL-AK")
-                helper.place_order(session, 'CL-2F', 10, 'SELL', 'MARKET')
-                print(f"Shorted futures position: SELL 10 CL-2F")
-                helper.lease_use_transport(session, 'AK-CS-PIPE', 'CL-AK', 10)
-        else:
-            for i in range(int(quantity/10)):
-                helper.place_order(session, 'CL-2F', 10, 'SELL', 'MARKET')
-                print(f"Shorted futures position: SELL 10 CL-2F")
-                helper.place_order(session, 'CL-AK', 10, 'BUY', 'MARKET')
-                print(f"Bought spot position: BUY 10 CL-AK")
-                helper.lease_use_transport(session, 'AK-CS-PIPE', 'CL-AK', 10)
-
-        transportation_trade_info_AK = {
-                "active": True,
-                "entry_tick": current_tick,
-                "current_time": current_time,
-                "quantity": TRADE_QUANTITY
-            }
-
-def try_transport_CS_NYC(session):
+def advance_transport(session, name, snapshot=None):
     """
-    Execute the transportation model from CS to NYC if conditions are met.
+    Advance one route's trade by at most one state.
+
+    IDLE -> ENTERING when the trade is profitable and the entry legs are sent;
+    ENTERING -> IN_TRANSIT once its pipeline leases are open (barrels bought
+    but not shipped are sold back at the origin first); IN_TRANSIT ->
+    LANDED once they have closed (destination storage is leased on the way by
+    a case clock deadline STORAGE_LEAD_TICKS before landing);
+    LANDED -> UNWINDING when the exit legs are sent; UNWINDING -> IDLE once
+    everything is closed or the retries run out. Nothing here waits on fills.
 
     Args:
         session (requests.Session): Authenticated session object.
+        name (str): Route name in ROUTES.
+        snapshot (MarketSnapshot, optional): Market snapshot for this loop.
 
     Returns:
-        None
+        str: The trade's state after this step.
     """
 
-    global transportation_trade_info_NYC
-    tick = helper.get_tick(session)
-    current_tick = tick
-    current_time = time.time()
-    # Check if transport is profitable
-    if should_transport_CS_NYC(session):
-
-        net = helper.get_net_position(session)
-
-        quantity = TRADE_QUANTITY
-        helper.lease_storage(session, 'CL-STORAGE')
-
-        if net < 70:
-            for i in range(int(quantity/10)):
-                helper.place_order(session, 'CL', 10, 'BUY', 'MARKET')
-                print(f"Bought spot position: BUY 10 CL-AK")
-                helper.place_order(session, 'CL-2F', 10, 'SELL', 'MARKET')
-                print(f"Shorted futures position: SELL 10 CL-2F")
-                helper.lease_use_transport(session, 'CS-NYC-PIPE', 'CL', 10)
+    route = ROUTES[name]
+    trade = transport_trades[name]
+    state = trade["state"]
+
+    if state == IDLE:
+        if route['should_transport'](session, snapshot):
+            net = helper.get_net_position(session, snapshot)
+            # Room for one lot at a time, since each lot is shipped as soon as it is bought
+            leases.lease_manager.ensure_storage(session, route['origin_storage'], LOT_SIZE, owner=f"{name} origin")
+            entry_tick = helper.get_tick(session, snapshot)
+            trade.update(state=ENTERING, entry_tick=entry_tick)
+            bought, trade["quantity"], trade["hedge"], trade["pipeline_leases"] = enter_transport(
+                session, route['spot'], route['pipeline'], net)
+            # Barrels whose pipeline lease failed stay at the origin
+            trade["stranded"] = bought - trade["quantity"]
+            clock.case_clock.at_tick(entry_tick + TRANSIT_TICKS - STORAGE_LEAD_TICKS,
+                                     _storage_deadline(name, entry_tick))
+
+    elif state == ENTERING:
+        # The spot barrels have been shipped out of origin storage
+        leases.lease_manager.unclaim(f"{name} origin")
+        if trade["stranded"]:
+            print(f"[ERROR] {trade['stranded']} {route['spot']} not shipped, selling them at the origin.")
+            _sell_stranded(session, route, trade, snapshot)
+        if trade["quantity"] == 0:
+            print(f"[ERROR] Nothing shipped through {route['pipeline']}, unwinding the hedge.")
+            trade["state"] = LANDED
+        elif _open(session, trade["pipeline_leases"], snapshot):
+            trade["state"] = IN_TRANSIT
         else:
-            for i in range(int(quantity/10)):
-                helper.place_order(session, 'CL-2F', 10, 'SELL', 'MARKET')
-                print(f"Shorted futures position: SELL 10 CL-2F")
-                helper.place_order(session, 'CL', 10, 'BUY', 'MARKET')
-                print(f"Bought spot position: BUY 10 CL")
-                helper.lease_use_transport(session, 'CS-NYC-PIPE', 'CL', 10)
-
-        transportation_trade_info_NYC = {
-                "active": True,
-                "entry_tick": current_tick,
-                "current_time": current_time,
-                "quantity": TRADE_QUANTITY
-            }
-
-def transportation_model(session):
+            trade["state"] = LANDED
+
+    elif state == IN_TRANSIT:
+        tick = helper.get_tick(session, snapshot)
+        print(f"{trade['entry_tick'] + TRANSIT_TICKS - tick} ticks left in transportation")
+
+        overdue = tick - trade["entry_tick"] > TRANSIT_TICKS + LANDING_GRACE_TICKS
+        if overdue or not _open(session, trade["pipeline_leases"], snapshot):
+            if overdue:
+                print(f"[ERROR] {route['pipeline']} shipment overdue, unwinding what has landed.")
+            trade["state"] = LANDED
+
+    elif state == LANDED:
+        # Barrels landing without storage are sold at distressed prices by the exchange
+        delivered = min(trade["quantity"], max(helper.get_position_ticker(session, route['destination'], snapshot), 0))
+        trade.update(state=UNWINDING, quantity=delivered)
+        _unwind(session, route, trade, snapshot)
+
+    elif state == UNWINDING:
+        if (trade["quantity"] or trade["stranded"] or trade["hedge"]) and trade["attempts"] < UNWIND_ATTEMPTS:
+            _unwind(session, route, trade, snapshot)
+        else:
+            if trade["quantity"] or trade["stranded"] or trade["hedge"]:
+                print(f"[ERROR] Gave up unwinding {trade['quantity']} {route['destination']}, "
+                      f"{trade['stranded']} {route['spot']} and {trade['hedge']} CL-2F.")
+            leases.lease_manager.unclaim(f"{name} destination")
+            transport_trades[name] = trade = idle_trade()
+
+    return trade["state"]
+
+
+def _storage_deadline(name, entry_tick):
+    """
+    Build the clock deadline that leases destination storage for a trade shortly before it lands.
     """
-    Main function to execute the transportation model.
+    def lease_destination_storage(session, snapshot=None):
+        trade = transport_trades[name]
+        if trade["entry_tick"] != entry_tick or trade["state"] not in (ENTERING, IN_TRANSIT) or trade["storage_leased"]:
+            return
+        trade["storage_leased"] = True
+        if entry_tick + TRANSIT_TICKS - clock.case_clock.last_tick <= STORAGE_CUTOFF_TICKS:
+            print("Too late to buy storage. Incurred Distressed Prices")
+            return
+        storage = ROUTES[name]['destination_storage']
+        secured = leases.lease_manager.ensure_storage(session, storage, trade["quantity"], owner=f"{name} destination")
+        trade["storage_leases"] = leases.lease_manager.claimed_by(f"{name} destination")
+        print(f"Secured {secured} units of {storage} for the {name} shipment of {trade['quantity']}.")
+        if secured < trade["quantity"]:
+            print(f"[ERROR] {trade['quantity'] - secured} barrels of the {name} shipment will land without storage.")
+    return lease_destination_storage
+
+
+def _sell_stranded(session, route, trade, snapshot=None):
+    # Sell the unshipped barrels at the origin along with the part of the hedge they no longer need
+    net = helper.get_net_position(session, snapshot)
+    excess = min(trade["stranded"], max(trade["hedge"] - trade["quantity"], 0))
+    sold, bought = exit_transport(session, route['spot'], net, trade["stranded"], excess)
+    trade["stranded"] -= sold
+    trade["hedge"] -= bought
+
+
+def _unwind(session, route, trade, snapshot=None):
+    if trade["stranded"]:
+        _sell_stranded(session, route, trade, snapshot)
+    net = helper.get_net_position(session, snapshot)
+    sold, bought = exit_transport(session, route['destination'], net, trade["quantity"], trade["hedge"])
+    trade["quantity"] -= sold
+    trade["hedge"] -= bought
+    trade["attempts"] += 1
+
+
+def transportation_model(session, snapshot=None):
+    """
+    Main function to execute the transportation model: step every route's trade once.
 
     Args:
         session (requests.Session): Authenticated session object.
+        snapshot (MarketSnapshot, optional): Market snapshot for this loop.
 
     Returns:
         None
     """
-    global transportation_trade_info_AK
-    global transportation_trade_info_NYC
-
-    current_tick = helper.get_tick(session)
-
-    net = helper.get_net_position(session)
-
-    if transportation_trade_info_AK["active"]:
-        if time.time() - transportation_trade_info_AK["current_time"] >= 26:
-            print("Closing transportation hedge and spot position after 30 ticks.")
-            print(f"{30 - (time.time() - transportation_trade_info_AK['current_time'])} seconds left in transportation") 
-            if time.time() - transportation_trade_info_AK["current_time"] >= 29:
-                print("Too late to buy storage. Incurred Distressed Prices")
-            else:
-                for i in range(10):
-                    helper.lease_storage(session, 'CL-STORAGE')
-
-            while not helper.get_position_ticker(session, 'CL') == 100:
-                time.sleep(0.2)
-                print("Waiting for position to be 100 CL")
-
-            if net > 70:
-                for i in range(1, 5):
-                    helper.place_order(session, 'CL', 25, 'SELL', 'MARKET')
-                    print(f"Closed Spot ({i}) position: SELL 25 CL-2F")
-                    helper.place_order(session, 'CL-2F', 25, 'BUY', 'MARKET')
-                    print(f"Closed Futures ({i}) position: BUY 25 CL-2F")
-            else:
-                for i in range(1, 5):
-                    helper.place_order(session, 'CL-2F', 25, 'BUY', 'MARKET')
-                    print(f"Closed Futures ({i}) position: BUY 10 CL-2F")
-                    helper.place_order(session, 'CL', 25, 'SELL', 'MARKET')
-                    print(f"Closed Spot ({i}) position: SELL 25 CL")
-
-            transportation_trade_info_AK = {
-                "active": False,
-                "entry_tick": None,
-                "quantity": 0,
-                "current_time": None
-            }
-            return None
-        else:
-            print(f"{30 - (time.time() - transportation_trade_info_AK['current_time'])} seconds left in transportation") 
-    if transportation_trade_info_NYC["active"]:
-        if time.time() - transportation_trade_info_NYC["current_time"] >= 26:
-            print("Closing transportation hedge and spot position after 30 ticks.")
-            print(f"{30 - (time.time() - transportation_trade_info_NYC['current_time'])} seconds left in transportation") 
-            if time.time() - transportation_trade_info_NYC["current_time"] >= 29:
-                print("Too late to buy storage. Incurred Distressed Prices")
-            else:
-                for i in range(10):
-                    helper.lease_storage(session, 'NYC-STORAGE')
-
-            while not helper.get_position_ticker(session, 'CL-NYC') == 100:
-                time.sleep(0.2)
-                print("Waiting for position to be 100 CL-NYC")
-
-            if net > 70:
-                for i in range(1, 5):
-                    helper.place_order(session, 'CL-NYC', 25, 'SELL', 'MARKET')
-                    print(f"Closed Spot ({i}) position: SELL 25 CL-NYC")
-                    helper.place_order(session, 'CL-2F', 25, 'BUY', 'MARKET')
-                    print(f"Closed Futures ({i}) position: BUY 25 CL-2F")
-            else:
-                for i in range(1, 5):
-                    helper.place_order(session, 'CL-2F', 25, 'BUY', 'MARKET')
-                    print(f"Closed Futures ({i}) position: BUY 25 CL-2F")
-                    helper.place_order(session, 'CL-NYC', 25, 'SELL', 'MARKET')
-                    print(f"Closed Spot ({i}) position: SELL 25 CL-NYC")
-
-
-            transportation_trade_info_NYC = {
-                "active": False,
-                "entry_tick": None,
-                "quantity": 0,
-                "current_time": None
-            }
-            return None
-        else:
-            print(f"{30 - (time.time() - transportation_trade_info_NYC['current_time'])} seconds left in transportation") 
-    
-    if transportation_trade_info_AK["active"] == False:
-        try_transport_AK_CS(session)
-    if transportation_trade_info_NYC["active"] == False:
-        try_transport_CS_NYC(session)
 
-    
-    
\ No newline at end of file
+    for name in ROUTES:
+        state = transport_trades[name]["state"]
+        if advance_transport(session, name, snapshot) != state:
+            print(f"Transport {name}: {state} -> {transport_trades[name]['state']}")